@@ -0,0 +1,80 @@
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PRACTICUM_CONNECT_TIMEOUT = 3.05
+PRACTICUM_READ_TIMEOUT = 10
+PRACTICUM_POOL_CONNECTIONS = 4
+PRACTICUM_POOL_MAXSIZE = 32
+
+
+class PracticumClient:
+    """Клиент API Практикума, переиспользующий keep-alive соединения.
+
+    Args:
+        endpoint (:obj:`str`): адрес эндпоинта статусов домашних работ
+        headers (:obj:`dict`): заголовки, добавляемые к каждому запросу
+        timeout (:obj:`tuple`): таймауты на соединение и чтение (секунды)
+        pool_connections (:obj:`int`): количество пулов (по хостам)
+        pool_maxsize (:obj:`int`): размер пула соединений к одному хосту.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        headers: Optional[dict] = None,
+        timeout: Tuple[float, float] = (
+            PRACTICUM_CONNECT_TIMEOUT,
+            PRACTICUM_READ_TIMEOUT,
+        ),
+        pool_connections: int = PRACTICUM_POOL_CONNECTIONS,
+        pool_maxsize: int = PRACTICUM_POOL_MAXSIZE,
+    ) -> None:
+        """Инициализирует PracticumClient."""
+        self.endpoint = endpoint
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.headers["Connection"] = "keep-alive"
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self, params: dict, headers: Optional[dict] = None
+    ) -> requests.Response:
+        """Выполняет GET-запрос к эндпоинту через общий пул соединений.
+
+        Args:
+            params (:obj:`dict`): параметры запроса
+            headers (:obj:`dict`): заголовки запроса (по умолчанию
+                заголовки клиента)
+
+        Returns:
+            :obj:`requests.Response`: ответ сервера.
+        """
+        return self.session.get(
+            self.endpoint,
+            headers=headers or self.headers,
+            params=params,
+            timeout=self.timeout,
+        )
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        self.session.close()
+
+    def __enter__(self) -> "PracticumClient":
+        """Возвращает клиент для использования в `with`."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Закрывает соединения при выходе из `with`."""
+        self.close()
@@ -0,0 +1,485 @@
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+from typing import Iterable, Optional
+
+import aiohttp
+import telegram
+
+import homework
+from api_client import PRACTICUM_CONNECT_TIMEOUT, PRACTICUM_READ_TIMEOUT
+from conditional import ResponseValidators
+from decoding import JSONDecodeError, loads
+from exceptions import (
+    APIRequestException,
+    IncorrectStatusResponseCode,
+    JSONDecodeException,
+)
+from leases import ShardLeases
+from metrics import (
+    POLL_LAG,
+    PRACTICUM_NOT_MODIFIED,
+    PRACTICUM_REQUEST_DURATION,
+    QUEUE_DEPTH,
+)
+from outbox import Outbox, OutboxSender
+from scheduler import AdaptiveInterval
+from send_queue import AsyncSendQueue, RateLimiter
+from shutdown import GracefulShutdown
+from state import PollState, StateStore
+from subscriptions import Subscription
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+ASYNC_MAX_CONNECTIONS = 100
+ASYNC_MAX_CONNECTIONS_PER_HOST = 50
+
+
+class AsyncPracticumClient:
+    """Асинхронный клиент API Практикума поверх общей aiohttp-сессии.
+
+    Args:
+        session (:obj:`aiohttp.ClientSession`): сессия с общим пулом
+        endpoint (:obj:`str`): адрес эндпоинта статусов домашних работ.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str = homework.PRACTICUM_ENDPOINT,
+    ) -> None:
+        """Инициализирует AsyncPracticumClient."""
+        self.session = session
+        self.endpoint = endpoint
+
+    async def get_api_answer(
+        self,
+        current_timestamp: int,
+        headers: dict,
+        validators: Optional[ResponseValidators] = None,
+    ) -> Optional[dict]:
+        """Асинхронный аналог `homework.request_homework_statuses`.
+
+        Args:
+            current_timestamp (:obj:`int`): текущая временная метка
+            headers (:obj:`dict`): заголовки с токеном Практикума
+            validators (:obj:`ResponseValidators`): валидаторы подписки
+
+        Returns:
+            :obj:`dict`: словарь с результатом запроса или None, если ответ
+            не изменился.
+        """
+        timestamp = current_timestamp or int(time.time())
+        params = {"from_date": timestamp}
+        if validators is not None:
+            headers = validators.request_headers(headers)
+
+        started = time.perf_counter()
+        try:
+            async with self.session.get(
+                self.endpoint, headers=headers, params=params
+            ) as homework_statuses:
+                PRACTICUM_REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    status_code=homework_statuses.status,
+                )
+                if (
+                    validators is not None
+                    and homework_statuses.status == HTTPStatus.NOT_MODIFIED
+                ):
+                    PRACTICUM_NOT_MODIFIED.inc(reason="304")
+                    return None
+                if homework_statuses.status != HTTPStatus.OK:
+                    raise IncorrectStatusResponseCode(homework_statuses.status)
+                body = await homework_statuses.read()
+                response_headers = homework_statuses.headers
+                status = homework_statuses.status
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            PRACTICUM_REQUEST_DURATION.observe(
+                time.perf_counter() - started, status_code="error"
+            )
+            raise APIRequestException(
+                "Не удалось получить ответ от API."
+            ) from exc
+
+        if validators is not None and validators.is_unchanged(
+            response_headers, body
+        ):
+            PRACTICUM_NOT_MODIFIED.inc(reason="hash")
+            return None
+
+        try:
+            return loads(body)
+
+        except JSONDecodeError as exc:
+            raise JSONDecodeException(f"<Response [{status}]>") from exc
+
+
+class AsyncTelegramBot:
+    """Асинхронная отправка сообщений через Bot API Телеграма.
+
+    Ошибки Bot API приводятся к исключениям `telegram.error`, чтобы
+    обработка совпадала с синхронным `telegram.Bot`; ответ, который не
+    удалось разобрать (например, HTML-страница 502), считается сетевой
+    ошибкой.
+
+    Args:
+        session (:obj:`aiohttp.ClientSession`): сессия с общим пулом
+        token (:obj:`str`): токен бота
+        api_url (:obj:`str`): шаблон адреса метода sendMessage.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        token: str,
+        api_url: str = TELEGRAM_API_URL,
+    ) -> None:
+        """Инициализирует AsyncTelegramBot."""
+        self.session = session
+        self.url = api_url.format(token=token)
+
+    async def send_message(self, chat_id: str, text: str) -> dict:
+        """Отправляет сообщение в чат.
+
+        Args:
+            chat_id (:obj:`str`): идентификатор чата
+            text (:obj:`str`): текст сообщения
+
+        Returns:
+            :obj:`dict`: отправленное сообщение в формате Bot API.
+        """
+        try:
+            async with self.session.post(
+                self.url, json={"chat_id": chat_id, "text": text}
+            ) as response:
+                status = response.status
+                result = await response.json(content_type=None)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise telegram.error.NetworkError(str(exc)) from exc
+
+        except ValueError as exc:
+            raise telegram.error.NetworkError(
+                f"Некорректный ответ Bot API: {response.status}"
+            ) from exc
+
+        if not result.get("ok"):
+            raise bot_api_error(result, status)
+
+        return result["result"]
+
+
+def bot_api_error(result: dict, status: int) -> telegram.error.TelegramError:
+    """Ф-я получения исключения для ответа Bot API с ошибкой.
+
+    Коды ошибок сопоставляются с исключениями так же, как в
+    `telegram.utils.request.Request`, поэтому `send_queue.send_result`
+    одинаково отличает постоянные ошибки от временных в обоих движках.
+
+    Args:
+        result (:obj:`dict`): ответ Bot API
+        status (:obj:`int`): HTTP-статус ответа
+
+    Returns:
+        :obj:`telegram.error.TelegramError`: исключение для ответа.
+    """
+    parameters = result.get("parameters") or {}
+    if "retry_after" in parameters:
+        return telegram.error.RetryAfter(parameters["retry_after"])
+    if "migrate_to_chat_id" in parameters:
+        return telegram.error.ChatMigrated(parameters["migrate_to_chat_id"])
+
+    message = result.get("description") or "Unknown HTTPError"
+    code = result.get("error_code", status)
+    if code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+        return telegram.error.Unauthorized(message)
+    if code == HTTPStatus.BAD_REQUEST:
+        return telegram.error.BadRequest(message)
+    if code == HTTPStatus.NOT_FOUND:
+        return telegram.error.InvalidToken()
+    if code == HTTPStatus.CONFLICT:
+        return telegram.error.Conflict(message)
+    return telegram.error.NetworkError(f"{message} ({code})")
+
+
+class AsyncPoller:
+    """Корутина опроса статусов домашних работ для одной подписки.
+
+    Ответ и ошибки опроса обрабатываются теми же
+    `homework.handle_response`/`homework.handle_poll_error`, что и в
+    синхронном `poll_subscription`.
+
+    Args:
+        client (:obj:`AsyncPracticumClient`): клиент API Практикума
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): опрашиваемая подписка
+        retry_time (:obj:`int`): период, внутри которого выбирается
+            слот первого опроса (секунды)
+        policy (:obj:`AdaptiveInterval`): политика интервала опроса
+        state (:obj:`PollState`): сохраненное состояние опроса
+        store (:obj:`StateStore`): хранилище состояния подписок
+        leases (:obj:`ShardLeases`): аренда шардов подписок
+        stopping (:obj:`asyncio.Event`): запрос остановки, после
+            которого новые опросы не начинаются.
+    """
+
+    def __init__(
+        self,
+        client: AsyncPracticumClient,
+        sender: OutboxSender,
+        subscription: Subscription,
+        retry_time: int = homework.TELEGRAM_RETRY_TIME,
+        policy: Optional[AdaptiveInterval] = None,
+        state: Optional[PollState] = None,
+        store: Optional[StateStore] = None,
+        leases: Optional[ShardLeases] = None,
+        stopping: Optional[asyncio.Event] = None,
+    ) -> None:
+        """Инициализирует AsyncPoller."""
+        self.client = client
+        self.sender = sender
+        self.subscription = subscription
+        self.retry_time = retry_time
+        self.policy = policy or AdaptiveInterval()
+        self.first_delay = homework.first_poll_delay(
+            subscription.key, state, self.policy, retry_time
+        )
+        self.state = state or PollState()
+        self.store = store
+        self.leases = leases
+        self.epoch: Optional[int] = None
+        self.stopping = stopping
+
+    async def poll_once(self) -> None:
+        """Выполняет один цикл опроса, как `homework.poll_subscription`."""
+        state = self.state
+        started = time.perf_counter()
+
+        try:
+            with homework.circuit_breaker.guard():
+                response = await self.client.get_api_answer(
+                    state.current_timestamp,
+                    self.subscription.headers,
+                    state.validators,
+                )
+            homework.handle_response(
+                self.sender, self.subscription, state, started, response
+            )
+
+        except Exception as error:
+            homework.handle_poll_error(
+                self.sender, self.subscription, state, started, error
+            )
+
+    def next_interval(self) -> float:
+        """Пауза до следующего опроса (секунды)."""
+        return homework.next_poll_interval(self.state, self.policy)
+
+    def notify(self, message: str) -> None:
+        """Ставит сообщение в очередь для всех чатов подписки."""
+        homework.notify(self.sender, self.subscription, message)
+
+    def acquire(self) -> bool:
+        """Проверяет аренду шарда подписки, как `homework.leased_state`.
+
+        Returns:
+            :obj:`bool`: True, если подписку опрашивает этот экземпляр.
+        """
+        if self.leases is None:
+            return True
+
+        key = self.subscription.key
+        epoch = self.leases.epoch(key)
+        if epoch is None:
+            self.state = None
+            return False
+
+        if self.state is None or epoch != self.epoch:
+            stored = None
+            if self.store is not None:
+                self.store.discard(key)
+                stored = self.store.load(key).get(key)
+            self.state = stored or PollState()
+            self.epoch = epoch
+        return True
+
+    async def sleep(self, delay: float) -> bool:
+        """Ждет `delay` секунд или запроса остановки.
+
+        Returns:
+            :obj:`bool`: True, если запрошена остановка.
+        """
+        if self.stopping is None:
+            await asyncio.sleep(delay)
+            return False
+
+        try:
+            await asyncio.wait_for(self.stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def run(self) -> None:
+        """Опрашивает API до отмены корутины или запроса остановки.
+
+        Первый опрос откладывается до стабильного слота подписки (см.
+        `homework.first_poll_delay`), чтобы корутины не обращались к API
+        одновременно. Начатый опрос при остановке завершается.
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.first_delay
+
+        while True:
+            due = loop.time() + delay
+            if await self.sleep(delay):
+                return
+            POLL_LAG.set(
+                max(0, loop.time() - due), subscription=self.subscription.key
+            )
+            if not self.acquire():
+                delay = self.leases.interval
+                continue
+            await self.poll_once()
+            if self.store is not None:
+                self.store.save(self.subscription.key, self.state)
+                self.store.flush_if_due()
+            delay = self.next_interval()
+
+
+async def run_engine(
+    subscriptions: Iterable[Subscription],
+    telegram_token: str,
+    max_connections: int = ASYNC_MAX_CONNECTIONS,
+    endpoint: Optional[str] = None,
+    policy: Optional[AdaptiveInterval] = None,
+    store: Optional[StateStore] = None,
+    outbox: Optional[Outbox] = None,
+    retry_time: int = homework.TELEGRAM_RETRY_TIME,
+    telegram_api_url: str = TELEGRAM_API_URL,
+    limiter: Optional[RateLimiter] = None,
+    leases: Optional[ShardLeases] = None,
+    digest_window: float = 0,
+    shutdown: Optional[GracefulShutdown] = None,
+) -> None:
+    """Запускает конкурентный опрос всех подписок.
+
+    Все корутины используют одну aiohttp-сессию, поэтому соединения
+    к API Практикума и Телеграма берутся из общего пула. После запроса
+    остановки `shutdown` движок дожидается начатых опросов и досылает
+    очередь сообщений в пределах срока остановки.
+
+    Args:
+        subscriptions (:obj:`Iterable[Subscription]`): опрашиваемые подписки
+        telegram_token (:obj:`str`): токен бота
+        max_connections (:obj:`int`): размер общего пула соединений
+        endpoint (:obj:`str`): адрес эндпоинта статусов домашних работ
+        policy (:obj:`AdaptiveInterval`): политика интервала опроса
+        store (:obj:`StateStore`): хранилище состояния подписок
+        outbox (:obj:`Outbox`): журнал уведомлений для повторной отправки
+        retry_time (:obj:`int`): период выбора слотов первого опроса
+        telegram_api_url (:obj:`str`): шаблон адреса метода sendMessage
+        limiter (:obj:`RateLimiter`): лимиты отправки сообщений
+        leases (:obj:`ShardLeases`): аренда шардов подписок
+        digest_window (:obj:`float`): окно объединения уведомлений чата
+            в дайджест (секунды, 0 — без дайджестов)
+        shutdown (:obj:`GracefulShutdown`): запрос плавной остановки.
+    """
+    states = store.load() if store is not None else {}
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=ASYNC_MAX_CONNECTIONS_PER_HOST,
+    )
+    timeout = aiohttp.ClientTimeout(
+        sock_connect=PRACTICUM_CONNECT_TIMEOUT,
+        sock_read=PRACTICUM_READ_TIMEOUT,
+    )
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout
+    ) as session:
+        client = AsyncPracticumClient(
+            session, endpoint or homework.PRACTICUM_ENDPOINT
+        )
+        send_queue = AsyncSendQueue(
+            AsyncTelegramBot(session, telegram_token, telegram_api_url),
+            limiter=limiter,
+        )
+        send_queue.start()
+        QUEUE_DEPTH.set_function(send_queue.qsize, queue="send")
+        sender = send_queue
+        tasks = []
+        if digest_window:
+            sender = homework.get_digest_queue(sender, digest_window)
+            tasks.append(sender.run_async())
+        digest = sender
+        if outbox is not None:
+            sender = OutboxSender(outbox, sender)
+            tasks.append(sender.run_async())
+        stopping = asyncio.Event()
+        pollers = [
+            AsyncPoller(
+                client,
+                sender,
+                subscription,
+                retry_time=retry_time,
+                policy=policy,
+                state=states.get(subscription.key),
+                store=store,
+                leases=leases,
+                stopping=stopping,
+            )
+            for subscription in subscriptions
+        ]
+        logger.debug("Запущено корутин опроса: %d", len(pollers))
+        if shutdown is None:
+            tasks.extend(poller.run() for poller in pollers)
+            await asyncio.gather(*tasks)
+            return
+
+        background = [asyncio.ensure_future(task) for task in tasks]
+        polls = [asyncio.ensure_future(poller.run()) for poller in pollers]
+        stopped = asyncio.ensure_future(shutdown.wait_async())
+        done, _ = await asyncio.wait(
+            background + polls + [stopped],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        for task in done:
+            task.result()
+
+        stopping.set()
+        await drain_engine(polls, background, digest, send_queue, shutdown)
+
+
+async def drain_engine(
+    polls: list,
+    background: list,
+    digest,
+    send_queue: AsyncSendQueue,
+    shutdown: GracefulShutdown,
+) -> None:
+    """Завершает работу движка после запроса остановки.
+
+    Дожидается начатых опросов, останавливает фоновые задачи, отправляет
+    отложенные дайджесты и досылает очередь сообщений, не выходя за срок
+    остановки.
+
+    Args:
+        polls (:obj:`list`): задачи опроса подписок
+        background (:obj:`list`): фоновые задачи журнала и дайджестов
+        digest: очередь дайджестов или `send_queue`, если их нет
+        send_queue (:obj:`AsyncSendQueue`): очередь отправки сообщений
+        shutdown (:obj:`GracefulShutdown`): запрос плавной остановки.
+    """
+    if polls:
+        await asyncio.wait(polls, timeout=shutdown.remaining())
+    for task in polls + background:
+        task.cancel()
+
+    logger.info("Опрос остановлен, отправка оставшихся сообщений")
+    if digest is not send_queue:
+        digest.flush(force=True)
+    await send_queue.close(shutdown.remaining())
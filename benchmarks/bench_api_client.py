@@ -0,0 +1,58 @@
+"""Сравнение задержки запроса: requests.get против PracticumClient.
+
+Запуск: python -m benchmarks.bench_api_client [количество запросов]
+"""
+import statistics
+import sys
+import time
+
+import requests
+
+from api_client import PracticumClient
+from benchmarks.stubs import PracticumStubServer
+
+HEADERS = {"Authorization": "OAuth benchmark"}
+
+
+def measure(get, requests_count: int) -> list:
+    """Возвращает задержки каждого запроса в миллисекундах."""
+    latencies = []
+    for timestamp in range(requests_count):
+        started = time.perf_counter()
+        get({"from_date": timestamp}).json()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(title: str, latencies: list, connections: int) -> None:
+    """Печатает сводку по задержкам."""
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{title:<16} mean={statistics.mean(latencies):.3f}ms "
+        f"p50={statistics.median(latencies):.3f}ms p99={p99:.3f}ms "
+        f"connections={connections}"
+    )
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with PracticumStubServer() as server:
+        latencies = measure(
+            lambda params: requests.get(
+                server.url, headers=HEADERS, params=params
+            ),
+            requests_count,
+        )
+        report("requests.get", latencies, server.connections)
+
+    with PracticumStubServer() as server:
+        with PracticumClient(server.url, headers=HEADERS) as client:
+            latencies = measure(client.get, requests_count)
+        report("PracticumClient", latencies, server.connections)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Сквозной бенчмарк: уведомления в секунду, задержка и память.
+
+Асинхронный движок опрашивает локальную заглушку API Практикума, где
+статус каждой работы меняется на каждом запросе, и отправляет сообщения
+в локальную заглушку Bot API. Измеряются:
+
+* уведомлений в секунду, принятых заглушкой Телеграма;
+* p50/p99 задержки от первой выдачи нового статуса до приема сообщения;
+* память на одну подписку (подписка, состояние опроса, корутина);
+* ответы API, разбор которых пропущен (304 по `ETag` или то же тело).
+
+С `--repeat N` каждый статус отдается N запросов подряд, с `--etag`
+заглушка поддерживает условные запросы.
+
+Бенчмарк не обращается к сети.
+
+Запуск: python -m benchmarks.bench_end_to_end [--subscriptions N] ...
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import re
+import statistics
+import time
+import tracemalloc
+from collections import deque
+from typing import Dict, List
+
+import homework
+from async_engine import AsyncPoller, run_engine
+from benchmarks.stubs import PracticumStubServer, TelegramStubServer
+from metrics import PRACTICUM_NOT_MODIFIED
+from scheduler import AdaptiveInterval
+from send_queue import RateLimiter
+from state import PollState
+from subscriptions import Subscription
+
+SCRIPT = ("reviewing", "rejected", "approved")
+MESSAGE_PATTERN = re.compile(r'работы "(?P<name>[^"]+)"\. (?P<verdict>.+)$')
+VERDICTS = {
+    verdict: status for status, verdict in homework.HOMEWORK_STATUSES.items()
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает параметры бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--practicum-latency", type=float, default=0.005)
+    parser.add_argument("--practicum-error-rate", type=float, default=0)
+    parser.add_argument("--telegram-latency", type=float, default=0.005)
+    parser.add_argument("--telegram-error-rate", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--etag", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def make_subscriptions(count: int) -> List[Subscription]:
+    """Подписки с одним чатом каждая."""
+    return [
+        Subscription(f"token-{index}", (str(index),)) for index in range(count)
+    ]
+
+
+def latencies(
+    practicum: PracticumStubServer, telegram: TelegramStubServer
+) -> List[float]:
+    """Сопоставляет сообщения сменам статусов и возвращает задержки.
+
+    Для каждой работы смены и сообщения упорядочены по времени; смены,
+    для которых сообщение не пришло, пропускаются.
+    """
+    pending: Dict[str, deque] = {
+        token: deque(changes) for token, changes in practicum.changes.items()
+    }
+    result = []
+    for _, text, received in telegram.messages:
+        match = MESSAGE_PATTERN.search(text)
+        if match is None:
+            continue
+        status = VERDICTS.get(match["verdict"])
+        changes = pending.get(match["name"], deque())
+        while changes:
+            changed_status, changed_at = changes.popleft()
+            if changed_status == status and changed_at <= received:
+                result.append(received - changed_at)
+                break
+    return result
+
+
+def memory_per_subscription(count: int) -> float:
+    """Память на одну подписку вместе с состоянием и корутиной (байты)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    pollers = []
+    for subscription in make_subscriptions(count):
+        state = PollState()
+        homework.process_homeworks(
+            [
+                {
+                    "homework_name": subscription.practicum_token,
+                    "status": "reviewing",
+                }
+            ],
+            state,
+        )
+        pollers.append(AsyncPoller(None, None, subscription, state=state))
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+async def drive(args: argparse.Namespace, practicum, telegram) -> None:
+    """Запускает движок на заданное время."""
+    policy = AdaptiveInterval(
+        intervals={},
+        default=args.interval,
+        min_interval=args.interval,
+        max_interval=args.interval,
+    )
+    engine = run_engine(
+        make_subscriptions(args.subscriptions),
+        "bench",
+        endpoint=practicum.url,
+        policy=policy,
+        retry_time=args.interval,
+        telegram_api_url=telegram.api_url,
+        limiter=RateLimiter(global_rate=1e9, chat_rate=1e9),
+    )
+    try:
+        await asyncio.wait_for(engine, args.duration)
+    except asyncio.TimeoutError:
+        pass
+
+
+def percentile(values: List[float], point: int) -> float:
+    """Перцентиль выборки (point от 1 до 99)."""
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100)[point - 1]
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    args = parse_args()
+    logging.getLogger("homework").setLevel(logging.CRITICAL)
+
+    practicum = PracticumStubServer(
+        script=[status for status in SCRIPT for _ in range(args.repeat)],
+        cycle=True,
+        etag=args.etag,
+        latency=args.practicum_latency,
+        error_rate=args.practicum_error_rate,
+        seed=args.seed,
+    )
+    telegram = TelegramStubServer(
+        latency=args.telegram_latency,
+        error_rate=args.telegram_error_rate,
+        seed=args.seed,
+    )
+
+    with practicum, telegram:
+        started = time.monotonic()
+        asyncio.run(drive(args, practicum, telegram))
+        elapsed = time.monotonic() - started
+
+    delays = latencies(practicum, telegram)
+    changes = sum(len(items) for items in practicum.changes.values())
+
+    print(
+        f"подписок: {args.subscriptions}, интервал: {args.interval} с, "
+        f"длительность: {elapsed:.1f} с"
+    )
+    print(
+        f"запросов к API: {sum(practicum.requests.values())}, "
+        f"смен статусов: {changes}"
+    )
+    print(
+        "пропущено разборов: 304=%d, тот же ответ=%d, отдано байт: %d"
+        % (
+            PRACTICUM_NOT_MODIFIED.get(reason="304"),
+            PRACTICUM_NOT_MODIFIED.get(reason="hash"),
+            practicum.bytes_sent,
+        )
+    )
+    print(
+        f"уведомлений: {len(telegram.messages)} "
+        f"({len(telegram.messages) / elapsed:.1f}/с)"
+    )
+    print(
+        f"задержка смена -> сообщение: "
+        f"p50={percentile(delays, 50) * 1000:.1f} мс "
+        f"p99={percentile(delays, 99) * 1000:.1f} мс"
+    )
+    print(
+        f"память на подписку: "
+        f"{memory_per_subscription(args.subscriptions):.0f} Б"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Регрессионный бенчмарк времени импорта по `python -X importtime`.
+
+Импортирует модуль в отдельных процессах, печатает медиану суммарного
+времени импорта и самые дорогие зависимости и проверяет, что тяжелые
+библиотеки не загружаются при импорте. Завершается с кодом 1, если
+время превышает порог или тяжелая библиотека загружена.
+
+Запуск: python -m benchmarks.bench_import [--module homework] [--max-ms 100]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = (
+    "aiohttp",
+    "asyncio",
+    "dotenv",
+    "requests",
+    "sqlite3",
+    "telegram",
+)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Время импорта модулей в новом процессе.
+
+    Returns:
+        :obj:`dict`: собственное и суммарное время по модулям (мкс).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+        if not name.startswith("  "):
+            if name.strip() == module:
+                return times
+            times = {}
+    return times
+
+
+def loaded_heavy_modules(module: str) -> List[str]:
+    """Тяжелые библиотеки, загруженные при импорте модуля."""
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.split()
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="homework")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    total = statistics.median(run[args.module][1] for run in runs) / 1000
+    slowest = sorted(
+        (item for item in runs[-1].items() if item[0] != args.module),
+        key=lambda item: item[1][1],
+        reverse=True,
+    )[:10]
+
+    print(
+        f"import {args.module}: медиана {total:.1f} мс "
+        f"({args.runs} запусков)"
+    )
+    for name, (own, cumulative) in slowest:
+        print(f"  {name:<40} {cumulative / 1000:7.1f} мс")
+
+    heavy = loaded_heavy_modules(args.module)
+    if heavy:
+        print(f"загружены тяжелые библиотеки: {', '.join(heavy)}")
+    if heavy or total > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Память на одну отслеживаемую домашнюю работу до и после записей.
+
+Ответ API с N работами разбирается так же, как в боте, после чего
+измеряется память, которая остается после разбора:
+
+* словари работ из ответа против записей `Homework` со `__slots__`;
+* известные статусы подписки со строками из ответа против общих
+  экземпляров статусов (`process_homeworks`).
+
+Записи `Homework` живут только внутри `diff_homeworks`, пока ответ
+сравнивается с состоянием, и после опроса не удерживаются: первая пара
+строк показывает пиковую память разбора ответа, а не постоянную.
+Постоянно между опросами хранится только таблица статусов подписки —
+ее и измеряет вторая пара строк (без кеша текстов уведомлений).
+
+Запуск: python -m benchmarks.bench_memory [количество работ]
+"""
+import argparse
+import gc
+import json
+import logging
+import tracemalloc
+from typing import Callable
+
+import homework
+from decoding import loads
+from records import Homework
+from state import PollState
+
+STATUSES = tuple(homework.HOMEWORK_STATUSES)
+
+
+def make_body(count: int) -> bytes:
+    """Тело ответа API с `count` работами, как его отдает Практикум."""
+    homeworks = [
+        {
+            "id": index,
+            "status": STATUSES[index % len(STATUSES)],
+            "homework_name": f"student__hw{index:06d}.zip",
+            "reviewer_comment": "",
+            "date_updated": "2022-01-01T00:00:00Z",
+            "lesson_name": "Итоговый проект",
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"homeworks": homeworks, "current_date": 0}).encode()
+
+
+def measure(body: bytes, count: int, build: Callable[[list], object]) -> float:
+    """Память, удерживаемая результатом `build` (байты на работу)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    result = build(loads(body)["homeworks"])
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / count
+
+
+def raw_statuses(homeworks: list) -> dict:
+    """Известные статусы со строками из ответа, как до записей."""
+    return {item["homework_name"]: item["status"] for item in homeworks}
+
+
+def tracked_statuses(homeworks: list) -> dict:
+    """Известные статусы подписки после `process_homeworks`."""
+    state = PollState(1)
+    homework.process_homeworks(homeworks, state)
+    homework.MESSAGE_TEMPLATES.render.cache_clear()
+    return state.statuses
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает параметры бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("count", nargs="?", type=int, default=100_000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    count = parse_args().count
+    logging.getLogger("homework").setLevel(logging.CRITICAL)
+    body = make_body(count)
+
+    rows = (
+        ("работы: словари из ответа", lambda items: items),
+        (
+            "работы: записи Homework",
+            lambda items: [Homework.from_dict(item) for item in items],
+        ),
+        ("статусы: строки из ответа", raw_statuses),
+        ("статусы: общие экземпляры", tracked_statuses),
+    )
+
+    print(f"работ: {count}")
+    for title, build in rows:
+        print(f"  {title:<30} {measure(body, count, build):7.1f} Б/работу")
+
+
+if __name__ == "__main__":
+    main()
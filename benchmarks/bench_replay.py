@@ -0,0 +1,97 @@
+"""Воспроизведение записанных ответов API: ответов и сообщений в секунду.
+
+Запись делает сам бот с `--record-file` (или `RECORD_FILE`): каждая
+строка — ответ API одной подписки со временем и длительностью запроса.
+Бенчмарк подает ответы через `check_response`, разбор статусов и
+`send_message` с ускорением `--speed` (0 — без пауз, для регрессионных
+замеров) и повторяет запись `--repeat` раз. Сообщения принимает бот,
+который только ждет `--telegram-latency` секунд, поэтому сеть не нужна.
+
+Запуск: python -m benchmarks.bench_replay [recording.jsonl] [--speed X]
+"""
+import argparse
+import logging
+import time
+from typing import List
+
+from replay import Record, read_recording, replay
+
+RECORDING = "tests/fixtures/recording.jsonl"
+
+
+class NullBot:
+    """Бот, который не отправляет сообщения, а только считает их."""
+
+    def __init__(self, latency: float = 0) -> None:
+        """Инициализирует NullBot."""
+        self.latency = latency
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs) -> None:
+        """Имитирует отправку сообщения."""
+        if self.latency:
+            time.sleep(self.latency)
+        self.sent += 1
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает параметры бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", default=RECORDING)
+    parser.add_argument("--speed", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--telegram-latency", type=float, default=0)
+    parser.add_argument("--every-response", action="store_true")
+    return parser.parse_args()
+
+
+def repeated(records: List[Record], repeat: int) -> List[Record]:
+    """Запись, повторенная `repeat` раз с отдельными подписками и временем.
+
+    Каждый повтор получает свои ключи подписок, поэтому смены статусов
+    не гасятся состоянием предыдущего повтора.
+    """
+    if not records:
+        return []
+
+    span = records[-1].at - records[0].at + 1
+    return [
+        record._replace(
+            at=record.at + round_ * span, key=f"{record.key}-{round_}"
+        )
+        for round_ in range(repeat)
+        for record in records
+    ]
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    args = parse_args()
+    logging.getLogger("homework").setLevel(logging.CRITICAL)
+
+    records = repeated(list(read_recording(args.recording)), args.repeat)
+    bot = NullBot(args.telegram_latency)
+    stats = replay(
+        records,
+        bot,
+        speed=args.speed,
+        track_changes=not args.every_response,
+    )
+
+    print(
+        f"записей: {len(records)}, ускорение: "
+        f"{'без пауз' if not args.speed else f'x{args.speed:g}'}, "
+        f"длительность: {stats.elapsed:.2f} с"
+    )
+    print(
+        f"ответов: {stats.responses}, без изменений: {stats.unchanged}, "
+        f"ошибок: {stats.errors}, сообщений: {stats.messages}"
+    )
+    print(
+        f"  {len(records) / stats.elapsed:10.0f} записей/с"
+        f"  {stats.messages / stats.elapsed:10.0f} сообщений/с"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Нагрузка на API и накладные расходы планировщика на 10k подписок.
+
+Сравнивает старт «все разом» с колесом таймеров на виртуальных часах:
+распределение запросов по секундам и время одного тика колеса.
+
+Запуск: python -m benchmarks.bench_scheduler [количество подписок]
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+
+from scheduler import (
+    SCHEDULER_TICK,
+    TimingWheel,
+    run_timing_wheel,
+    slot_offset,
+)
+from subscriptions import Subscription
+
+PERIOD = 600
+PERIODS = 3
+
+
+class Finished(Exception):
+    """Останавливает бесконечный цикл планировщика."""
+
+
+class VirtualClock:
+    """Виртуальные часы: `sleep` мгновенно сдвигает время."""
+
+    def __init__(self) -> None:
+        """Инициализирует VirtualClock."""
+        self.now = 0.0
+
+    def clock(self) -> float:
+        """Текущее виртуальное время."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Сдвигает виртуальное время."""
+        self.now += seconds
+        if self.now >= PERIOD * PERIODS:
+            raise Finished
+
+
+def rate_summary(title: str, per_second: Counter) -> None:
+    """Печатает распределение запросов по секундам."""
+    rates = [per_second.get(second, 0) for second in range(PERIOD * PERIODS)]
+    print(
+        f"{title:<14} max={max(rates)} req/s mean={statistics.mean(rates):.1f}"
+        f" req/s stdev={statistics.pstdev(rates):.1f}"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает параметры бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("count", nargs="?", type=int, default=10_000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    count = parse_args().count
+    subscriptions = [
+        Subscription(f"token-{index}", ("1",)) for index in range(count)
+    ]
+
+    herd = Counter()
+    for period_index in range(PERIODS):
+        herd[period_index * PERIOD] += count
+    rate_summary("all at once", herd)
+
+    virtual = VirtualClock()
+    wheel_rate = Counter()
+
+    def poll(subscription: Subscription) -> None:
+        wheel_rate[int(virtual.now)] += 1
+
+    try:
+        run_timing_wheel(
+            subscriptions,
+            poll,
+            PERIOD,
+            sleep=virtual.sleep,
+            clock=virtual.clock,
+        )
+    except Finished:
+        pass
+    rate_summary("timing wheel", wheel_rate)
+
+    wheel = TimingWheel(SCHEDULER_TICK, PERIOD)
+    for subscription in subscriptions:
+        wheel.schedule(subscription, slot_offset(subscription.key, PERIOD))
+
+    ticks = PERIOD * PERIODS
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for subscription in wheel.advance():
+            wheel.schedule(subscription, PERIOD)
+    elapsed = time.perf_counter() - started
+    polls = count * PERIODS
+    print(
+        f"tick overhead: {elapsed / ticks * 1e6:.1f} us/tick, "
+        f"{elapsed / polls * 1e9:.0f} ns per scheduled poll"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Масштабирование опроса по процессам: опросов в секунду от 1 до N.
+
+`workers.Supervisor` запускает процессы, каждый из которых опрашивает
+свой шард подписок кольца хешей. Вместо сети ответы API берутся из
+заранее подготовленных тел, поэтому измеряется именно работа, которая
+упирается в одно ядро: разбор JSON, проверка ответа, поиск смен
+статусов и сборка уведомлений. Статусы работ меняются на каждом опросе.
+
+Запуск: python -m benchmarks.bench_workers [--max-workers N] [--duration S]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import List
+
+from subscriptions import Subscription
+from workers import Supervisor
+
+STATUSES = ("reviewing", "rejected", "approved")
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбирает параметры бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=1000)
+    parser.add_argument("--homeworks", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    return parser.parse_args()
+
+
+def make_subscriptions(count: int) -> List[Subscription]:
+    """Подписки с одним чатом каждая."""
+    return [Subscription(f"token-{index}", ("1",)) for index in range(count)]
+
+
+def make_bodies(subscription: Subscription, homeworks: int) -> List[bytes]:
+    """Тела ответов подписки, по одному на каждый статус сценария."""
+    return [
+        json.dumps(
+            {
+                "homeworks": [
+                    {
+                        "id": index,
+                        "status": status,
+                        "homework_name": f"{subscription.key}__hw{index}.zip",
+                        "reviewer_comment": "",
+                        "date_updated": "2022-01-01T00:00:00Z",
+                        "lesson_name": "Итоговый проект",
+                    }
+                    for index in range(homeworks)
+                ],
+                "current_date": step,
+            }
+        ).encode()
+        for step, status in enumerate(STATUSES)
+    ]
+
+
+def poll_shard(args: argparse.Namespace, index: int, workers: int) -> None:
+    """Процесс бенчмарка: опрашивает шард и сообщает число опросов.
+
+    Процессы начинают замер одновременно, когда все подготовили тела.
+    """
+    import homework
+    from decoding import loads
+    from sharding import shard_subscriptions
+    from state import PollState
+
+    logging.getLogger("homework").setLevel(logging.CRITICAL)
+    subscriptions = make_subscriptions(args.subscriptions)
+    shard = shard_subscriptions(subscriptions, workers)[index]
+    bodies = [make_bodies(item, args.homeworks) for item in shard]
+    states = [PollState(1) for _ in shard]
+    args.barrier.wait()
+
+    polls = 0
+    rounds = 0
+    started = time.monotonic()
+    while time.monotonic() - started < args.duration:
+        step = rounds % len(STATUSES)
+        for position, state in enumerate(states):
+            response = loads(bodies[position][step])
+            homeworks = homework.check_response(response)
+            homework.process_homeworks(homeworks, state)
+            state.advance_cursor(response)
+        polls += len(states)
+        rounds += 1
+
+    args.results.put(polls / (time.monotonic() - started))
+
+
+def measure(args: argparse.Namespace, workers: int) -> float:
+    """Суммарное число опросов в секунду для `workers` процессов."""
+    supervisor = Supervisor(args, workers, target=poll_shard)
+    args.barrier = supervisor.context.Barrier(workers)
+    supervisor.start()
+    try:
+        rate = sum(args.results.get() for _ in range(workers))
+        for process in supervisor.processes.values():
+            process.join()
+        return rate
+    finally:
+        supervisor.stop()
+
+
+def main() -> None:
+    """Запускает бенчмарк."""
+    args = parse_args()
+    args.results = Supervisor(args, 1).context.Queue()
+
+    print(
+        f"подписок: {args.subscriptions}, работ в ответе: {args.homeworks}, "
+        f"ядер: {os.cpu_count()}"
+    )
+    single = None
+    for workers in range(1, args.max_workers + 1):
+        rate = measure(args, workers)
+        single = single or rate
+        print(
+            f"  процессов: {workers:<3} {rate:10.0f} опросов/с "
+            f"ускорение x{rate / single:.2f} "
+            f"({rate / single / workers:.0%} от линейного)"
+        )
+
+
+if __name__ == "__main__":
+    main()
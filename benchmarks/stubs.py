@@ -0,0 +1,278 @@
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Базовый обработчик заглушек с keep-alive и ответами JSON."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        """Учитывает новое TCP-соединение."""
+        super().setup()
+        self.server.stub.connections += 1
+
+    def send_json(
+        self, status_code: int, payload: dict, headers: Optional[dict] = None
+    ) -> None:
+        """Отправляет ответ с телом в формате JSON."""
+        body = json.dumps(payload).encode()
+        self.send_body(status_code, body, headers)
+
+    def send_body(
+        self, status_code: int, body: bytes, headers: Optional[dict] = None
+    ) -> None:
+        """Отправляет ответ с готовым телом."""
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.stub.lock:
+            self.server.stub.bytes_sent += len(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Отключает журнал запросов заглушки."""
+        pass
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """HTTP-сервер заглушки, не печатающий обрывы соединений клиентом."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        """Пропускает обрывы соединений, остальные ошибки печатает."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Локальный HTTP-сервер заглушки, работающий в отдельном потоке.
+
+    Args:
+        handler (:obj:`type`): класс обработчика запросов
+        latency (:obj:`float`): задержка перед каждым ответом (секунды)
+        error_rate (:obj:`float`): доля запросов, завершающихся ошибкой
+        seed (:obj:`int`): зерно генератора ошибок.
+    """
+
+    def __init__(
+        self,
+        handler: type,
+        latency: float = 0,
+        error_rate: float = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Инициализирует StubServer."""
+        self.httpd = StubHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.stub = self
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+
+    def simulate(self) -> bool:
+        """Выдерживает задержку и решает, вернуть ли ошибку.
+
+        Returns:
+            :obj:`bool`: True, если на запрос нужно ответить ошибкой.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    @property
+    def address(self) -> str:
+        """Адрес сервера заглушки."""
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        """Запускает заглушку."""
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Останавливает заглушку."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class PracticumStubHandler(StubHandler):
+    """Обработчик, отвечающий как эндпоинт статусов домашних работ."""
+
+    def do_GET(self) -> None:
+        """Отвечает телом из сценария или заданным телом."""
+        stub = self.server.stub
+        if stub.simulate():
+            self.send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"code": "error"}
+            )
+            return
+
+        token = self.headers.get("Authorization", "").replace("OAuth ", "")
+        body = json.dumps(stub.respond(token)).encode()
+        if not stub.etag:
+            self.send_body(stub.status_code, body)
+            return
+
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            with stub.lock:
+                stub.not_modified += 1
+            self.send_body(HTTPStatus.NOT_MODIFIED, b"", {"ETag": etag})
+            return
+        self.send_body(stub.status_code, body, {"ETag": etag})
+
+
+class PracticumStubServer(StubServer):
+    """Локальная заглушка API Практикума.
+
+    Без сценария на каждый запрос возвращается `payload`. Со сценарием
+    каждый успешный запрос токена возвращает его работу со следующим
+    статусом из `script`; момент, когда статус впервые отдан, попадает
+    в `changes`, а `current_date` ответа равен этому моменту, поэтому
+    между сменами тело ответа не меняется. С `etag` ответы содержат
+    `ETag`, а на совпавший `If-None-Match` возвращается 304.
+
+    Args:
+        payload (:obj:`dict`): тело, которое возвращается на каждый запрос
+        status_code (:obj:`int`): статус-код успешных ответов
+        script (:obj:`Sequence[str]`): статусы работы по запросам
+        cycle (:obj:`bool`): повторять сценарий по кругу
+        etag (:obj:`bool`): поддерживать условные запросы по `ETag`
+        **kwargs: параметры `StubServer` (latency, error_rate, seed).
+    """
+
+    def __init__(
+        self,
+        payload: Optional[dict] = None,
+        status_code: int = HTTPStatus.OK,
+        script: Optional[Sequence[str]] = None,
+        cycle: bool = False,
+        etag: bool = False,
+        **kwargs,
+    ) -> None:
+        """Инициализирует PracticumStubServer."""
+        super().__init__(PracticumStubHandler, **kwargs)
+        self.payload = payload or {"homeworks": [], "current_date": 0}
+        self.status_code = status_code
+        self.script = script
+        self.cycle = cycle
+        self.etag = etag
+        self.not_modified = 0
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.changes: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        self.changed_at: Dict[str, int] = {}
+
+    def respond(self, token: str) -> dict:
+        """Формирует тело ответа для токена."""
+        if not self.script:
+            return self.payload
+
+        with self.lock:
+            step = self.requests[token]
+            self.requests[token] += 1
+            if self.cycle:
+                status = self.script[step % len(self.script)]
+            else:
+                status = self.script[min(step, len(self.script) - 1)]
+            changes = self.changes[token]
+            if not changes or changes[-1][0] != status:
+                changes.append((status, time.monotonic()))
+                self.changed_at[token] = int(time.time())
+
+        return {
+            "homeworks": [{"homework_name": token, "status": status}],
+            "current_date": self.changed_at[token],
+        }
+
+    @property
+    def url(self) -> str:
+        """Адрес эндпоинта заглушки."""
+        return f"{self.address}/api/user_api/homework_statuses/"
+
+
+class TelegramStubHandler(StubHandler):
+    """Обработчик, отвечающий как метод sendMessage Bot API."""
+
+    def do_POST(self) -> None:
+        """Принимает сообщение и возвращает его в формате Bot API."""
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+
+        if stub.simulate():
+            self.send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {
+                    "ok": False,
+                    "error_code": HTTPStatus.INTERNAL_SERVER_ERROR,
+                    "description": "Internal Server Error",
+                },
+            )
+            return
+
+        result = stub.record(data)
+        self.send_json(HTTPStatus.OK, {"ok": True, "result": result})
+
+
+class TelegramStubServer(StubServer):
+    """Локальная заглушка Bot API Телеграма.
+
+    Принятые сообщения с моментом получения попадают в `messages`.
+
+    Args:
+        **kwargs: параметры `StubServer` (latency, error_rate, seed).
+    """
+
+    def __init__(self, **kwargs) -> None:
+        """Инициализирует TelegramStubServer."""
+        super().__init__(TelegramStubHandler, **kwargs)
+        self.messages: List[Tuple[str, str, float]] = []
+
+    def record(self, data: dict) -> dict:
+        """Сохраняет сообщение и возвращает его в формате Bot API."""
+        received = time.monotonic()
+        with self.lock:
+            self.messages.append(
+                (str(data["chat_id"]), data["text"], received)
+            )
+            message_id = len(self.messages)
+
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": data["chat_id"], "type": "private"},
+            "text": data["text"],
+        }
+
+    @property
+    def api_url(self) -> str:
+        """Шаблон адреса sendMessage, как `async_engine.TELEGRAM_API_URL`."""
+        return f"{self.address}/bot{{token}}/sendMessage"
+
+    @property
+    def base_url(self) -> str:
+        """Базовый адрес для `telegram.Bot(base_url=...)`."""
+        return f"{self.address}/bot"
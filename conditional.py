@@ -0,0 +1,99 @@
+import hashlib
+import re
+from typing import Mapping, Optional, Tuple
+
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+
+
+def body_digest(body: bytes) -> Tuple[bytes, Optional[int]]:
+    """Ф-я вычисления хеша тела ответа без поля `current_date`.
+
+    API возвращает в `current_date` время сервера, поэтому тело меняется
+    на каждом опросе, даже если список работ тот же. Поле вырезается из
+    байтов до хеширования, а его значение возвращается отдельно.
+
+    Args:
+        body (:obj:`bytes`): тело ответа
+
+    Returns:
+        :obj:`tuple`: хеш тела и `current_date` (None, если поля нет).
+    """
+    match = CURRENT_DATE.search(body)
+    if match is None:
+        return hashlib.blake2b(body, digest_size=16).digest(), None
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(body[: match.start()])
+    digest.update(body[match.end():])
+    return digest.digest(), int(match.group(1))
+
+
+class ResponseValidators:
+    """Валидаторы последнего обработанного ответа API для подписки.
+
+    По `ETag` и `Last-Modified` строятся условные заголовки запроса, а
+    хеш тела без `current_date` позволяет пропустить разбор ответа, если
+    сервер валидаторы не прислал, но вернул тот же список работ; его
+    `current_date` остается в `current_date`, чтобы курсор все равно
+    сдвинулся (`PollState.advance_unchanged`). Новые значения запоминаются
+    только после успешной обработки ответа (`commit`), чтобы ошибка
+    разбора повторилась на следующем опросе, а не была пропущена.
+    """
+
+    __slots__ = ("etag", "last_modified", "digest", "pending", "current_date")
+
+    def __init__(self) -> None:
+        """Инициализирует ResponseValidators."""
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[bytes] = None
+        self.pending: Optional[tuple] = None
+        self.current_date: Optional[int] = None
+
+    def request_headers(self, headers: Mapping[str, str]) -> dict:
+        """Добавляет к заголовкам запроса условные заголовки.
+
+        Args:
+            headers (:obj:`Mapping`): заголовки запроса
+
+        Returns:
+            :obj:`dict`: заголовки с `If-None-Match`/`If-Modified-Since`.
+        """
+        headers = dict(headers)
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def is_unchanged(self, headers: Mapping[str, str], body: bytes) -> bool:
+        """Проверяет, совпадает ли тело ответа с последним обработанным.
+
+        Тела сравниваются без `current_date`. Если тело новое, его
+        валидаторы ждут подтверждения в `commit`.
+
+        Args:
+            headers (:obj:`Mapping`): заголовки ответа
+            body (:obj:`bytes`): тело ответа
+
+        Returns:
+            :obj:`bool`: True, если тело без `current_date` побайтно
+            совпадает с последним.
+        """
+        digest, current_date = body_digest(body)
+        if digest == self.digest:
+            self.current_date = current_date
+            return True
+
+        self.pending = (
+            headers.get("ETag"),
+            headers.get("Last-Modified"),
+            digest,
+        )
+        return False
+
+    def commit(self) -> None:
+        """Запоминает валидаторы успешно обработанного ответа."""
+        if self.pending is not None:
+            self.etag, self.last_modified, self.digest = self.pending
+            self.pending = None
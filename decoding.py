@@ -0,0 +1,28 @@
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def get_loads() -> Callable[[Union[bytes, str]], Any]:
+    """Ф-я выбора декодера JSON.
+
+    `orjson` используется, если установлен: его `JSONDecodeError`
+    наследует `json.JSONDecodeError`, поэтому обработка ошибок не
+    зависит от выбранного декодера.
+
+    Returns:
+        :obj:`Callable`: функция разбора JSON из байтов или строки.
+    """
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+loads = get_loads()
+DECODER = "orjson" if orjson is not None else "json"
@@ -0,0 +1,96 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+ERROR_DEDUP_TTL = 60 * 60
+ERROR_DEDUP_MAXSIZE = 10_000
+ERROR_MESSAGE_LIMIT = 200
+
+_NUMBERS = re.compile(r"\d{4,}")
+_SERVER_ERRORS = re.compile(r"\b5\d\d\b")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Ф-я приведения текста ошибки к виду, не зависящему от деталей.
+
+    Длинные числа (временные метки, идентификаторы) заменяются на `#`,
+    коды ошибок сервера 5xx объединяются, а остальные короткие числа
+    остаются: 502 и 503 дают одно уведомление, а 401 и 500 — разные.
+    Пробельные символы схлопываются, длина ограничивается.
+
+    Args:
+        message (:obj:`str`): текст ошибки
+
+    Returns:
+        :obj:`str`: нормализованный текст.
+    """
+    message = _NUMBERS.sub("#", message)
+    message = _SERVER_ERRORS.sub("5xx", message)
+    return _SPACES.sub(" ", message).strip()[:ERROR_MESSAGE_LIMIT]
+
+
+class ErrorDedupCache:
+    """Ограниченный кэш отправленных уведомлений об ошибках.
+
+    Ключ — подписка, класс исключения и нормализованный текст. Повтор
+    той же ошибки в течение `ttl` секунд не приводит к новому
+    уведомлению. При переполнении вытесняются давно не встречавшиеся
+    ошибки, поэтому память не растет с числом подписок.
+
+    Args:
+        ttl (:obj:`float`): окно подавления повторов (секунды)
+        maxsize (:obj:`int`): максимальное количество ключей
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        ttl: float = ERROR_DEDUP_TTL,
+        maxsize: int = ERROR_DEDUP_MAXSIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует ErrorDedupCache."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries: "OrderedDict[Tuple[str, str, str], float]" = (
+            OrderedDict()
+        )
+        self.lock = threading.Lock()
+
+    def should_notify(self, subscription_key: str, error: Exception) -> bool:
+        """Проверяет, нужно ли сообщать об ошибке, и запоминает ее.
+
+        Args:
+            subscription_key (:obj:`str`): ключ подписки
+            error (:obj:`Exception`): ошибка
+
+        Returns:
+            :obj:`bool`: True, если об ошибке еще не сообщали в окне.
+        """
+        key = (
+            subscription_key,
+            type(error).__name__,
+            normalize_message(str(error)),
+        )
+        now = self.clock()
+
+        with self.lock:
+            notified_at = self.entries.get(key)
+
+            if notified_at is not None and now - notified_at < self.ttl:
+                self.entries.move_to_end(key)
+                return False
+
+            self.entries[key] = now
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            return True
+
+    def __len__(self) -> int:
+        """Количество запомненных ошибок."""
+        return len(self.entries)
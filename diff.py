@@ -0,0 +1,56 @@
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from records import Homework
+
+
+class Transition(NamedTuple):
+    """Смена статуса одной домашней работы."""
+
+    homework: Union[Homework, dict]
+    homework_name: Optional[str]
+    previous: Optional[str]
+    status: Optional[str]
+
+
+def diff_homeworks(
+    homeworks: List[dict], known: Dict[str, str]
+) -> List[Transition]:
+    """Ф-я сравнения списка работ из ответа API с известными статусами.
+
+    Работы индексируются по `homework_name` за один проход; если работа
+    встречается несколько раз, учитывается первая запись (API отдает
+    работы от новых к старым). Работы без имени или статуса попадают в
+    результат как есть, чтобы `parse_status` сообщил об ошибке, а
+    остальные — записями `Homework` с общими экземплярами статусов.
+
+    Args:
+        homeworks (:obj:`list`): список домашних работ из ответа API
+        known (:obj:`dict`): последние известные статусы по именам работ
+
+    Returns:
+        :obj:`list`: смены статусов от старых к новым.
+    """
+    index: Dict[Optional[str], dict] = {}
+    malformed: List[dict] = []
+
+    for homework in homeworks:
+        homework_name = homework.get("homework_name")
+        if homework_name is None or "status" not in homework:
+            malformed.append(homework)
+        else:
+            index.setdefault(homework_name, homework)
+
+    transitions = [
+        Transition(homework, None, None, homework.get("status"))
+        for homework in malformed
+    ]
+
+    for homework_name, homework in reversed(index.items()):
+        previous = known.get(homework_name)
+        if previous != homework["status"]:
+            record = Homework.from_dict(homework)
+            transitions.append(
+                Transition(record, homework_name, previous, record.status)
+            )
+
+    return transitions
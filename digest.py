@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import DIGEST_COALESCED
+from templates import DEFAULT_LOCALE, DIGEST_HEADERS
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+DIGEST_WINDOW = 0.0
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+Item = Tuple[str, Optional[Callable[[Optional[bool]], None]]]
+
+
+def format_digest(texts: List[str], header: str) -> str:
+    """Ф-я сборки одного сообщения из нескольких уведомлений.
+
+    Args:
+        texts (:obj:`list`): тексты уведомлений от старых к новым
+        header (:obj:`str`): заголовок с полем `{count}`
+
+    Returns:
+        :obj:`str`: текст дайджеста.
+    """
+    return "\n\n".join([header.format(count=len(texts))] + texts)
+
+
+def split_digest(
+    items: List[Item], header: str, limit: int = TELEGRAM_MESSAGE_LIMIT
+) -> List[List[Item]]:
+    """Ф-я разбиения уведомлений на дайджесты не длиннее `limit`.
+
+    Args:
+        items (:obj:`list`): пары (текст, обратный вызов)
+        header (:obj:`str`): заголовок дайджеста
+        limit (:obj:`int`): максимальная длина сообщения
+
+    Returns:
+        :obj:`list`: группы уведомлений по дайджестам.
+    """
+    groups: List[List[Item]] = []
+    length = 0
+
+    for item in items:
+        size = len(item[0]) + 2
+        if not groups or length + size > limit:
+            groups.append([])
+            length = len(header.format(count=len(items)))
+        groups[-1].append(item)
+        length += size
+
+    return groups
+
+
+class DigestQueue:
+    """Объединение уведомлений одного чата в дайджест.
+
+    Стоит перед очередью отправки и имеет тот же метод `put`. Первое
+    уведомление в чат уходит сразу и открывает окно `window` секунд;
+    уведомления, пришедшие в окне, копятся и по его окончании уходят
+    одним сообщением, а окно открывается снова. Чат без новых
+    уведомлений за окно возвращается к немедленной отправке. Журнал
+    `Outbox` получает результат доставки каждого исходного уведомления.
+
+    Args:
+        queue: очередь `SendQueue` или `AsyncSendQueue`
+        window (:obj:`float`): окно объединения (секунды)
+        header (:obj:`str`): заголовок дайджеста с полем `{count}`
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        queue,
+        window: float,
+        header: str = DIGEST_HEADERS[DEFAULT_LOCALE],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует DigestQueue."""
+        self.queue = queue
+        self.window = window
+        self.header = header
+        self.clock = clock
+        self.tick = min(1.0, window / 4)
+        self.windows: Dict[str, Tuple[float, List[Item]]] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def put(
+        self,
+        chat_id: str,
+        text: str,
+        on_done: Optional[Callable[[Optional[bool]], None]] = None,
+    ) -> None:
+        """Отправляет уведомление сразу или откладывает его в дайджест.
+
+        Args:
+            chat_id (:obj:`str`): идентификатор чата
+            text (:obj:`str`): текст сообщения
+            on_done (:obj:`Callable`): вызывается с результатом отправки.
+        """
+        with self.lock:
+            now = self.clock()
+            window = self.windows.get(chat_id)
+            if window is not None and now < window[0]:
+                window[1].append((text, on_done))
+                return
+            self.windows[chat_id] = (now + self.window, [])
+
+        self.queue.put(chat_id, text, on_done)
+
+    def flush(self, force: bool = False) -> int:
+        """Отправляет накопленные уведомления чатов с истекшим окном.
+
+        Args:
+            force (:obj:`bool`): отправить накопленное во всех чатах
+
+        Returns:
+            :obj:`int`: количество отправленных сообщений.
+        """
+        with self.lock:
+            now = self.clock()
+            due = [
+                (chat_id, items)
+                for chat_id, (deadline, items) in self.windows.items()
+                if force or deadline <= now
+            ]
+            for chat_id, items in due:
+                if items and not force:
+                    self.windows[chat_id] = (now + self.window, [])
+                else:
+                    del self.windows[chat_id]
+
+        sent = 0
+        for chat_id, items in due:
+            for group in split_digest(items, self.header) if items else []:
+                self._send(chat_id, group)
+                sent += 1
+        return sent
+
+    def _send(self, chat_id: str, items: List[Item]) -> None:
+        if len(items) == 1:
+            self.queue.put(chat_id, *items[0])
+            return
+
+        callbacks = [on_done for _, on_done in items if on_done is not None]
+
+        def on_done(delivered: Optional[bool]) -> None:
+            for callback in callbacks:
+                callback(delivered)
+
+        DIGEST_COALESCED.inc(len(items))
+        logger.debug(
+            'В чат "%s" отправляется дайджест из %d уведомлений',
+            chat_id,
+            len(items),
+        )
+        self.queue.put(
+            chat_id,
+            format_digest([text for text, _ in items], self.header),
+            on_done,
+        )
+
+    def qsize(self) -> int:
+        """Количество отложенных уведомлений."""
+        with self.lock:
+            return sum(len(items) for _, items in self.windows.values())
+
+    def start(self) -> "DigestQueue":
+        """Запускает поток отправки дайджестов."""
+        self.thread = threading.Thread(
+            target=self._run, name="digest", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.tick):
+            self.flush()
+
+    async def run_async(self) -> None:
+        """Корутина отправки дайджестов для асинхронного движка."""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.flush()
+
+    def close(self) -> None:
+        """Останавливает поток и сразу отправляет все отложенное."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush(force=True)
@@ -86,3 +86,24 @@ class JSONDecodeException(Exception):
             return f"Ошибка при преобразовании JSON из: {self.message}."
         else:
             return "Ошибка при преобразовании JSON."
+
+
+class CircuitOpenException(Exception):
+    """Возникает, когда запросы к API приостановлены после серии ошибок."""
+
+    def __init__(self, *args) -> None:
+        """Инициализирует CircuitOpenException."""
+        if args:
+            self.message = args[0]
+        else:
+            self.message = None
+
+    def __str__(self) -> str:
+        """Формирует строковое представление CircuitOpenException."""
+        if self.message:
+            return (
+                "Запросы к API приостановлены после серии ошибок, "
+                f"повтор через {self.message:.0f} с."
+            )
+        else:
+            return "Запросы к API приостановлены после серии ошибок."
@@ -1,31 +1,70 @@
-import json as simplejson
 import logging
 import os
-import sys
 import time
 from http import HTTPStatus
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Union
 
-import requests
-import telegram
-from dotenv import load_dotenv
-from requests import RequestException
-
+from conditional import ResponseValidators
+from decoding import JSONDecodeError, loads
+from dedup import ErrorDedupCache
+from diff import diff_homeworks
 from exceptions import (
     APIRequestException,
+    CircuitOpenException,
     IncorrectHomeworkStatus,
     IncorrectStatusResponseCode,
     JSONDecodeException,
     NoExistToken,
 )
+from log_setup import LOG_LEVEL, log_call, parse_levels
+from metrics import (
+    POLL_EXCEPTIONS,
+    PRACTICUM_NOT_MODIFIED,
+    PRACTICUM_REQUEST_DURATION,
+    QUEUE_DEPTH,
+    STATUS_TRANSITIONS,
+    TELEGRAM_SEND_FAILURES,
+)
+from records import Homework, register_statuses
+from resilience import CircuitBreaker, backoff_delay, is_retryable
+from schema import validate_response
+from scheduler import (
+    POLL_INTERVAL_MAX,
+    POLL_INTERVAL_MIN,
+    AdaptiveInterval,
+    run_timing_wheel,
+    slot_offset,
+)
+from state import PollState
+from subscriptions import (
+    Subscription,
+    SubscriptionRegistry,
+    load_subscriptions,
+)
+from templates import (
+    DEFAULT_LOCALE,
+    DIGEST_HEADERS,
+    VERDICTS_EN,
+    MessageTemplates,
+    Notification,
+)
 
-load_dotenv()
+if TYPE_CHECKING:
+    import argparse
+    import logging.handlers
 
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-logger.addHandler(handler)
-handler.setFormatter(formatter)
+    import requests
+    import telegram
+
+    from api_client import PracticumClient
+    from digest import DigestQueue
+    from leases import ShardLeases
+    from outbox import Outbox, OutboxSender
+    from replay import ResponseRecorder
+    from shutdown import GracefulShutdown
+    from state import StateStore
+
+logger = logging.getLogger("homework")
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
@@ -37,16 +76,36 @@ PRACTICUM_ENDPOINT = (
 )
 PRACTICUM_HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
+STATE_FILE = "homework_state.db"
+OUTBOX_FILE = "outbox.jsonl"
+
+_practicum_client: Optional["PracticumClient"] = None
+circuit_breaker = CircuitBreaker()
+error_dedup = ErrorDedupCache()
+recorder: Optional["ResponseRecorder"] = None
+
+RECORDED_ERRORS = (
+    APIRequestException,
+    IncorrectStatusResponseCode,
+    JSONDecodeException,
+)
+
 HOMEWORK_STATUSES = {
     "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания.",
 }
+register_statuses(HOMEWORK_STATUSES)
+
+MESSAGE_LOCALE = os.getenv("MESSAGE_LOCALE", DEFAULT_LOCALE)
+MESSAGE_TEMPLATES = MessageTemplates(
+    {DEFAULT_LOCALE: HOMEWORK_STATUSES, "en": VERDICTS_EN}
+)
 
 
 def check_tokens() -> bool:
     """Ф-я проверки токенов."""
-    logger.info('Запущена функция "check_tokens"')
+    log_call(logger, "check_tokens")
     tokens = (
         "PRACTICUM_TOKEN",
         "TELEGRAM_TOKEN",
@@ -59,11 +118,50 @@ def check_tokens() -> bool:
             no_valid_tokens.append(name)
 
     if no_valid_tokens:
-        logger.critical(f'Не задано значение для {", ".join(no_valid_tokens)}')
+        logger.critical(
+            "Не задано значение для %s", ", ".join(no_valid_tokens)
+        )
 
     return PRACTICUM_TOKEN and TELEGRAM_TOKEN and TELEGRAM_CHAT_ID
 
 
+def load_config() -> None:
+    """Ф-я загрузки настроек из файла `.env` и переменных окружения."""
+    global TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, PRACTICUM_TOKEN
+    global PRACTICUM_HEADERS, MESSAGE_LOCALE
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+    TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+    PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
+    PRACTICUM_HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
+    MESSAGE_LOCALE = os.getenv("MESSAGE_LOCALE", DEFAULT_LOCALE)
+
+
+def get_practicum_client() -> "PracticumClient":
+    """Ф-я получения общего клиента API Практикума.
+
+    Клиент создается при первом обращении и переиспользуется между
+    опросами, чтобы не устанавливать TCP/TLS-соединение каждый раз.
+
+    Returns:
+        :obj:`PracticumClient`: клиент API.
+    """
+    global _practicum_client
+
+    if _practicum_client is None:
+        from api_client import PracticumClient
+
+        _practicum_client = PracticumClient(
+            PRACTICUM_ENDPOINT, headers=PRACTICUM_HEADERS
+        )
+
+    return _practicum_client
+
+
 def get_api_answer(current_timestamp: int) -> dict:
     """Ф-я получения ответа API.
 
@@ -73,26 +171,97 @@ def get_api_answer(current_timestamp: int) -> dict:
     Returns:
         :obj:`dict`: словарь с результатом запроса.
     """
-    logger.info('Запущена функция "get_api_answer"')
+    log_call(logger, "get_api_answer")
+
+    return request_homework_statuses(current_timestamp, PRACTICUM_HEADERS)
+
+
+def request_homework_statuses(
+    current_timestamp: int,
+    headers: dict,
+    validators: Optional[ResponseValidators] = None,
+) -> Optional[dict]:
+    """Ф-я запроса статусов домашних работ с заданными заголовками.
+
+    С валидаторами запрос становится условным: ответ 304 или тело,
+    побайтно совпадающее с последним обработанным, не разбирается.
+
+    Args:
+        current_timestamp (:obj:`int`): текущая временная метка
+        headers (:obj:`dict`): заголовки с токеном Практикума
+        validators (:obj:`ResponseValidators`): валидаторы подписки
+
+    Returns:
+        :obj:`dict`: словарь с результатом запроса или None, если ответ
+        не изменился.
+    """
+    from requests import RequestException
 
     timestamp = current_timestamp or int(time.time())
     params = {"from_date": timestamp}
+    if validators is not None:
+        headers = validators.request_headers(headers)
 
+    started = time.perf_counter()
     try:
-        homework_statuses = requests.get(
-            PRACTICUM_ENDPOINT, headers=PRACTICUM_HEADERS, params=params
+        homework_statuses = get_practicum_client().get(
+            params, headers=headers
         )
 
     except RequestException as exc:
+        PRACTICUM_REQUEST_DURATION.observe(
+            time.perf_counter() - started, status_code="error"
+        )
         raise APIRequestException("Не удалось получить ответ от API.") from exc
 
+    PRACTICUM_REQUEST_DURATION.observe(
+        time.perf_counter() - started,
+        status_code=homework_statuses.status_code,
+    )
+
+    return decode_homework_statuses(homework_statuses, validators)
+
+
+def decode_homework_statuses(
+    homework_statuses: "requests.Response",
+    validators: Optional[ResponseValidators] = None,
+) -> Optional[dict]:
+    """Ф-я разбора ответа API со статусами домашних работ.
+
+    Тело разбирается быстрым декодером `decoding.loads`; без валидаторов
+    используется `Response.json()`.
+
+    Args:
+        homework_statuses (:obj:`requests.Response`): ответ API
+        validators (:obj:`ResponseValidators`): валидаторы подписки
+
+    Returns:
+        :obj:`dict`: словарь с результатом запроса или None, если ответ
+        не изменился.
+    """
+    if validators is not None:
+        if homework_statuses.status_code == HTTPStatus.NOT_MODIFIED:
+            PRACTICUM_NOT_MODIFIED.inc(reason="304")
+            return None
+
+        if homework_statuses.status_code == HTTPStatus.OK and (
+            validators.is_unchanged(
+                homework_statuses.headers, homework_statuses.content
+            )
+        ):
+            PRACTICUM_NOT_MODIFIED.inc(reason="hash")
+            return None
+
     try:
         if homework_statuses.status_code != HTTPStatus.OK:
             raise IncorrectStatusResponseCode(homework_statuses.status_code)
 
+        if validators is not None:
+            return loads(homework_statuses.content)
+
         return homework_statuses.json()
 
-    except simplejson.JSONDecodeError as exc:
+    except JSONDecodeError as exc:
         raise JSONDecodeException(homework_statuses) from exc
 
 
@@ -105,148 +274,852 @@ def check_response(response: dict) -> list:
     Returns:
         :obj:`list`: список домашних работ.
     """
-    logger.info('Запущена функция "check_response"')
-
-    if not isinstance(response, dict):
-        message = f"Запрос вернул результат типа не Dict, а {type(response)}."
-        logging.error(message)
-        raise TypeError(message)
+    log_call(logger, "check_response")
 
-    if "homeworks" not in response:
-        message = 'Ответ не содержит ключа "homeworks".'
-        logging.error(message)
-        raise KeyError(message)
-
-    result = response.get("homeworks")
+    try:
+        result = validate_response(response)
 
-    if not isinstance(result, list):
-        message = '"homeworks" не является списком.'
-        logging.error(message)
-        raise TypeError(message)
+    except (TypeError, KeyError) as error:
+        logger.error(error.args[0])
+        raise
 
     if len(result) == 0:
-        logging.debug('Список "homeworks" пуст.')
+        logger.debug('Список "homeworks" пуст.')
 
     return result
 
 
-def parse_status(homework: dict) -> str:
-    """Ф-я извлечения из информации о конкретной домашней работе ее статуса.
+def parse_notification(homework: Union[Homework, dict]) -> Notification:
+    """Ф-я получения уведомления о статусе конкретной домашней работы.
 
     Args:
-        response (:obj:`dict`): один элемент из списка домашних работ
+        homework (:obj:`Homework` | :obj:`dict`): запись о работе или один
+            элемент из списка домашних работ
 
     Returns:
-        :obj:`str`: строка с вердиктом.
+        :obj:`Notification`: имя работы, статус, вердикт и текст сообщения.
     """
-    logger.info('Запущена функция "parse_status"')
-
-    for key in ("homework_name", "status"):
-        if key not in homework:
-            logger.error(f'Отсутствует ожидаемый ключ "{key}".')
-            raise KeyError(f'Отсутствует ожидаемый ключ "{key}".')
-
-    homework_name: str = homework["homework_name"]
-    homework_status: str = homework["status"]
-
-    if homework_status in HOMEWORK_STATUSES:
-        verdict: str = HOMEWORK_STATUSES[homework_status]
+    if isinstance(homework, Homework):
+        homework_name = homework.homework_name
+        homework_status = homework.status
     else:
+        try:
+            homework_name = homework["homework_name"]
+            homework_status = homework["status"]
+        except KeyError as error:
+            logger.error('Отсутствует ожидаемый ключ "%s".', error.args[0])
+            raise KeyError(
+                f'Отсутствует ожидаемый ключ "{error.args[0]}".'
+            ) from None
+
+    try:
+        return MESSAGE_TEMPLATES.render(
+            homework_name, homework_status, MESSAGE_LOCALE
+        )
+    except KeyError:
         logger.error(
-            f"Недокументированный статус домашней работы({homework_status})"
+            "Недокументированный статус домашней работы(%s)", homework_status
         )
-        raise IncorrectHomeworkStatus(homework_status)
+        raise IncorrectHomeworkStatus(homework_status) from None
+
+
+def parse_status(homework: Union[Homework, dict]) -> str:
+    """Ф-я извлечения из информации о конкретной домашней работе ее статуса.
 
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    Args:
+        response (:obj:`Homework` | :obj:`dict`): запись о работе или один
+            элемент из списка домашних работ
+
+    Returns:
+        :obj:`str`: строка с вердиктом.
+    """
+    log_call(logger, "parse_status")
 
+    return parse_notification(homework).text
 
-def send_message(bot: telegram.Bot, message: str) -> None:
+
+def send_message(bot: "telegram.Bot", message: str) -> None:
     """Ф-я отправки сообщения ботом в Телеграм.
 
     Args:
         response (:obj:`telegram.Bot`): объект бот
         message (:obj:`str`): сообщение для отправления.
     """
-    logger.info('Запущена функция "send_message"')
+    log_call(logger, "send_message")
+
+    send_message_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to_chat(
+    bot: "telegram.Bot", chat_id: str, message: str
+) -> None:
+    """Ф-я отправки сообщения ботом в заданный чат.
+
+    Args:
+        bot (:obj:`telegram.Bot`): объект бот
+        chat_id (:obj:`str`): идентификатор чата
+        message (:obj:`str`): сообщение для отправления.
+    """
+    import telegram
+
+    from send_queue import send_timer
 
     try:
-        logger.debug(f'Попытка обращения к чату "{TELEGRAM_CHAT_ID}"')
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        logger.debug('Попытка обращения к чату "%s"', chat_id)
+        with send_timer():
+            bot.send_message(chat_id=chat_id, text=message)
 
     except telegram.error.TelegramError as error:
+        TELEGRAM_SEND_FAILURES.inc(error=type(error).__name__)
         logger.exception(
-            f'Не удалось отправить сообщение "{message}".\n Ошибка:"{error}"',
-            exc_info=True,
+            'Не удалось отправить сообщение "%s".\n Ошибка:"%s"',
+            message,
+            error,
         )
 
     else:
-        logger.info(f'Успешно отправлено сообщение: "{message}"')
+        logger.info('Успешно отправлено сообщение: "%s"', message)
+
+
+def notify(
+    sender: "OutboxSender", subscription: Subscription, message: str
+) -> None:
+    """Ф-я постановки сообщения в очередь для всех чатов подписки.
+
+    Args:
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): подписка
+        message (:obj:`str`): сообщение для отправления.
+    """
+    for chat_id in subscription.chat_ids:
+        sender.put(chat_id, message)
 
 
-def get_bot() -> telegram.Bot:
+def get_bot() -> "telegram.Bot":
     """Ф-я создания бота.
 
+    Пул соединений бота рассчитан на все потоки `SendQueue`, иначе
+    лишние соединения закрываются и отправки заново устанавливают TLS.
+
     Returns:
         :obj:`telegram.Bot`: объект бот.
     """
+    import telegram
+    from telegram.utils.request import Request
+
+    from send_queue import SEND_QUEUE_WORKERS
+
     try:
-        bot = telegram.Bot(token=TELEGRAM_TOKEN)
+        bot = telegram.Bot(
+            token=TELEGRAM_TOKEN,
+            request=Request(con_pool_size=SEND_QUEUE_WORKERS + 1),
+        )
         logger.debug("Подключение к боту успешно")
         return bot
 
     except telegram.error.TelegramError as error:
-        logger.exception(f"Не удалось подключиться к боту. Ошибка: {error}.")
-
+        logger.exception("Не удалось подключиться к боту. Ошибка: %s.", error)
 
-def main() -> None:
-    """Основная логика работы бота."""
-    if not check_tokens():
-        logger.critical("Были переданы не все требуемые переменные окружения")
-        raise NoExistToken()
 
-    logger.debug("Токены прошли проверку.")
+def process_homeworks(
+    homeworks: list, state: PollState, errors: Optional[list] = None
+) -> List[Notification]:
+    """Ф-я получения уведомлений обо всех сменах статусов в ответе.
 
-    bot = get_bot()
+    Каждая смена разбирается `parse_notification` отдельно: статус
+    работы в состоянии подписки обновляется, только если смена
+    разобрана. Работа с недокументированным статусом или без нужного
+    ключа не мешает остальным — ошибка попадает в `errors`, а ее статус
+    не запоминается.
 
-    current_timestamp: int = int(time.time())
-    last_status: str = ""
+    Args:
+        homeworks (:obj:`list`): список домашних работ из ответа API
+        state (:obj:`PollState`): состояние опроса подписки
+        errors (:obj:`list`): список, в который добавляются ошибки
+            разбора отдельных работ
 
-    hw_last_error_associations: dict = {}
-    cur_hw_name: str = ""
+    Returns:
+        :obj:`list`: уведомления о сменах статусов от старых к новым.
+    """
+    messages = []
 
-    while True:
+    for transition in diff_homeworks(homeworks, state.statuses):
         try:
-            response = get_api_answer(current_timestamp)
-            logger.debug(f'Ф-я "get_api_answer" вернула: \n{response}\n')
-            homeworks = check_response(response)
-
-            if len(homeworks) != 0:
-                current_status: str = parse_status(homeworks[0])
-                cur_hw_name = current_status[46:current_status.find(".zip")]
-
-                if current_status != last_status:
-                    send_message(bot, current_status)
-                    logger.debug(
-                        f'Ф-я "parse_status" вернула "{current_status}"'
-                    )
-                last_status = current_status
-                current_timestamp = int(time.time())
-            else:
-                logger.debug("Ничего нового...")
-
-        except Exception as error:
-            if cur_hw_name:
-                if hw_last_error_associations[cur_hw_name] != error:
-                    logger.exception(error)
-                    send_message(bot, error)
-                    hw_last_error_associations[cur_hw_name] = error
-                    logger.debug(hw_last_error_associations)
-            else:
-                logger.exception(error)
-                send_message(bot, error)
+            messages.append(parse_notification(transition.homework))
+        except (KeyError, IncorrectHomeworkStatus) as error:
+            if errors is not None:
+                errors.append(error)
+            continue
+
+        state.statuses[transition.homework_name] = transition.status
+        state.record_status(transition.status)
+        STATUS_TRANSITIONS.inc(status=transition.status)
+
+    return messages
+
+
+def report_homework_errors(
+    sender: "OutboxSender",
+    subscription: Subscription,
+    state: PollState,
+    errors: list,
+) -> None:
+    """Ф-я отправки сообщений об ошибках разбора отдельных работ.
+
+    Сообщения проходят тот же путь, что и ошибки опроса: одинаковые
+    ошибки подписки отправляются один раз (`error_dedup`).
+
+    Args:
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): опрашиваемая подписка
+        state (:obj:`PollState`): состояние опроса подписки
+        errors (:obj:`list`): ошибки из `process_homeworks`.
+    """
+    for error in errors:
+        POLL_EXCEPTIONS.inc(exception=type(error).__name__)
+        state.last_error = str(error)
+        if error_dedup.should_notify(subscription.key, error):
+            notify(sender, subscription, str(error))
+
+
+def record_response(
+    key: str,
+    started: float,
+    response: Optional[dict] = None,
+    error: Optional[Exception] = None,
+) -> None:
+    """Ф-я записи ответа API, если включена запись (`--record-file`).
+
+    Из ошибок записываются только ошибки самого запроса; некорректный
+    ответ записывается как есть и при воспроизведении дает ту же ошибку.
+
+    Args:
+        key (:obj:`str`): ключ подписки
+        started (:obj:`float`): момент начала запроса (`perf_counter`)
+        response (:obj:`dict`): ответ API или None, если не изменился
+        error (:obj:`Exception`): исключение запроса.
+    """
+    if recorder is None:
+        return
+    if error is not None and not isinstance(error, RECORDED_ERRORS):
+        return
+
+    recorder.record(
+        key,
+        time.perf_counter() - started,
+        response,
+        None if error is None else type(error).__name__,
+    )
+
+
+def poll_subscription(
+    sender: "OutboxSender", subscription: Subscription, state: PollState
+) -> None:
+    """Ф-я одного цикла опроса статусов для подписки.
+
+    Args:
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): опрашиваемая подписка
+        state (:obj:`PollState`): состояние опроса подписки.
+    """
+    started = time.perf_counter()
+    try:
+        with circuit_breaker.guard():
+            response = request_homework_statuses(
+                state.current_timestamp, subscription.headers, state.validators
+            )
+        handle_response(sender, subscription, state, started, response)
+
+    except Exception as error:
+        handle_poll_error(sender, subscription, state, started, error)
+
+
+def handle_response(
+    sender: "OutboxSender",
+    subscription: Subscription,
+    state: PollState,
+    started: float,
+    response: Optional[dict],
+) -> None:
+    """Ф-я обработки ответа API, общая для синхронного и async-движков.
+
+    Записывает ответ, рассылает уведомления о сменах статусов, сдвигает
+    курсор и подтверждает валидаторы ответа.
+
+    Args:
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): опрашиваемая подписка
+        state (:obj:`PollState`): состояние опроса подписки
+        started (:obj:`float`): момент начала запроса (`perf_counter`)
+        response (:obj:`dict`): ответ API или None, если не изменился.
+    """
+    record_response(subscription.key, started, response)
+    if response is None:
+        logger.debug("Ответ API не изменился")
+        state.advance_unchanged()
+        state.last_error = ""
+        state.failures = 0
+        return
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Ф-я "get_api_answer" вернула: \n%s\n', response)
+    homeworks = check_response(response)
+
+    if len(homeworks) == 0:
+        logger.debug("Ничего нового...")
+
+    errors: list = []
+    for notification in process_homeworks(homeworks, state, errors):
+        notify(sender, subscription, notification.text)
+        logger.debug('Ф-я "parse_status" вернула "%s"', notification.text)
+    state.advance_cursor(response)
+    state.validators.commit()
+    state.last_error = ""
+    state.failures = 0
+    report_homework_errors(sender, subscription, state, errors)
+
+
+def handle_poll_error(
+    sender: "OutboxSender",
+    subscription: Subscription,
+    state: PollState,
+    started: float,
+    error: Exception,
+) -> None:
+    """Ф-я обработки ошибки опроса, общая для синхронного и async-движков.
+
+    Args:
+        sender (:obj:`OutboxSender`): отправитель уведомлений
+        subscription (:obj:`Subscription`): опрашиваемая подписка
+        state (:obj:`PollState`): состояние опроса подписки
+        started (:obj:`float`): момент начала запроса (`perf_counter`)
+        error (:obj:`Exception`): ошибка запроса или обработки ответа.
+    """
+    POLL_EXCEPTIONS.inc(exception=type(error).__name__)
+    if isinstance(error, CircuitOpenException):
+        logger.warning(error)
+        state.failures += 1
+        return
+
+    logger.exception(error)
+    record_response(subscription.key, started, error=error)
+    if is_retryable(error):
+        state.failures += 1
+    state.last_error = str(error)
+    if error_dedup.should_notify(subscription.key, error):
+        notify(sender, subscription, str(error))
+
+
+def next_poll_interval(state: PollState, policy: AdaptiveInterval) -> float:
+    """Ф-я расчета паузы до следующего опроса подписки.
+
+    После ошибок API пауза растет экспоненциально с джиттером, а пока
+    предохранитель разомкнут, все подписки ждут его восстановления.
+
+    Args:
+        state (:obj:`PollState`): состояние опроса подписки
+        policy (:obj:`AdaptiveInterval`): политика интервала опроса
+
+    Returns:
+        :obj:`float`: пауза до следующего опроса (секунды).
+    """
+    if state.failures:
+        return circuit_breaker.retry_in() + backoff_delay(state.failures)
+
+    return policy.next_interval(state.homework_status, state.since_change())
+
+
+def first_poll_delay(
+    key: str,
+    state: Optional[PollState],
+    policy: AdaptiveInterval,
+    period: float,
+) -> float:
+    """Ф-я расчета паузы до первого опроса подписки после запуска.
+
+    Подписка без сохраненного состояния опрашивается в своем слоте
+    внутри `period`. Подписка с состоянием опрашивается, когда подошел
+    бы ее очередной опрос до перезапуска (курсор — время последнего
+    ответа API), но не позже своего слота, а просроченные подписки
+    распределяются по слотам внутри `policy.min_interval`, чтобы не
+    обращаться к API разом.
+
+    Args:
+        key (:obj:`str`): ключ подписки
+        state (:obj:`PollState`): сохраненное состояние или None
+        policy (:obj:`AdaptiveInterval`): политика интервала опроса
+        period (:obj:`float`): период опроса по умолчанию (секунды)
+
+    Returns:
+        :obj:`float`: пауза до первого опроса (секунды).
+    """
+    offset = slot_offset(key, period)
+    if state is None:
+        return offset
+
+    due = (
+        state.current_timestamp
+        + next_poll_interval(state, policy)
+        - time.time()
+    )
+    if due <= 0:
+        due = slot_offset(key, policy.min_interval)
+    return min(offset, due)
+
+
+def parse_args(argv: Optional[list] = None) -> "argparse.Namespace":
+    """Ф-я разбора аргументов командной строки.
+
+    Args:
+        argv (:obj:`list`): аргументы (по умолчанию `sys.argv[1:]`)
+
+    Returns:
+        :obj:`argparse.Namespace`: разобранные аргументы.
+    """
+    import argparse
+    import socket
+
+    from leases import LEASE_SHARDS
+    from shutdown import SHUTDOWN_TIMEOUT
+
+    parser = argparse.ArgumentParser(description="Бот статусов ревью.")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="опрашивать API асинхронным движком",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=POLL_INTERVAL_MIN,
+        help="минимальный интервал опроса подписки (секунды)",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=POLL_INTERVAL_MAX,
+        help="максимальный интервал опроса подписки (секунды)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=os.getenv("STATE_FILE", STATE_FILE),
+        help="база SQLite с курсорами и статусами подписок",
+    )
+    parser.add_argument(
+        "--outbox-file",
+        default=os.getenv("OUTBOX_FILE", OUTBOX_FILE),
+        help="журнал уведомлений для повторной отправки",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WORKERS", 1)),
+        help="количество процессов опроса, делящих подписки по шардам",
+    )
+    parser.add_argument(
+        "--digest-window",
+        type=float,
+        default=float(os.getenv("DIGEST_WINDOW", 0)),
+        help="окно объединения уведомлений чата в дайджест (секунды, "
+        "0 — без дайджестов)",
+    )
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=float,
+        default=float(os.getenv("SHUTDOWN_TIMEOUT", SHUTDOWN_TIMEOUT)),
+        help="срок на отправку оставшихся сообщений после SIGTERM "
+        "(секунды)",
+    )
+    parser.add_argument(
+        "--record-file",
+        default=os.getenv("RECORD_FILE"),
+        help="файл JSON Lines для записи ответов API (см. replay.py)",
+    )
+    parser.add_argument(
+        "--lease-file",
+        default=os.getenv("LEASE_FILE"),
+        help="общая база SQLite для аренды шардов несколькими экземплярами",
+    )
+    parser.add_argument(
+        "--lease-shards",
+        type=int,
+        default=int(os.getenv("LEASE_SHARDS", LEASE_SHARDS)),
+        help="количество шардов подписок для аренды",
+    )
+    parser.add_argument(
+        "--instance-id",
+        default=os.getenv("DYNO") or socket.gethostname(),
+        help="уникальный идентификатор экземпляра для аренды шардов",
+    )
+    parser.add_argument(
+        "--subscriptions",
+        default=os.getenv("SUBSCRIPTIONS_FILE"),
+        help="JSON-файл или база SQLite с подписками токен -> чаты",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=os.getenv("METRICS_PORT"),
+        help="порт HTTP-сервера метрик Prometheus (по умолчанию выключен)",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        default=os.getenv("LOG_LEVEL", logging.getLevelName(LOG_LEVEL)),
+        help="уровень журнала",
+    )
+    parser.add_argument(
+        "--log-call-levels",
+        type=parse_levels,
+        default=parse_levels(os.getenv("LOG_CALL_LEVELS")),
+        help="уровни записи вызовов функций, например "
+        "check_response=DEBUG,send_message=WARNING",
+    )
+    return parser.parse_args(argv)
+
+
+def get_subscriptions(path: Optional[str]) -> list:
+    """Ф-я получения проверенных подписок.
+
+    Без файла подписок бот обслуживает одну подписку из переменных
+    окружения `PRACTICUM_TOKEN` и `TELEGRAM_CHAT_ID`.
+
+    Args:
+        path (:obj:`str`): путь к файлу подписок
+
+    Returns:
+        :obj:`list`: подписки, прошедшие проверку.
+    """
+    if path:
+        if not TELEGRAM_TOKEN:
+            logger.critical("Не задано значение для TELEGRAM_TOKEN")
+            raise NoExistToken("TELEGRAM_TOKEN")
+        registry = load_subscriptions(path)
+
+    else:
+        if not check_tokens():
+            logger.critical(
+                "Были переданы не все требуемые переменные окружения"
+            )
+            raise NoExistToken()
+        registry = SubscriptionRegistry()
+        registry.add(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+
+    return registry.valid()
+
+
+def get_digest_queue(queue, window: float) -> "DigestQueue":
+    """Ф-я создания стадии дайджестов перед очередью отправки.
+
+    Args:
+        queue: очередь `SendQueue` или `AsyncSendQueue`
+        window (:obj:`float`): окно объединения уведомлений (секунды)
+
+    Returns:
+        :obj:`DigestQueue`: очередь с объединением уведомлений.
+    """
+    from digest import DigestQueue
+
+    digest = DigestQueue(
+        queue,
+        window,
+        DIGEST_HEADERS.get(MESSAGE_LOCALE, DIGEST_HEADERS[DEFAULT_LOCALE]),
+    )
+    QUEUE_DEPTH.set_function(digest.qsize, queue="digest")
+    return digest
+
+
+def start_recording(path: Optional[str]) -> None:
+    """Ф-я включения записи ответов API в файл `path`.
+
+    Args:
+        path (:obj:`str`): путь к файлу записи или None.
+    """
+    global recorder
+
+    if path:
+        from replay import ResponseRecorder
+
+        logger.info('Ответы API записываются в "%s"', path)
+        recorder = ResponseRecorder(path)
+
+
+def stop_recording() -> None:
+    """Ф-я остановки записи ответов API."""
+    global recorder
+
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+
+
+def get_leases(
+    args: "argparse.Namespace", store: "StateStore"
+) -> Optional["ShardLeases"]:
+    """Ф-я получения аренды шардов, если задана база аренды.
+
+    Args:
+        args (:obj:`argparse.Namespace`): аргументы командной строки
+        store (:obj:`StateStore`): хранилище состояния подписок
+
+    Returns:
+        :obj:`ShardLeases`: запущенная аренда шардов или None.
+    """
+    if not args.lease_file:
+        return None
+
+    from leases import ShardLeases
+
+    logger.info('Экземпляр "%s" арендует шарды', args.instance_id)
+    return ShardLeases(
+        args.lease_file,
+        args.instance_id,
+        shards=args.lease_shards,
+        on_release=store.flush,
+    ).start()
+
+
+def leased_state(
+    states: dict,
+    store: "StateStore",
+    key: str,
+    leases: Optional["ShardLeases"] = None,
+    epochs: Optional[dict] = None,
+) -> Optional[PollState]:
+    """Ф-я получения состояния подписки, которую опрашивает экземпляр.
+
+    Если шард подписки арендован другим экземпляром, состояние
+    забывается. Состояние, закэшированное до другой эпохи аренды (шард
+    успели потерять и получить снова, или оно загружено при запуске),
+    не используется: его читают заново из общей базы, где его оставил
+    предыдущий владелец.
+
+    Args:
+        states (:obj:`dict`): состояния опроса по ключам подписок
+        store (:obj:`StateStore`): хранилище состояния подписок
+        key (:obj:`str`): ключ подписки
+        leases (:obj:`ShardLeases`): аренда шардов
+        epochs (:obj:`dict`): эпохи аренды, к которым относятся
+            состояния в `states` (без него состояние читается из базы
+            при каждом вызове)
+
+    Returns:
+        :obj:`PollState`: состояние или None, если подписку опрашивает
+        другой экземпляр.
+    """
+    epoch = None
+    if leases is not None:
+        epoch = leases.epoch(key)
+        if epoch is None:
+            states.pop(key, None)
+            return None
+        if epochs is None or epochs.get(key) != epoch:
+            states.pop(key, None)
+            store.discard(key)
+
+    state = states.get(key)
+    if state is None:
+        state = store.load(key).get(key) or PollState()
+        states[key] = state
+        if epochs is not None:
+            epochs[key] = epoch
+    return state
+
+
+def run_async(
+    subscriptions: list,
+    policy: AdaptiveInterval,
+    store: "StateStore",
+    outbox: "Outbox",
+    leases: Optional["ShardLeases"] = None,
+    digest_window: float = 0,
+    shutdown: Optional["GracefulShutdown"] = None,
+) -> None:
+    """Запуск опроса подписок асинхронным движком.
+
+    Args:
+        subscriptions (:obj:`list`): опрашиваемые подписки
+        policy (:obj:`AdaptiveInterval`): политика интервала опроса
+        store (:obj:`StateStore`): хранилище состояния подписок
+        outbox (:obj:`Outbox`): журнал уведомлений
+        leases (:obj:`ShardLeases`): аренда шардов
+        digest_window (:obj:`float`): окно дайджестов (секунды)
+        shutdown (:obj:`GracefulShutdown`): запрос плавной остановки.
+    """
+    import asyncio
+
+    from async_engine import run_engine
+
+    asyncio.run(
+        run_engine(
+            subscriptions,
+            TELEGRAM_TOKEN,
+            policy=policy,
+            store=store,
+            outbox=outbox,
+            leases=leases,
+            digest_window=digest_window,
+            shutdown=shutdown,
+        )
+    )
+
+
+def run(
+    args: "argparse.Namespace", subscriptions: Optional[list] = None
+) -> None:
+    """Запуск опроса подписок с разобранными аргументами.
+
+    По SIGTERM или SIGINT новые опросы не начинаются, текущий запрос к
+    API завершается, а очередь сообщений досылается в пределах
+    `--shutdown-timeout`, после чего состояние и курсоры записываются в
+    базу. Недоставленные уведомления остаются в журнале и уходят после
+    следующего запуска.
+
+    Args:
+        args (:obj:`argparse.Namespace`): аргументы командной строки
+        subscriptions (:obj:`list`): опрашиваемые подписки (по умолчанию
+            все подписки из `args.subscriptions`).
+    """
+    from outbox import Outbox, OutboxSender
+    from send_queue import SendQueue
+    from shutdown import GracefulShutdown
+    from state import StateStore
+
+    if subscriptions is None:
+        subscriptions = get_subscriptions(args.subscriptions)
+
+    logger.debug("Токены прошли проверку. Подписок: %d", len(subscriptions))
+
+    policy = AdaptiveInterval(
+        min_interval=args.min_interval, max_interval=args.max_interval
+    )
+
+    store = StateStore(args.state_file)
+    outbox = Outbox(args.outbox_file)
+    QUEUE_DEPTH.set_function(outbox.__len__, queue="outbox")
+
+    if args.metrics_port is not None:
+        from metrics_server import start_metrics_server
+
+        start_metrics_server(args.metrics_port)
+
+    leases = get_leases(args, store)
+    shutdown = GracefulShutdown(args.shutdown_timeout).install()
+    start_recording(args.record_file)
+
+    try:
+        if args.use_async:
+            run_async(
+                subscriptions,
+                policy,
+                store,
+                outbox,
+                leases,
+                args.digest_window,
+                shutdown,
+            )
+            return
+
+        send_queue = SendQueue(get_bot()).start()
+        QUEUE_DEPTH.set_function(send_queue.qsize, queue="send")
+        queue = send_queue
+        if args.digest_window:
+            queue = get_digest_queue(send_queue, args.digest_window).start()
+        sender = OutboxSender(outbox, queue).start()
+        states = store.load()
+        epochs: dict = {}
+
+        def poll(subscription: Subscription) -> float:
+            state = leased_state(
+                states, store, subscription.key, leases, epochs
+            )
+            if state is None:
+                return leases.interval
+            poll_subscription(sender, subscription, state)
+            store.save(subscription.key, state)
+            store.flush_if_due()
+            return next_poll_interval(state, policy)
+
+        run_timing_wheel(
+            subscriptions,
+            poll,
+            TELEGRAM_RETRY_TIME,
+            sleep=shutdown.wait,
+            stopped=shutdown.is_set,
+            first_delay=lambda subscription: first_poll_delay(
+                subscription.key,
+                states.get(subscription.key),
+                policy,
+                TELEGRAM_RETRY_TIME,
+            ),
+        )
+
+        logger.info("Опрос остановлен, отправка оставшихся сообщений")
+        sender.close()
+        if queue is not send_queue:
+            queue.close()
+        send_queue.close(shutdown.remaining())
+
+    finally:
+        shutdown.restore()
+        stop_recording()
+        if leases is not None:
+            leases.close()
+        outbox.close()
+        store.close()
+        logger.info("Состояние подписок записано")
+
+
+class App(NamedTuple):
+    """Подготовленный к запуску бот.
+
+    Args:
+        args (:obj:`argparse.Namespace`): аргументы командной строки
+        log_listener (:obj:`logging.handlers.QueueListener`): поток
+            записи журнала.
+    """
+
+    args: "argparse.Namespace"
+    log_listener: "logging.handlers.QueueListener"
+
+
+def create_app(argv: Optional[list] = None) -> App:
+    """Ф-я подготовки бота к запуску.
+
+    Импорт модуля не читает `.env` и не настраивает журнал: это делает
+    только явный запуск, поэтому проверка ответов API в тестах и других
+    модулях не тянет за собой Телеграм, HTTP-клиент и их зависимости.
+
+    Args:
+        argv (:obj:`list`): аргументы (по умолчанию `sys.argv[1:]`)
+
+    Returns:
+        :obj:`App`: аргументы и запущенный поток записи журнала.
+    """
+    from log_setup import setup_logging
+
+    load_config()
+    args = parse_args(argv)
+    listener = setup_logging(
+        logger, level=args.log_level, call_levels=args.log_call_levels
+    )
+    return App(args, listener)
+
+
+def main() -> None:
+    """Основная логика работы бота."""
+    app = create_app()
+
+    try:
+        if app.args.workers > 1:
+            from workers import Supervisor
 
+            Supervisor(app.args, app.args.workers).run()
         else:
-            time.sleep(TELEGRAM_RETRY_TIME)
+            run(app.args)
+    finally:
+        app.log_listener.stop()
 
 
 if __name__ == "__main__":
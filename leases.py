@@ -0,0 +1,280 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from sharding import HashRing, hash_point
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+LEASE_SHARDS = 16
+LEASE_TTL = 30.0
+LEASE_RELEASE_DELAY = 20.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lease_owner (
+    owner TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shard_lease (
+    shard INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class ShardLeases:
+    """Аренда шардов подписок несколькими экземплярами бота.
+
+    Подписки делятся на `shards` шардов кольцом хешей, а экземпляры
+    делят шарды через общую базу SQLite. Каждый экземпляр раз в треть
+    `ttl` продлевает свои аренды и добирает свободные или просроченные
+    шарды до равной доли, поэтому упавший экземпляр заменяется не позже
+    чем через `ttl`. Лишние шарды при появлении нового экземпляра
+    сначала перестают опрашиваться и освобождаются не раньше чем через
+    `release_delay` — этого хватает, чтобы завершился уже начатый
+    запрос к API (таймауты 3.05 + 10 с). Перед освобождением вызывается
+    `on_release` (запись состояния), так что шард никогда не опрашивают
+    двое. Каждое получение шарда увеличивает его эпоху (`epoch`): по
+    смене эпохи опрашивающий сбрасывает состояние, закэшированное до
+    потери шарда, и читает его заново из общей базы.
+
+    Args:
+        path (:obj:`str`): путь к базе SQLite с арендами
+        owner (:obj:`str`): уникальный идентификатор экземпляра
+        shards (:obj:`int`): количество шардов
+        ttl (:obj:`float`): срок аренды (секунды)
+        on_release (:obj:`Callable`): вызывается перед освобождением
+            шардов
+        release_delay (:obj:`float`): пауза между остановкой опроса
+            лишнего шарда и его освобождением (секунды)
+        clock (:obj:`Callable`): часы, общие для всех экземпляров.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        owner: str,
+        shards: int = LEASE_SHARDS,
+        ttl: float = LEASE_TTL,
+        on_release: Optional[Callable[[], None]] = None,
+        release_delay: float = LEASE_RELEASE_DELAY,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Инициализирует ShardLeases."""
+        import sqlite3
+
+        self.owner = owner
+        self.token = uuid.uuid4().hex
+        self.ring = HashRing(shards)
+        self.shards = shards
+        self.ttl = ttl
+        self.interval = ttl / 3
+        self.on_release = on_release
+        self.release_delay = release_delay
+        self.clock = clock
+        self.held: Set[int] = set()
+        self.releasing: Dict[int, float] = {}
+        self.epochs: Dict[int, int] = {}
+        self.valid_until = 0.0
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=ttl
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def owns(self, key: str) -> bool:
+        """Проверяет, опрашивает ли экземпляр подписку с этим ключом.
+
+        Args:
+            key (:obj:`str`): ключ подписки
+
+        Returns:
+            :obj:`bool`: True, если шард подписки арендован и аренда не
+            истекла по локальным часам.
+        """
+        return self.epoch(key) is not None
+
+    def epoch(self, key: str) -> Optional[int]:
+        """Эпоха аренды шарда подписки.
+
+        Args:
+            key (:obj:`str`): ключ подписки
+
+        Returns:
+            :obj:`int`: номер получения шарда этим экземпляром или None,
+            если подписку опрашивает не он.
+        """
+        if time.monotonic() >= self.valid_until:
+            return None
+        shard = self.ring.shard_for(key)
+        if shard not in self.held:
+            return None
+        return self.epochs.get(shard)
+
+    def heartbeat(self) -> Set[int]:
+        """Продлевает аренды, освобождает лишние и берет свободные шарды.
+
+        Returns:
+            :obj:`set`: номера арендованных шардов.
+        """
+        started = time.monotonic()
+        if self.due_releases(self.clock()) and self.on_release is not None:
+            self.on_release()
+
+        with self.lock:
+            now = self.clock()
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                held, claimed = self._renew(cursor, now)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+            for shard in claimed | (held - self.held):
+                self.epochs[shard] = self.epochs.get(shard, 0) + 1
+            if held != self.held:
+                logger.info("Арендованные шарды: %s", sorted(held))
+            self.held = held
+            self.valid_until = started + self.ttl - self.interval
+            return set(held)
+
+    def due_releases(self, now: float) -> Set[int]:
+        """Шарды, которые уже можно освободить.
+
+        Args:
+            now (:obj:`float`): текущее время по общим часам
+
+        Returns:
+            :obj:`set`: шарды, опрос которых остановлен не меньше
+            `release_delay` секунд назад.
+        """
+        return {
+            shard
+            for shard, since in self.releasing.items()
+            if now - since >= self.release_delay
+        }
+
+    def _renew(self, cursor, now: float) -> Tuple[Set[int], Set[int]]:
+        row = cursor.execute(
+            "SELECT token FROM lease_owner "
+            "WHERE owner = ? AND expires_at >= ?",
+            (self.owner, now),
+        ).fetchone()
+        if row is not None and row[0] != self.token:
+            logger.warning(
+                'Экземпляр "%s" уже запущен, ожидание его аренды', self.owner
+            )
+            return set(), set()
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO lease_owner VALUES (?, ?, ?)",
+            (self.owner, self.token, now + self.ttl),
+        )
+        cursor.execute("DELETE FROM lease_owner WHERE expires_at < ?", (now,))
+        cursor.execute("DELETE FROM shard_lease WHERE expires_at < ?", (now,))
+        released = self.due_releases(now)
+        cursor.executemany(
+            "DELETE FROM shard_lease WHERE shard = ? AND owner = ?",
+            [(shard, self.owner) for shard in released],
+        )
+        for shard in released:
+            del self.releasing[shard]
+        cursor.execute(
+            "UPDATE shard_lease SET expires_at = ? WHERE owner = ?",
+            (now + self.ttl, self.owner),
+        )
+
+        owned = [
+            shard
+            for (shard,) in cursor.execute(
+                "SELECT shard FROM shard_lease WHERE owner = ?", (self.owner,)
+            )
+            if shard not in self.releasing
+        ]
+        live = cursor.execute("SELECT COUNT(*) FROM lease_owner").fetchone()
+        share = math.ceil(self.shards / live[0])
+
+        if len(owned) > share:
+            owned.sort(key=self.preference)
+            for shard in owned[share:]:
+                self.releasing[shard] = now
+            return set(owned[:share]), set()
+
+        taken = {
+            shard
+            for (shard,) in cursor.execute("SELECT shard FROM shard_lease")
+        }
+        free = sorted(
+            (shard for shard in range(self.shards) if shard not in taken),
+            key=self.preference,
+        )[:share - len(owned)]
+        cursor.executemany(
+            "INSERT INTO shard_lease VALUES (?, ?, ?)",
+            [(shard, self.owner, now + self.ttl) for shard in free],
+        )
+        return set(owned) | set(free), set(free)
+
+    def preference(self, shard: int) -> int:
+        """Порядок, в котором экземпляр берет шарды.
+
+        Порядок у каждого экземпляра свой (rendezvous hashing), поэтому
+        одновременно стартовавшие экземпляры редко спорят за один шард.
+        """
+        return hash_point(f"{self.owner}-{shard}")
+
+    def start(self) -> "ShardLeases":
+        """Берет первые аренды и запускает поток их продления."""
+        self.heartbeat()
+        self.thread = threading.Thread(
+            target=self._run, name="shard-leases", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.heartbeat()
+            except Exception as error:
+                logger.exception("Не удалось продлить аренду: %s", error)
+
+    def release(self) -> None:
+        """Освобождает все шарды, чтобы их сразу забрали другие."""
+        with self.lock:
+            self.held = set()
+            self.releasing = {}
+            self.valid_until = 0.0
+            with self.connection:
+                self.connection.execute("BEGIN IMMEDIATE")
+                self.connection.execute(
+                    "DELETE FROM shard_lease WHERE owner = ?", (self.owner,)
+                )
+                self.connection.execute(
+                    "DELETE FROM lease_owner WHERE owner = ? AND token = ?",
+                    (self.owner, self.token),
+                )
+
+    def close(self) -> None:
+        """Останавливает продление, освобождает шарды и закрывает базу.
+
+        Перед освобождением вызывается `on_release`, чтобы следующий
+        владелец шардов продолжил с записанного состояния.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.on_release is not None:
+            self.on_release()
+        self.release()
+        self.connection.close()
@@ -0,0 +1,108 @@
+import logging
+import queue
+import sys
+from typing import Dict, Optional, TextIO, Union
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_LEVEL = logging.DEBUG
+CALL_LOG_LEVEL = logging.INFO
+
+call_log_levels: Dict[str, int] = {}
+
+
+class DeferredQueueHandler(logging.Handler):
+    """Обработчик, передающий записи в очередь без форматирования.
+
+    В отличие от `logging.handlers.QueueHandler`, аргументы не
+    подставляются в сообщение в вызывающем потоке: запись передается
+    слушателю в том же процессе как есть, и форматирование выполняется
+    в его потоке.
+
+    Args:
+        records (:obj:`queue.SimpleQueue`): очередь записей.
+    """
+
+    def __init__(self, records: queue.SimpleQueue) -> None:
+        """Инициализирует DeferredQueueHandler."""
+        super().__init__()
+        self.records = records
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Ставит запись в очередь."""
+        self.records.put_nowait(record)
+
+
+def log_call(logger: logging.Logger, name: str) -> None:
+    """Ф-я записи в журнал вызова функции бота.
+
+    Уровень записи задается для каждой функции отдельно (`setup_logging`),
+    а сообщение не формируется, если уровень отключен.
+
+    Args:
+        logger (:obj:`logging.Logger`): журнал
+        name (:obj:`str`): имя вызванной функции.
+    """
+    level = call_log_levels.get(name, CALL_LOG_LEVEL)
+    if logger.isEnabledFor(level):
+        logger.log(level, 'Запущена функция "%s"', name)
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, int]:
+    """Ф-я разбора уровней журнала вида `имя=УРОВЕНЬ,...`.
+
+    Args:
+        spec (:obj:`str`): строка с уровнями, например
+            `check_response=DEBUG,send_message=WARNING`
+
+    Returns:
+        :obj:`dict`: уровни по именам.
+    """
+    levels = {}
+    for item in filter(None, (spec or "").split(",")):
+        name, _, level_name = item.partition("=")
+        level = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Неизвестный уровень журнала: {item}")
+        levels[name.strip()] = level
+    return levels
+
+
+def setup_logging(
+    logger: logging.Logger,
+    level: Union[int, str] = LOG_LEVEL,
+    call_levels: Optional[Dict[str, int]] = None,
+    stream: TextIO = sys.stdout,
+) -> "logging.handlers.QueueListener":
+    """Ф-я переключения журнала на запись через очередь.
+
+    Обработчики журнала заменяются на `DeferredQueueHandler`, а вывод
+    в поток выполняет `QueueListener` в отдельном потоке, поэтому цикл
+    опроса не ждет записи в stdout.
+
+    Args:
+        logger (:obj:`logging.Logger`): настраиваемый журнал
+        level (:obj:`int` | :obj:`str`): уровень журнала
+        call_levels (:obj:`dict`): уровни записи вызовов функций
+        stream (:obj:`TextIO`): поток вывода
+
+    Returns:
+        :obj:`logging.handlers.QueueListener`: запущенный слушатель,
+        который нужно остановить при завершении.
+    """
+    import logging.handlers
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+
+    for old_handler in list(logger.handlers):
+        logger.removeHandler(old_handler)
+    logger.addHandler(DeferredQueueHandler(records))
+    logger.setLevel(level)
+
+    call_log_levels.clear()
+    call_log_levels.update(call_levels or {})
+
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+    return listener
@@ -0,0 +1,260 @@
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+class Metric:
+    """Базовый класс метрики с метками.
+
+    Значения хранятся в словаре по кортежу значений меток; обновление —
+    одна операция со словарем под неконкурентной блокировкой, поэтому
+    метрики можно обновлять в цикле опроса.
+
+    Args:
+        name (:obj:`str`): имя метрики
+        documentation (:obj:`str`): описание метрики
+        labelnames (:obj:`Sequence[str]`): имена меток.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """Инициализирует Metric."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """Возвращает отсчеты метрики: (суффикс, значения меток, число)."""
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        """Формирует метрику в текстовом формате Prometheus."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, label_values, value in self.samples():
+            names = self.labelnames + (("le",) if suffix == "_bucket" else ())
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, label_values)} "
+                f"{value:g}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Инициализирует Counter."""
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Увеличивает счетчик."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Текущее значение счетчика."""
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """Возвращает отсчеты метрики."""
+        with self.lock:
+            items = list(self.values.items())
+        return [("_total", key, value) for key, value in items]
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться.
+
+    Вместо обновления на каждой операции можно задать функцию, которая
+    вызывается только при чтении метрик (`set_function`).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Инициализирует Gauge."""
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Устанавливает значение."""
+        self.values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels) -> None:
+        """Задает функцию, вычисляющую значение при чтении."""
+        self.functions[self._key(labels)] = function
+
+    def get(self, **labels: str) -> float:
+        """Текущее значение."""
+        key = self._key(labels)
+        if key in self.functions:
+            return self.functions[key]()
+        return self.values.get(key, 0)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """Возвращает отсчеты метрики."""
+        items = list(self.values.items())
+        samples = [("", key, value) for key, value in items]
+        samples.extend(
+            ("", key, function())
+            for key, function in list(self.functions.items())
+        )
+        return samples
+
+
+class Histogram(Metric):
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs
+    ) -> None:
+        """Инициализирует Histogram."""
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Учитывает наблюдение."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: str) -> int:
+        """Количество наблюдений."""
+        state = self.values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """Возвращает отсчеты метрики."""
+        samples = []
+        with self.lock:
+            for key, (counts, total) in self.values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (None,), counts):
+                    cumulative += count
+                    le = "+Inf" if bound is None else f"{bound:g}"
+                    samples.append(("_bucket", key + (le,), cumulative))
+                samples.append(("_sum", key, total))
+                samples.append(("_count", key, cumulative))
+        return samples
+
+
+class Registry:
+    """Набор метрик, отдаваемых сервером метрик."""
+
+    def __init__(self) -> None:
+        """Инициализирует Registry."""
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Добавляет метрику."""
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        """Формирует все метрики в текстовом формате Prometheus."""
+        return "".join(metric.expose() for metric in self.metrics)
+
+
+REGISTRY = Registry()
+
+PRACTICUM_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "practicum_request_duration_seconds",
+        "Длительность запроса к API Практикума.",
+        ("status_code",),
+    )
+)
+PRACTICUM_NOT_MODIFIED = REGISTRY.register(
+    Counter(
+        "practicum_not_modified",
+        "Ответы API, разбор которых пропущен: 304 или то же тело.",
+        ("reason",),
+    )
+)
+POLL_EXCEPTIONS = REGISTRY.register(
+    Counter(
+        "poll_exceptions",
+        "Ошибки цикла опроса по типу исключения.",
+        ("exception",),
+    )
+)
+TELEGRAM_SEND_DURATION = REGISTRY.register(
+    Histogram(
+        "telegram_send_duration_seconds",
+        "Длительность отправки сообщения в Телеграм по исходу.",
+        ("outcome",),
+    )
+)
+TELEGRAM_SEND_FAILURES = REGISTRY.register(
+    Counter(
+        "telegram_send_failures",
+        "Неудачные отправки сообщений по типу ошибки.",
+        ("error",),
+    )
+)
+QUEUE_DEPTH = REGISTRY.register(
+    Gauge("queue_depth", "Количество ожидающих элементов.", ("queue",))
+)
+POLL_LAG = REGISTRY.register(
+    Gauge(
+        "poll_lag_seconds",
+        "Отставание опроса подписки от расписания.",
+        ("subscription",),
+    )
+)
+STATUS_TRANSITIONS = REGISTRY.register(
+    Counter(
+        "status_transitions",
+        "Смены статусов домашних работ по новому статусу.",
+        ("status",),
+    )
+)
+DIGEST_COALESCED = REGISTRY.register(
+    Counter(
+        "digest_coalesced_messages",
+        "Уведомления, отправленные в составе дайджестов.",
+    )
+)
@@ -0,0 +1,60 @@
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from metrics import REGISTRY, Registry
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Обработчик, отдающий метрики реестра."""
+
+    registry: Registry = REGISTRY
+
+    def do_GET(self) -> None:
+        """Отдает метрики в текстовом формате Prometheus."""
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        body = self.registry.expose().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Отключает журнал запросов к метрикам."""
+
+
+def start_metrics_server(
+    port: int, host: str = "127.0.0.1", registry: Optional[Registry] = None
+) -> ThreadingHTTPServer:
+    """Ф-я запуска HTTP-сервера метрик в фоновом потоке.
+
+    Args:
+        port (:obj:`int`): порт (0 — выбрать свободный)
+        host (:obj:`str`): адрес
+        registry (:obj:`Registry`): реестр метрик
+
+    Returns:
+        :obj:`ThreadingHTTPServer`: запущенный сервер.
+    """
+    handler = type(
+        "BoundMetricsHandler",
+        (MetricsHandler,),
+        {"registry": registry or REGISTRY},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    logger.info("Метрики доступны на http://%s:%d/", host, server.server_port)
+    return server
@@ -0,0 +1,337 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from resilience import backoff_delay
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+OUTBOX_RETRY_INTERVAL = 30.0
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETRY_BACKOFF_CAP = 15 * 60.0
+OUTBOX_FSYNC_INTERVAL = 1.0
+OUTBOX_COMPACT_THRESHOLD = 1000
+
+
+class Outbox:
+    """Журнал исходящих уведомлений в формате JSON Lines.
+
+    Каждое уведомление дописывается в журнал до отправки и считается
+    доставленным только после записи подтверждения, поэтому после сбоя
+    или перезапуска недоставленные уведомления отправляются повторно
+    (доставка «хотя бы один раз»). Журнал только дописывается, а fsync
+    выполняется не чаще раза в `fsync_interval` секунд; когда
+    подтвержденных записей становится много, журнал сжимается.
+
+    От уведомления отказываются только после `max_attempts` постоянных
+    ошибок (чат не найден, бот заблокирован). Временные ошибки (сеть,
+    таймауты) повторяются без ограничения числа попыток с растущей
+    паузой, поэтому сбой Телеграма не теряет уведомления.
+
+    Args:
+        path (:obj:`str`): путь к файлу журнала
+        max_attempts (:obj:`int`): постоянных ошибок до отказа от
+            уведомления
+        fsync_interval (:obj:`float`): минимальная пауза между fsync
+        compact_threshold (:obj:`int`): подтверждений до сжатия журнала
+        retry_interval (:obj:`float`): пауза после второй временной
+            ошибки подряд, дальше она удваивается
+        retry_cap (:obj:`float`): максимальная пауза между повторами
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        fsync_interval: float = OUTBOX_FSYNC_INTERVAL,
+        compact_threshold: int = OUTBOX_COMPACT_THRESHOLD,
+        retry_interval: float = OUTBOX_RETRY_INTERVAL,
+        retry_cap: float = OUTBOX_RETRY_BACKOFF_CAP,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует Outbox."""
+        self.path = path
+        self.max_attempts = max_attempts
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.retry_interval = retry_interval
+        self.retry_cap = retry_cap
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.pending: Dict[int, Tuple[str, str]] = {}
+        self.attempts: Dict[int, int] = {}
+        self.transient: Dict[int, int] = {}
+        self.retry_at: Dict[int, float] = {}
+        self.in_flight: Set[int] = set()
+        self.finished = 0
+        self.last_id = 0
+        self._load()
+
+        self.file = open(path, "a", encoding="utf-8")
+        self.synced_at = time.monotonic()
+
+    def _load(self) -> None:
+        try:
+            file = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+
+        with file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("Пропущена поврежденная запись журнала.")
+                    continue
+
+                message_id = record["id"]
+                self.last_id = max(self.last_id, message_id)
+                if "chat_id" in record:
+                    self.pending[message_id] = (
+                        record["chat_id"],
+                        record["text"],
+                    )
+                else:
+                    self.pending.pop(message_id, None)
+                    self.finished += 1
+
+        if self.pending:
+            logger.info("Недоставленных уведомлений: %d", len(self.pending))
+
+    def _append(self, record: dict) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+        if time.monotonic() - self.synced_at >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self.synced_at = time.monotonic()
+
+    def add(self, chat_id: str, text: str) -> int:
+        """Записывает уведомление в журнал и помечает его отправляемым.
+
+        Args:
+            chat_id (:obj:`str`): идентификатор чата
+            text (:obj:`str`): текст сообщения
+
+        Returns:
+            :obj:`int`: идентификатор уведомления.
+        """
+        with self.lock:
+            self.last_id += 1
+            message_id = self.last_id
+            self._append({"id": message_id, "chat_id": chat_id, "text": text})
+            self.pending[message_id] = (chat_id, text)
+            self.in_flight.add(message_id)
+            return message_id
+
+    def take_pending(self) -> List[Tuple[int, str, str]]:
+        """Забирает недоставленные уведомления на повторную отправку.
+
+        Уведомления, которые сейчас в отправке или ждут паузы после
+        временной ошибки, не возвращаются.
+
+        Returns:
+            :obj:`list`: тройки (идентификатор, чат, текст).
+        """
+        with self.lock:
+            now = self.clock()
+            items = [
+                (message_id, chat_id, text)
+                for message_id, (chat_id, text) in self.pending.items()
+                if message_id not in self.in_flight
+                and self.retry_at.get(message_id, now) <= now
+            ]
+            self.in_flight.update(message_id for message_id, _, _ in items)
+            return items
+
+    def done(self, message_id: int, delivered: Optional[bool]) -> None:
+        """Учитывает результат отправки уведомления.
+
+        Результат, пришедший после закрытия журнала (отправка не уложилась
+        в срок остановки), не записывается, и уведомление будет
+        отправлено повторно после запуска.
+
+        Args:
+            message_id (:obj:`int`): идентификатор уведомления
+            delivered (:obj:`bool`): True — Телеграм подтвердил доставку,
+                False — постоянная ошибка, None — временная ошибка.
+        """
+        with self.lock:
+            self.in_flight.discard(message_id)
+            if message_id not in self.pending or self.file.closed:
+                return
+
+            if delivered is None:
+                self._postpone(message_id)
+                return
+
+            if not delivered:
+                attempts = self.attempts.get(message_id, 0) + 1
+                self.attempts[message_id] = attempts
+                if attempts < self.max_attempts:
+                    return
+                logger.error(
+                    "Уведомление %s не доставлено за %d попыток",
+                    message_id,
+                    attempts,
+                )
+
+            self._append({"id": message_id})
+            del self.pending[message_id]
+            self.attempts.pop(message_id, None)
+            self.transient.pop(message_id, None)
+            self.retry_at.pop(message_id, None)
+            self.finished += 1
+
+            if self.finished >= max(
+                self.compact_threshold, 2 * len(self.pending)
+            ):
+                self._compact()
+
+    def _postpone(self, message_id: int) -> None:
+        failures = self.transient.get(message_id, 0) + 1
+        self.transient[message_id] = failures
+        if failures > 1:
+            self.retry_at[message_id] = self.clock() + backoff_delay(
+                failures - 1, self.retry_interval, self.retry_cap
+            )
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            for message_id, (chat_id, text) in self.pending.items():
+                record = {"id": message_id, "chat_id": chat_id, "text": text}
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.file.close()
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.finished = 0
+
+    def absorb(self, path: str) -> int:
+        """Переносит недоставленные уведомления из другого журнала.
+
+        Уведомления дописываются в этот журнал с новыми
+        идентификаторами, после чего другой журнал удаляется. Так
+        уведомления журнала, оставшегося без процесса после изменения
+        количества шардов, не теряются.
+
+        Args:
+            path (:obj:`str`): путь к другому журналу
+
+        Returns:
+            :obj:`int`: количество перенесенных уведомлений.
+        """
+        if path == self.path or not os.path.exists(path):
+            return 0
+
+        other = Outbox(path)
+        items = list(other.pending.values())
+        other.close()
+
+        with self.lock:
+            for chat_id, text in items:
+                self.last_id += 1
+                self._append(
+                    {"id": self.last_id, "chat_id": chat_id, "text": text}
+                )
+                self.pending[self.last_id] = (chat_id, text)
+            os.fsync(self.file.fileno())
+
+        os.remove(path)
+        logger.info("Перенесено уведомлений из %s: %d", path, len(items))
+        return len(items)
+
+    def __len__(self) -> int:
+        """Количество недоставленных уведомлений."""
+        return len(self.pending)
+
+    def close(self) -> None:
+        """Сбрасывает журнал на диск и закрывает его."""
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+
+class OutboxSender:
+    """Отправка уведомлений через журнал `Outbox` и очередь сообщений.
+
+    `put` записывает уведомление в журнал и ставит его в очередь;
+    фоновый обработчик периодически повторно ставит в очередь то, что
+    не удалось доставить, в том числе оставшееся с прошлого запуска.
+
+    Args:
+        outbox (:obj:`Outbox`): журнал уведомлений
+        queue: очередь `SendQueue` или `AsyncSendQueue`
+        retry_interval (:obj:`float`): пауза между повторами (секунды).
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        queue,
+        retry_interval: float = OUTBOX_RETRY_INTERVAL,
+    ) -> None:
+        """Инициализирует OutboxSender."""
+        self.outbox = outbox
+        self.queue = queue
+        self.retry_interval = retry_interval
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def put(self, chat_id: str, text: str) -> None:
+        """Записывает уведомление в журнал и ставит его в очередь."""
+        self._send(self.outbox.add(chat_id, text), chat_id, text)
+
+    def _send(self, message_id: int, chat_id: str, text: str) -> None:
+        self.queue.put(
+            chat_id,
+            text,
+            on_done=lambda delivered: self.outbox.done(message_id, delivered),
+        )
+
+    def drain(self) -> int:
+        """Повторно ставит в очередь недоставленные уведомления.
+
+        Returns:
+            :obj:`int`: количество поставленных уведомлений.
+        """
+        items = self.outbox.take_pending()
+        for message_id, chat_id, text in items:
+            self._send(message_id, chat_id, text)
+        return len(items)
+
+    def start(self) -> "OutboxSender":
+        """Запускает поток повторной отправки."""
+        self.thread = threading.Thread(
+            target=self._run, name="outbox-drainer", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self.stopped.is_set():
+            self.drain()
+            self.stopped.wait(self.retry_interval)
+
+    async def run_async(self) -> None:
+        """Корутина повторной отправки для асинхронного движка."""
+        while True:
+            self.drain()
+            await asyncio.sleep(self.retry_interval)
+
+    def close(self) -> None:
+        """Останавливает поток повторной отправки."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Optional
+
+_statuses: Dict[str, str] = {}
+
+
+def register_statuses(statuses: Iterable[str]) -> None:
+    """Ф-я регистрации известных статусов домашних работ.
+
+    Args:
+        statuses (:obj:`Iterable[str]`): статусы, например ключи
+            `HOMEWORK_STATUSES`.
+    """
+    for status in statuses:
+        _statuses.setdefault(status, status)
+
+
+def intern_status(status: Optional[str]) -> Optional[str]:
+    """Ф-я замены статуса из ответа API на общий экземпляр строки.
+
+    Разбор JSON создает новую строку для каждого значения, поэтому
+    сотни тысяч отслеживаемых работ хранили бы столько же копий трех
+    статусов. Неизвестные статусы возвращаются как есть, чтобы таблица
+    не росла от данных извне.
+
+    Args:
+        status (:obj:`str`): статус из ответа API
+
+    Returns:
+        :obj:`str`: зарегистрированный экземпляр статуса или `status`.
+    """
+    return _statuses.get(status, status)
+
+
+class Homework:
+    """Домашняя работа из ответа API: имя и статус без словаря атрибутов.
+
+    Args:
+        homework_name (:obj:`str`): имя работы
+        status (:obj:`str`): статус работы.
+    """
+
+    __slots__ = ("homework_name", "status")
+
+    def __init__(self, homework_name: str, status: str) -> None:
+        """Инициализирует Homework."""
+        self.homework_name = homework_name
+        self.status = intern_status(status)
+
+    @classmethod
+    def from_dict(cls, homework: dict) -> "Homework":
+        """Создает запись из элемента списка `homeworks` ответа API.
+
+        Args:
+            homework (:obj:`dict`): работа с ключами `homework_name`
+                и `status`
+
+        Returns:
+            :obj:`Homework`: запись о работе.
+        """
+        return cls(homework["homework_name"], homework["status"])
+
+    def __eq__(self, other: object) -> bool:
+        """Сравнивает записи по имени и статусу."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return (self.homework_name, self.status) == (
+            other.homework_name,
+            other.status,
+        )
+
+    def __repr__(self) -> str:
+        """Представление записи для журнала и отладки."""
+        return f"Homework({self.homework_name!r}, {self.status!r})"
@@ -0,0 +1,217 @@
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+import homework
+from decoding import loads
+from state import PollState
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+REPLAY_SPEED = 60.0
+
+
+class Record(NamedTuple):
+    """Записанный ответ API для одной подписки.
+
+    Args:
+        at (:obj:`float`): время получения ответа (Unix time)
+        key (:obj:`str`): ключ подписки
+        latency (:obj:`float`): длительность запроса (секунды)
+        response (:obj:`dict`): ответ API или None, если ответ не изменился
+        error (:obj:`str`): имя исключения запроса или None.
+    """
+
+    at: float
+    key: str
+    latency: float
+    response: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class ResponseRecorder:
+    """Запись ответов API в файл JSON Lines для последующего воспроизведения.
+
+    Одна строка — один запрос: `{"t", "key", "ms", "response"}` или
+    `{"t", "key", "ms", "error"}`. Вместо токена пишется ключ подписки,
+    но ответы содержат имена работ и комментарии ревьюеров, поэтому
+    запись не стоит передавать за пределы команды.
+
+    Args:
+        path (:obj:`str`): путь к файлу записи (дописывается)
+        clock (:obj:`Callable`): часы.
+    """
+
+    def __init__(
+        self, path: str, clock: Callable[[], float] = time.time
+    ) -> None:
+        """Инициализирует ResponseRecorder."""
+        self.path = path
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        key: str,
+        latency: float,
+        response: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Дописывает ответ или ошибку запроса в файл.
+
+        Args:
+            key (:obj:`str`): ключ подписки
+            latency (:obj:`float`): длительность запроса (секунды)
+            response (:obj:`dict`): ответ API или None
+            error (:obj:`str`): имя исключения запроса.
+        """
+        record = {
+            "t": round(self.clock(), 3),
+            "key": key,
+            "ms": round(latency * 1000),
+        }
+        if error is not None:
+            record["error"] = error
+        else:
+            record["response"] = response
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self) -> None:
+        """Сбрасывает запись на диск и закрывает файл."""
+        with self.lock:
+            self.file.close()
+
+
+def read_recording(path: str) -> Iterator[Record]:
+    """Ф-я чтения записанных ответов API.
+
+    Args:
+        path (:obj:`str`): путь к файлу записи
+
+    Returns:
+        :obj:`Iterator[Record]`: записи в порядке получения.
+    """
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = loads(line)
+            yield Record(
+                record["t"],
+                record["key"],
+                record["ms"] / 1000,
+                record.get("response"),
+                record.get("error"),
+            )
+
+
+class ReplayStats(NamedTuple):
+    """Итоги воспроизведения записи.
+
+    Args:
+        responses (:obj:`int`): обработанные ответы
+        unchanged (:obj:`int`): ответы без изменений (304 или то же тело)
+        errors (:obj:`int`): ошибки запросов и некорректные ответы
+        messages (:obj:`int`): отправленные сообщения
+        elapsed (:obj:`float`): длительность воспроизведения (секунды).
+    """
+
+    responses: int
+    unchanged: int
+    errors: int
+    messages: int
+    elapsed: float
+
+
+def replay_response(
+    response: dict, state: PollState, track_changes: bool = True
+) -> list:
+    """Ф-я получения сообщений для одного записанного ответа.
+
+    Args:
+        response (:obj:`dict`): ответ API
+        state (:obj:`PollState`): состояние подписки
+        track_changes (:obj:`bool`): отправлять только смены статусов
+
+    Returns:
+        :obj:`list`: тексты сообщений.
+    """
+    homeworks = homework.check_response(response)
+    if track_changes:
+        messages = [
+            notification.text
+            for notification in homework.process_homeworks(homeworks, state)
+        ]
+    else:
+        messages = [homework.parse_status(item) for item in homeworks]
+    state.advance_cursor(response)
+    return messages
+
+
+def replay(
+    records: Iterable[Record],
+    bot,
+    speed: float = REPLAY_SPEED,
+    track_changes: bool = True,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> ReplayStats:
+    """Ф-я воспроизведения записанных ответов через конвейер бота.
+
+    Каждый ответ проходит `check_response`, разбор статусов и
+    `send_message`. С `track_changes` статусы сравниваются с состоянием
+    подписки, как при опросе (`process_homeworks`), иначе каждая работа
+    ответа разбирается `parse_status`. Паузы между ответами сокращаются
+    в `speed` раз; при `speed=0` ответы подаются без пауз.
+
+    Args:
+        records (:obj:`Iterable[Record]`): записанные ответы
+        bot: объект бот с методом `send_message(chat_id, text)`
+        speed (:obj:`float`): ускорение относительно записи
+        track_changes (:obj:`bool`): отправлять только смены статусов
+        sleep (:obj:`Callable`): функция ожидания
+        clock (:obj:`Callable`): монотонные часы
+
+    Returns:
+        :obj:`ReplayStats`: итоги воспроизведения.
+    """
+    states: Dict[str, PollState] = {}
+    counts = {"responses": 0, "unchanged": 0, "errors": 0, "messages": 0}
+    first_at = None
+    started = clock()
+
+    for record in records:
+        if first_at is None:
+            first_at = record.at
+        if speed:
+            delay = (record.at - first_at) / speed - (clock() - started)
+            if delay > 0:
+                sleep(delay)
+
+        if record.error is not None:
+            counts["errors"] += 1
+            continue
+        if record.response is None:
+            counts["unchanged"] += 1
+            continue
+
+        counts["responses"] += 1
+        state = states.setdefault(record.key, PollState(1))
+        try:
+            messages = replay_response(record.response, state, track_changes)
+        except Exception as error:
+            counts["errors"] += 1
+            logger.warning("Некорректный записанный ответ: %s", error)
+            continue
+
+        for message in messages:
+            homework.send_message(bot, message)
+        counts["messages"] += len(messages)
+
+    return ReplayStats(elapsed=clock() - started, **counts)
@@ -0,0 +1,177 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Callable, Iterator
+
+from exceptions import (
+    APIRequestException,
+    CircuitOpenException,
+    IncorrectStatusResponseCode,
+    JSONDecodeException,
+)
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+RETRY_BACKOFF_BASE = 30
+RETRY_BACKOFF_CAP = 600
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RECOVERY_TIMEOUT = 60
+
+RETRYABLE_STATUS_CODES = {
+    HTTPStatus.REQUEST_TIMEOUT,
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Ф-я классификации ошибки запроса к API.
+
+    Повторяются сетевые ошибки, некорректный JSON и статус-коды,
+    говорящие о проблеме на стороне API. Ошибки вроде 401 относятся к
+    конкретной подписке, повтор их не исправит.
+
+    Args:
+        error (:obj:`Exception`): ошибка запроса
+
+    Returns:
+        :obj:`bool`: True, если ошибка вызвана неисправностью API.
+    """
+    if isinstance(error, (APIRequestException, JSONDecodeException)):
+        return True
+
+    if isinstance(error, IncorrectStatusResponseCode):
+        return error.message in RETRYABLE_STATUS_CODES
+
+    return False
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_BACKOFF_BASE,
+    cap: float = RETRY_BACKOFF_CAP,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """Ф-я расчета экспоненциальной паузы с джиттером.
+
+    Половина паузы фиксирована, вторая половина случайна, поэтому
+    подписки, упавшие одновременно, повторяют запросы вразнобой.
+
+    Args:
+        attempt (:obj:`int`): номер неудачной попытки, начиная с 1
+        base (:obj:`float`): пауза после первой неудачи (секунды)
+        cap (:obj:`float`): максимальная пауза (секунды)
+        rng (:obj:`Callable`): источник случайных чисел в [0, 1)
+
+    Returns:
+        :obj:`float`: пауза до следующей попытки (секунды).
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    return delay / 2 + rng() * delay / 2
+
+
+class CircuitBreaker:
+    """Общий для всех подписок предохранитель запросов к API.
+
+    После `failure_threshold` ошибок подряд предохранитель размыкается
+    и на `recovery_timeout` секунд запрещает запросы всем подпискам.
+    Затем пропускается один пробный запрос: успех замыкает цепь,
+    ошибка снова размыкает ее.
+
+    Args:
+        failure_threshold (:obj:`int`): ошибок подряд до размыкания
+        recovery_timeout (:obj:`float`): время разомкнутого состояния
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует CircuitBreaker."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Секунды до пробного запроса (0, если цепь замкнута)."""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_timeout - self.clock())
+
+    def allow_request(self) -> bool:
+        """Проверяет, можно ли выполнить запрос."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and self.retry_in() == 0:
+                self.state = self.HALF_OPEN
+                logger.info("Пробный запрос к API после паузы")
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        """Учитывает успешный запрос."""
+        with self.lock:
+            if self.state != self.CLOSED:
+                logger.info("API снова доступно, запросы возобновлены")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """Учитывает ошибку API."""
+        with self.lock:
+            self.failures += 1
+
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    logger.error(
+                        "API недоступно, запросы приостановлены на %s с",
+                        self.recovery_timeout,
+                    )
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Оборачивает запрос к API.
+
+        Raises:
+            CircuitOpenException: если запросы приостановлены.
+        """
+        if not self.allow_request():
+            raise CircuitOpenException(self.retry_in())
+
+        try:
+            yield
+
+        except Exception as error:
+            if is_retryable(error):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+
+        else:
+            self.record_success()
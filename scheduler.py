@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from metrics import POLL_LAG
+from subscriptions import Subscription
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+SCHEDULER_TICK = 1.0
+
+POLL_INTERVAL_MIN = 60
+POLL_INTERVAL_MAX = 4 * 60 * 60
+POLL_INTERVAL_DECAY = 60 * 60
+POLL_INTERVAL_DEFAULT = 600
+POLL_INTERVALS = {
+    "reviewing": 120,
+    "rejected": 600,
+    "approved": 3600,
+}
+
+
+def slot_offset(key: str, period: float) -> float:
+    """Ф-я вычисления стабильного смещения опроса внутри периода.
+
+    Смещение зависит только от ключа, поэтому после перезапуска
+    подписка попадает в тот же слот, а слоты разных подписок
+    равномерно распределены по периоду.
+
+    Args:
+        key (:obj:`str`): ключ подписки
+        period (:obj:`float`): период опроса (секунды)
+
+    Returns:
+        :obj:`float`: смещение в диапазоне [0, period).
+    """
+    digest = hashlib.sha1(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64 * period
+
+
+class TimingWheel:
+    """Хешированное колесо таймеров.
+
+    Элемент попадает в ячейку `(cursor + ticks) % size` со счетчиком
+    оставшихся оборотов, поэтому постановка в очередь и поворот колеса
+    стоят O(1) на каждый элемент, независимо от общего их количества.
+
+    Args:
+        tick (:obj:`float`): длительность одного тика (секунды)
+        size (:obj:`int`): количество ячеек колеса.
+    """
+
+    def __init__(self, tick: float, size: int) -> None:
+        """Инициализирует TimingWheel."""
+        self.tick = tick
+        self.size = size
+        self.slots: List[list] = [[] for _ in range(size)]
+        self.cursor = 0
+        self.ticks = 0
+        self.pending = 0
+
+    def schedule(self, item: Any, delay: float) -> None:
+        """Ставит элемент на срабатывание через `delay` секунд.
+
+        Args:
+            item (:obj:`Any`): элемент
+            delay (:obj:`float`): задержка (секунды), не меньше одного тика.
+        """
+        ticks = max(1, round(delay / self.tick))
+        rounds = (ticks - 1) // self.size
+        self.slots[(self.cursor + ticks) % self.size].append([rounds, item])
+        self.pending += 1
+
+    def advance(self) -> list:
+        """Поворачивает колесо на один тик.
+
+        Returns:
+            :obj:`list`: элементы, срок которых наступил.
+        """
+        self.cursor = (self.cursor + 1) % self.size
+        self.ticks += 1
+
+        due = []
+        waiting = []
+        for entry in self.slots[self.cursor]:
+            if entry[0] == 0:
+                due.append(entry[1])
+            else:
+                entry[0] -= 1
+                waiting.append(entry)
+
+        self.slots[self.cursor] = waiting
+        self.pending -= len(due)
+        return due
+
+    def __len__(self) -> int:
+        """Количество запланированных элементов."""
+        return self.pending
+
+
+class AdaptiveInterval:
+    """Политика интервала опроса по последнему статусу домашней работы.
+
+    Базовый интервал берется по статусу и растет линейно с временем,
+    прошедшим с последней смены статуса: работу на ревью опрашиваем
+    часто, а давно принятую или неизвестную — все реже, но в пределах
+    `[min_interval, max_interval]`.
+
+    Args:
+        intervals (:obj:`dict`): базовые интервалы по статусам (секунды)
+        default (:obj:`float`): интервал для неизвестного статуса
+        min_interval (:obj:`float`): нижняя граница интервала
+        max_interval (:obj:`float`): верхняя граница интервала
+        decay (:obj:`float`): время без изменений, за которое базовый
+            интервал удваивается (секунды).
+    """
+
+    def __init__(
+        self,
+        intervals: Optional[Dict[str, float]] = None,
+        default: float = POLL_INTERVAL_DEFAULT,
+        min_interval: float = POLL_INTERVAL_MIN,
+        max_interval: float = POLL_INTERVAL_MAX,
+        decay: float = POLL_INTERVAL_DECAY,
+    ) -> None:
+        """Инициализирует AdaptiveInterval."""
+        if min_interval > max_interval:
+            raise ValueError("min_interval больше max_interval.")
+
+        self.intervals = POLL_INTERVALS if intervals is None else intervals
+        self.default = default
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decay = decay
+
+    def next_interval(
+        self, status: Optional[str], since_change: float
+    ) -> float:
+        """Вычисляет паузу до следующего опроса.
+
+        Args:
+            status (:obj:`str`): последний известный статус работы
+            since_change (:obj:`float`): секунды с последней смены статуса
+
+        Returns:
+            :obj:`float`: интервал до следующего опроса (секунды).
+        """
+        base = self.intervals.get(status, self.default)
+        interval = base * (1 + max(0, since_change) / self.decay)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+
+def run_timing_wheel(
+    subscriptions: Iterable[Subscription],
+    poll: Callable[[Subscription], Optional[float]],
+    period: float,
+    tick: float = SCHEDULER_TICK,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+    stopped: Optional[Callable[[], bool]] = None,
+    first_delay: Optional[Callable[[Subscription], float]] = None,
+) -> None:
+    """Ф-я опроса подписок в стабильных слотах внутри периода.
+
+    Первый опрос подписки выполняется со смещением `slot_offset`, так
+    что после перезапуска запросы не уходят разом, а частота запросов к
+    API остается равномерной. Следующий опрос планируется через
+    интервал, который вернул `poll`, или через `period`. Когда
+    `stopped` возвращает True, новые опросы не начинаются и ф-я
+    завершается.
+
+    Args:
+        subscriptions (:obj:`Iterable[Subscription]`): опрашиваемые подписки
+        poll (:obj:`Callable`): опрос одной подписки, возвращающий
+            интервал до следующего опроса или None
+        period (:obj:`float`): период опроса по умолчанию (секунды)
+        tick (:obj:`float`): шаг колеса (секунды)
+        sleep (:obj:`Callable`): функция ожидания
+        clock (:obj:`Callable`): монотонные часы
+        stopped (:obj:`Callable`): проверка запроса остановки
+        first_delay (:obj:`Callable`): пауза до первого опроса подписки
+            (по умолчанию `slot_offset` внутри `period`).
+    """
+    wheel = TimingWheel(tick, math.ceil(period / tick))
+
+    for subscription in subscriptions:
+        wheel.schedule(
+            subscription,
+            first_delay(subscription)
+            if first_delay is not None
+            else slot_offset(subscription.key, period),
+        )
+
+    started = clock()
+
+    while stopped is None or not stopped():
+        due = started + wheel.ticks * tick
+        for subscription in wheel.advance():
+            if stopped is not None and stopped():
+                return
+            POLL_LAG.set(max(0, clock() - due), subscription=subscription.key)
+            interval = poll(subscription)
+            wheel.schedule(subscription, interval or period)
+
+        lag = clock() - (started + wheel.ticks * tick)
+        if lag > period:
+            logger.warning("Опрос отстает от расписания на %.1f с", lag)
+        sleep(max(0, -lag))
@@ -0,0 +1,79 @@
+from typing import Callable, Sequence
+
+HOMEWORK_KEYS = ("homework_name", "status")
+
+
+def compile_homework_validator(
+    string_keys: Sequence[str] = HOMEWORK_KEYS,
+) -> Callable[[list], None]:
+    """Ф-я построения проверки элементов списка `homeworks`.
+
+    Каждый элемент должен быть словарем, а ключи `string_keys`, если
+    присутствуют, — строками. Отсутствие ключа не считается ошибкой
+    ответа: о нем сообщает `parse_status` для конкретной работы.
+
+    Args:
+        string_keys (:obj:`Sequence[str]`): ключи со строковыми значениями
+
+    Returns:
+        :obj:`Callable`: функция, вызывающая `TypeError` при ошибке.
+    """
+    keys = tuple(string_keys)
+
+    def validate(homeworks: list) -> None:
+        for homework in homeworks:
+            if not isinstance(homework, dict):
+                raise TypeError("Домашняя работа не является словарем.")
+            for key in keys:
+                value = homework.get(key)
+                if value is not None and not isinstance(value, str):
+                    raise TypeError(f'"{key}" не является строкой.')
+
+    return validate
+
+
+def compile_response_validator(
+    string_keys: Sequence[str] = HOMEWORK_KEYS,
+) -> Callable[[object], list]:
+    """Ф-я построения проверки ответа API за один проход.
+
+    Проверяет, что ответ — словарь с ключом `homeworks`, значение
+    которого — список словарей, `current_date`, если присутствует, —
+    целое число, а имя и статус каждой работы — строки. Ключи и
+    проверки работ связываются с замыканием заранее.
+
+    Args:
+        string_keys (:obj:`Sequence[str]`): ключи работ со строковыми
+            значениями
+
+    Returns:
+        :obj:`Callable`: функция, возвращающая список работ или
+        вызывающая `TypeError`/`KeyError`.
+    """
+    validate_homeworks = compile_homework_validator(string_keys)
+
+    def validate(response: object) -> list:
+        if not isinstance(response, dict):
+            raise TypeError(
+                f"Запрос вернул результат типа не Dict, а {type(response)}."
+            )
+
+        try:
+            homeworks = response["homeworks"]
+        except KeyError:
+            raise KeyError('Ответ не содержит ключа "homeworks".') from None
+
+        if not isinstance(homeworks, list):
+            raise TypeError('"homeworks" не является списком.')
+
+        current_date = response.get("current_date")
+        if current_date is not None and not isinstance(current_date, int):
+            raise TypeError('"current_date" не является целым числом.')
+
+        validate_homeworks(homeworks)
+        return homeworks
+
+    return validate
+
+
+validate_response = compile_response_validator()
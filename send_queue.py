@@ -0,0 +1,600 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import telegram
+
+from metrics import TELEGRAM_SEND_DURATION, TELEGRAM_SEND_FAILURES
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+PERMANENT_SEND_ERRORS = (
+    telegram.error.BadRequest,
+    telegram.error.Unauthorized,
+)
+
+TELEGRAM_GLOBAL_RATE = 30
+TELEGRAM_CHAT_RATE = 1
+SEND_QUEUE_WORKERS = 4
+
+_STOP = object()
+_RETRY = object()
+
+
+class TokenBucket:
+    """Ведро токенов с резервированием.
+
+    `reserve` сразу забирает токен и возвращает, сколько нужно подождать,
+    пока он станет доступен, поэтому одно ведро подходит и потокам, и
+    корутинам.
+
+    Args:
+        rate (:obj:`float`): скорость пополнения (токенов в секунду)
+        capacity (:obj:`float`): вместимость ведра (по умолчанию `rate`)
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует TokenBucket."""
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Резервирует токен.
+
+        Returns:
+            :obj:`float`: время ожидания до доступности токена (секунды).
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def delay(self) -> float:
+        """Время до появления токена, не забирая его (секунды)."""
+        with self.lock:
+            self._refill()
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Запрещает выдачу токенов на `seconds` секунд."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class RateLimiter:
+    """Общий и поканальный лимиты отправки сообщений в Телеграм.
+
+    Args:
+        global_rate (:obj:`float`): сообщений в секунду на бота
+        chat_rate (:obj:`float`): сообщений в секунду в один чат
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует RateLimiter."""
+        self.chat_rate = chat_rate
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, clock=clock)
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def chat_bucket(self, chat_id: str) -> TokenBucket:
+        """Возвращает ведро токенов чата."""
+        with self.lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(
+                    self.chat_rate, capacity=1, clock=self.clock
+                )
+                self.chat_buckets[chat_id] = bucket
+            return bucket
+
+    def reserve(self, chat_id: str) -> float:
+        """Резервирует отправку в чат.
+
+        Returns:
+            :obj:`float`: время ожидания до отправки (секунды).
+        """
+        return max(
+            self.chat_bucket(chat_id).reserve(), self.global_bucket.reserve()
+        )
+
+    def chat_delay(self, chat_id: str) -> float:
+        """Время до следующей отправки в чат, без резервирования."""
+        return self.chat_bucket(chat_id).delay()
+
+    def retry_after(self, chat_id: str, seconds: float) -> None:
+        """Учитывает `RetryAfter`: приостанавливает чат и бота целиком."""
+        self.chat_bucket(chat_id).pause(seconds)
+        self.global_bucket.pause(seconds)
+
+
+class ChatSchedule:
+    """Сообщения обработчика очереди, ждущие лимита своего чата.
+
+    Сообщение чата, в который еще рано отправлять, не задерживает
+    обработчик: оно откладывается в очередь своего чата, а чаты
+    упорядочены по времени готовности. Порядок сообщений внутри чата
+    сохраняется. Общий лимит бота резервируется только при отправке.
+
+    Args:
+        limiter (:obj:`RateLimiter`): лимиты отправки.
+    """
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        """Инициализирует ChatSchedule."""
+        self.limiter = limiter
+        self.waiting: Dict[str, Deque[tuple]] = {}
+        self.ready_at: List[Tuple[float, int, str]] = []
+        self.order = itertools.count()
+        self.size = 0
+
+    def __len__(self) -> int:
+        """Количество отложенных сообщений."""
+        return self.size
+
+    def _wait(self, chat_id: str, delay: float) -> None:
+        heapq.heappush(
+            self.ready_at,
+            (self.limiter.clock() + delay, next(self.order), chat_id),
+        )
+
+    def add(self, item: tuple) -> Optional[tuple]:
+        """Принимает сообщение `(chat_id, text, on_done)` из очереди.
+
+        Returns:
+            :obj:`tuple`: сообщение, если его можно отправить сразу, или
+            None, если оно отложено до готовности чата.
+        """
+        chat_id = item[0]
+        if chat_id not in self.waiting:
+            delay = self.limiter.chat_delay(chat_id)
+            if delay <= 0:
+                return item
+            self.waiting[chat_id] = deque()
+            self._wait(chat_id, delay)
+
+        self.waiting[chat_id].append(item)
+        self.size += 1
+        return None
+
+    def retry(self, item: tuple) -> None:
+        """Возвращает сообщение в начало очереди чата после `RetryAfter`."""
+        chat_id = item[0]
+        if chat_id not in self.waiting:
+            self.waiting[chat_id] = deque()
+            self._wait(chat_id, self.limiter.chat_delay(chat_id))
+
+        self.waiting[chat_id].appendleft(item)
+        self.size += 1
+
+    def pop_due(self) -> Optional[tuple]:
+        """Следующее сообщение чата, в который уже можно отправлять."""
+        while self.ready_at and self.ready_at[0][0] <= self.limiter.clock():
+            _, _, chat_id = heapq.heappop(self.ready_at)
+            delay = self.limiter.chat_delay(chat_id)
+            if delay > 0:
+                self._wait(chat_id, delay)
+                continue
+
+            messages = self.waiting[chat_id]
+            item = messages.popleft()
+            self.size -= 1
+            if messages:
+                self._wait(chat_id, 0)
+            else:
+                del self.waiting[chat_id]
+            return item
+
+        return None
+
+    def timeout(self) -> Optional[float]:
+        """Время до готовности ближайшего чата или None, если ждать нечего."""
+        if not self.ready_at:
+            return None
+        return max(0.0, self.ready_at[0][0] - self.limiter.clock())
+
+
+def send_result(error: telegram.error.TelegramError) -> Optional[bool]:
+    """Ф-я получения результата отправки, завершившейся ошибкой.
+
+    Args:
+        error (:obj:`telegram.error.TelegramError`): ошибка Bot API
+
+    Returns:
+        :obj:`bool`: False для постоянной ошибки (чат не найден, бот
+        заблокирован) или None для временной (сеть, таймаут), которую
+        нужно повторять.
+    """
+    if isinstance(error, PERMANENT_SEND_ERRORS):
+        return False
+    return None
+
+
+@contextmanager
+def send_timer() -> Iterator[None]:
+    """Контекстный менеджер учета длительности отправки сообщения.
+
+    Длительность записывается и для неудачных отправок: исход (`ok` или
+    имя исключения) попадает в метку `outcome`, поэтому медленные
+    таймауты видны на той же гистограмме.
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException as error:
+        outcome = type(error).__name__
+        raise
+    finally:
+        TELEGRAM_SEND_DURATION.observe(
+            time.perf_counter() - started, outcome=outcome
+        )
+
+
+def retry_send(
+    limiter: RateLimiter,
+    chat_id: str,
+    text: str,
+    error: telegram.error.TelegramError,
+) -> bool:
+    """Ф-я учета ошибки отправки, общая для `SendQueue` и `AsyncSendQueue`.
+
+    Args:
+        limiter (:obj:`RateLimiter`): лимиты отправки
+        chat_id (:obj:`str`): идентификатор чата
+        text (:obj:`str`): текст сообщения
+        error (:obj:`telegram.error.TelegramError`): ошибка Bot API
+
+    Returns:
+        :obj:`bool`: True, если сообщение нужно отправить повторно
+        (`RetryAfter`), иначе ошибка записана в журнал.
+    """
+    TELEGRAM_SEND_FAILURES.inc(error=type(error).__name__)
+    if isinstance(error, telegram.error.RetryAfter):
+        logger.warning(
+            'Превышен лимит отправки в чат "%s", повтор через %s с',
+            chat_id,
+            error.retry_after,
+        )
+        limiter.retry_after(chat_id, error.retry_after)
+        return True
+
+    logger.exception(
+        'Не удалось отправить сообщение "%s".\n Ошибка:"%s"', text, error
+    )
+    return False
+
+
+def finish(
+    on_done: Optional[Callable[[Optional[bool]], None]],
+    delivered: Optional[bool],
+) -> None:
+    """Ф-я передачи результата отправки в `on_done`.
+
+    Ошибка обработчика результата только записывается в журнал, чтобы
+    обработчик очереди продолжил отправку.
+    """
+    if on_done is None:
+        return
+    try:
+        on_done(delivered)
+    except Exception:
+        logger.exception("Сбой обработки результата отправки")
+
+
+def shard(chat_id: str, shards: int) -> int:
+    """Ф-я выбора обработчика для чата.
+
+    Все сообщения одного чата обрабатывает один и тот же обработчик,
+    поэтому они уходят в порядке постановки в очередь.
+    """
+    return zlib.crc32(str(chat_id).encode()) % shards
+
+
+class SendQueue:
+    """Очередь исходящих сообщений, отправляемых потоками-обработчиками.
+
+    `put` не блокирует цикл опроса: сообщение отправит поток, которому
+    принадлежит чат, с учетом лимитов `RateLimiter` и `RetryAfter`.
+    Пока чат ждет своего лимита, поток отправляет сообщения других
+    чатов (`ChatSchedule`).
+
+    Args:
+        bot (:obj:`telegram.Bot`): объект бот
+        workers (:obj:`int`): количество потоков-обработчиков
+        limiter (:obj:`RateLimiter`): лимиты отправки
+        sleep (:obj:`Callable`): функция ожидания.
+    """
+
+    def __init__(
+        self,
+        bot: telegram.Bot,
+        workers: int = SEND_QUEUE_WORKERS,
+        limiter: Optional[RateLimiter] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Инициализирует SendQueue."""
+        self.bot = bot
+        self.limiter = limiter or RateLimiter()
+        self.sleep = sleep
+        self.queues: List[queue.Queue] = [
+            queue.Queue() for _ in range(workers)
+        ]
+        self.schedules = [ChatSchedule(self.limiter) for _ in self.queues]
+        self.threads = [
+            threading.Thread(
+                target=self._work,
+                args=(shard_queue, schedule),
+                name=f"send-queue-{index}",
+                daemon=True,
+            )
+            for index, (shard_queue, schedule) in enumerate(
+                zip(self.queues, self.schedules)
+            )
+        ]
+
+    def start(self) -> "SendQueue":
+        """Запускает потоки-обработчики."""
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def put(
+        self,
+        chat_id: str,
+        text: str,
+        on_done: Optional[Callable[[Optional[bool]], None]] = None,
+    ) -> None:
+        """Ставит сообщение в очередь на отправку.
+
+        Args:
+            chat_id (:obj:`str`): идентификатор чата
+            text (:obj:`str`): текст сообщения
+            on_done (:obj:`Callable`): вызывается с результатом отправки.
+        """
+        self.queues[shard(chat_id, len(self.queues))].put(
+            (chat_id, text, on_done)
+        )
+        logger.debug('Сообщение в чат "%s" поставлено в очередь', chat_id)
+
+    def qsize(self) -> int:
+        """Количество сообщений, ожидающих отправки."""
+        return sum(shard_queue.qsize() for shard_queue in self.queues) + sum(
+            len(schedule) for schedule in self.schedules
+        )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Отправляет оставшиеся сообщения и останавливает обработчики.
+
+        Args:
+            timeout (:obj:`float`): общее время ожидания (секунды).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for shard_queue in self.queues:
+            shard_queue.put(_STOP)
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join(
+                    None
+                    if deadline is None
+                    else max(0, deadline - time.monotonic())
+                )
+
+    def _work(self, shard_queue: queue.Queue, schedule: ChatSchedule) -> None:
+        stopping = False
+        while not stopping or schedule:
+            item = schedule.pop_due()
+            if item is None:
+                try:
+                    item = shard_queue.get(timeout=schedule.timeout())
+                except queue.Empty:
+                    continue
+                if item is _STOP:
+                    stopping = True
+                    continue
+                item = schedule.add(item)
+                if item is None:
+                    continue
+            self._dispatch(schedule, item)
+
+    def _dispatch(self, schedule: ChatSchedule, item: tuple) -> None:
+        chat_id, text, on_done = item
+        try:
+            delivered = self._attempt(chat_id, text)
+        except Exception:
+            logger.exception('Сбой отправки сообщения в чат "%s"', chat_id)
+            delivered = None
+
+        if delivered is _RETRY:
+            schedule.retry(item)
+        else:
+            finish(on_done, delivered)
+
+    def _attempt(self, chat_id: str, text: str):
+        self.sleep(self.limiter.reserve(chat_id))
+
+        try:
+            with send_timer():
+                self.bot.send_message(chat_id=chat_id, text=text)
+
+        except telegram.error.TelegramError as error:
+            if retry_send(self.limiter, chat_id, text, error):
+                return _RETRY
+            return send_result(error)
+
+        logger.info('Успешно отправлено сообщение: "%s"', text)
+        return True
+
+    def deliver(self, chat_id: str, text: str) -> Optional[bool]:
+        """Отправляет сообщение, дожидаясь лимитов и `RetryAfter`.
+
+        Args:
+            chat_id (:obj:`str`): идентификатор чата
+            text (:obj:`str`): текст сообщения
+
+        Returns:
+            :obj:`bool`: True, если Телеграм принял сообщение, иначе
+            результат `send_result`.
+        """
+        while True:
+            delivered = self._attempt(chat_id, text)
+            if delivered is not _RETRY:
+                return delivered
+
+
+class AsyncSendQueue:
+    """Асинхронный аналог `SendQueue` на задачах asyncio.
+
+    Args:
+        bot: объект бот с корутиной `send_message(chat_id, text)`
+        workers (:obj:`int`): количество задач-обработчиков
+        limiter (:obj:`RateLimiter`): лимиты отправки.
+    """
+
+    def __init__(
+        self,
+        bot,
+        workers: int = SEND_QUEUE_WORKERS,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        """Инициализирует AsyncSendQueue."""
+        self.bot = bot
+        self.workers = workers
+        self.limiter = limiter or RateLimiter()
+        self.queues: List[asyncio.Queue] = []
+        self.schedules: List[ChatSchedule] = []
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self) -> "AsyncSendQueue":
+        """Запускает задачи-обработчики в текущем цикле событий."""
+        self.queues = [asyncio.Queue() for _ in range(self.workers)]
+        self.schedules = [ChatSchedule(self.limiter) for _ in self.queues]
+        self.tasks = [
+            asyncio.create_task(self._work(shard_queue, schedule))
+            for shard_queue, schedule in zip(self.queues, self.schedules)
+        ]
+        return self
+
+    def put(
+        self,
+        chat_id: str,
+        text: str,
+        on_done: Optional[Callable[[Optional[bool]], None]] = None,
+    ) -> None:
+        """Ставит сообщение в очередь на отправку."""
+        self.queues[shard(chat_id, len(self.queues))].put_nowait(
+            (chat_id, text, on_done)
+        )
+        logger.debug('Сообщение в чат "%s" поставлено в очередь', chat_id)
+
+    def qsize(self) -> int:
+        """Количество сообщений, ожидающих отправки."""
+        return sum(shard_queue.qsize() for shard_queue in self.queues) + sum(
+            len(schedule) for schedule in self.schedules
+        )
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Отправляет оставшиеся сообщения и останавливает обработчики."""
+        for shard_queue in self.queues:
+            shard_queue.put_nowait(_STOP)
+        await asyncio.wait(self.tasks, timeout=timeout)
+        for task in self.tasks:
+            task.cancel()
+
+    async def _work(
+        self, shard_queue: asyncio.Queue, schedule: ChatSchedule
+    ) -> None:
+        getter: Optional[asyncio.Future] = None
+        stopping = False
+        try:
+            while not stopping or schedule:
+                item = schedule.pop_due()
+                if item is None and stopping:
+                    await asyncio.sleep(schedule.timeout())
+                    continue
+                if item is None:
+                    getter = getter or asyncio.ensure_future(shard_queue.get())
+                    done, _ = await asyncio.wait(
+                        {getter}, timeout=schedule.timeout()
+                    )
+                    if not done:
+                        continue
+                    item, getter = getter.result(), None
+                    if item is _STOP:
+                        stopping = True
+                        continue
+                    item = schedule.add(item)
+                    if item is None:
+                        continue
+                await self._dispatch(schedule, item)
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    async def _dispatch(self, schedule: ChatSchedule, item: tuple) -> None:
+        chat_id, text, on_done = item
+        try:
+            delivered = await self._attempt(chat_id, text)
+        except Exception:
+            logger.exception('Сбой отправки сообщения в чат "%s"', chat_id)
+            delivered = None
+
+        if delivered is _RETRY:
+            schedule.retry(item)
+        else:
+            finish(on_done, delivered)
+
+    async def _attempt(self, chat_id: str, text: str):
+        await asyncio.sleep(self.limiter.reserve(chat_id))
+
+        try:
+            with send_timer():
+                await self.bot.send_message(chat_id=chat_id, text=text)
+
+        except telegram.error.TelegramError as error:
+            if retry_send(self.limiter, chat_id, text, error):
+                return _RETRY
+            return send_result(error)
+
+        logger.info('Успешно отправлено сообщение: "%s"', text)
+        return True
+
+    async def deliver(self, chat_id: str, text: str) -> Optional[bool]:
+        """Отправляет сообщение, дожидаясь лимитов и `RetryAfter`."""
+        while True:
+            delivered = await self._attempt(chat_id, text)
+            if delivered is not _RETRY:
+                return delivered
@@ -0,0 +1,83 @@
+import bisect
+import hashlib
+from typing import Iterable, List
+
+from subscriptions import Subscription
+
+HASH_RING_REPLICAS = 64
+
+
+def hash_point(value: str) -> int:
+    """Ф-я вычисления точки на кольце хешей.
+
+    Args:
+        value (:obj:`str`): ключ подписки или имя виртуального узла
+
+    Returns:
+        :obj:`int`: точка в диапазоне [0, 2**64).
+    """
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    """Кольцо согласованного хеширования с виртуальными узлами.
+
+    Каждый шард занимает `replicas` точек кольца, а ключ принадлежит
+    шарду первой точки по часовой стрелке. При изменении количества
+    шардов меняют владельца только ключи, попавшие на точки
+    добавленных или удаленных шардов, — около 1/N всех ключей.
+
+    Args:
+        shards (:obj:`int`): количество шардов
+        replicas (:obj:`int`): виртуальных узлов на шард.
+    """
+
+    def __init__(
+        self, shards: int, replicas: int = HASH_RING_REPLICAS
+    ) -> None:
+        """Инициализирует HashRing."""
+        if shards < 1:
+            raise ValueError("Количество шардов должно быть положительным.")
+
+        points = sorted(
+            (hash_point(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self.shards = shards
+        self.points = [point for point, _ in points]
+        self.owners = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        """Возвращает номер шарда для ключа.
+
+        Args:
+            key (:obj:`str`): ключ подписки
+
+        Returns:
+            :obj:`int`: номер шарда от 0 до `shards - 1`.
+        """
+        index = bisect.bisect(self.points, hash_point(key))
+        return self.owners[index % len(self.owners)]
+
+
+def shard_subscriptions(
+    subscriptions: Iterable[Subscription], shards: int
+) -> List[List[Subscription]]:
+    """Ф-я распределения подписок по шардам кольца хешей.
+
+    Args:
+        subscriptions (:obj:`Iterable[Subscription]`): все подписки
+        shards (:obj:`int`): количество шардов
+
+    Returns:
+        :obj:`list`: списки подписок по номерам шардов.
+    """
+    ring = HashRing(shards)
+    result: List[List[Subscription]] = [[] for _ in range(shards)]
+
+    for subscription in subscriptions:
+        result[ring.shard_for(subscription.key)].append(subscription)
+
+    return result
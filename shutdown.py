@@ -0,0 +1,95 @@
+import logging
+import signal
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+SHUTDOWN_TIMEOUT = 25.0
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+SHUTDOWN_POLL_INTERVAL = 0.5
+
+
+class GracefulShutdown:
+    """Плавная остановка бота по SIGTERM или SIGINT.
+
+    Сигнал только отмечает запрос остановки и начинает отсчет `timeout`:
+    цикл опроса перестает планировать новые опросы, завершает текущие
+    запросы к API и досылает очередь сообщений, пока не истечет срок.
+    Heroku после SIGTERM ждет 30 секунд, поэтому срок по умолчанию
+    меньше. Повторный SIGTERM не мешает остановке: его шлют и платформа
+    всем процессам dyno, и `workers.Supervisor` своим процессам. Сразу
+    завершает процесс только повторный SIGINT (второе нажатие Ctrl-C).
+
+    Args:
+        timeout (:obj:`float`): срок на завершение работы (секунды)
+        clock (:obj:`Callable`): монотонные часы.
+    """
+
+    def __init__(
+        self,
+        timeout: float = SHUTDOWN_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Инициализирует GracefulShutdown."""
+        self.timeout = timeout
+        self.clock = clock
+        self.event = threading.Event()
+        self.deadline: Optional[float] = None
+        self.handlers: Dict[int, object] = {}
+
+    def request(self, signum: Optional[int] = None, frame=None) -> None:
+        """Запрашивает остановку; подходит как обработчик сигнала."""
+        if self.event.is_set():
+            if signum == signal.SIGINT:
+                logger.warning("Повторный SIGINT, немедленный выход")
+                raise SystemExit(1)
+            return
+
+        self.deadline = self.clock() + self.timeout
+        self.event.set()
+        logger.info(
+            "Получен сигнал остановки, завершение работы за %.0f с",
+            self.timeout,
+        )
+
+    def is_set(self) -> bool:
+        """Проверяет, запрошена ли остановка."""
+        return self.event.is_set()
+
+    def wait(self, seconds: float) -> bool:
+        """Ждет `seconds` секунд или запроса остановки.
+
+        Returns:
+            :obj:`bool`: True, если запрошена остановка.
+        """
+        return self.event.wait(seconds)
+
+    async def wait_async(self) -> None:
+        """Корутина, завершающаяся после запроса остановки."""
+        import asyncio
+
+        while not self.event.is_set():
+            await asyncio.sleep(SHUTDOWN_POLL_INTERVAL)
+
+    def remaining(self) -> Optional[float]:
+        """Оставшееся до срока время или None, если остановки не было."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.clock())
+
+    def install(
+        self, signals: Iterable[int] = SHUTDOWN_SIGNALS
+    ) -> "GracefulShutdown":
+        """Устанавливает обработчики сигналов в основном потоке."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in signals:
+                self.handlers[signum] = signal.signal(signum, self.request)
+        return self
+
+    def restore(self) -> None:
+        """Возвращает обработчики сигналов, действовавшие до `install`."""
+        for signum, handler in self.handlers.items():
+            signal.signal(signum, handler)
+        self.handlers.clear()
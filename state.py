@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from conditional import ResponseValidators
+from records import intern_status
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+STATE_FLUSH_INTERVAL = 5.0
+STATE_FLUSH_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS poll_state (
+    key TEXT PRIMARY KEY,
+    cursor INTEGER NOT NULL,
+    last_error TEXT NOT NULL DEFAULT '',
+    homework_status TEXT,
+    status_changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS homework_status (
+    key TEXT NOT NULL,
+    homework_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (key, homework_name)
+) WITHOUT ROWID;
+"""
+
+
+class PollState:
+    """Состояние опроса одной подписки между циклами.
+
+    Args:
+        current_timestamp (:obj:`int`): курсор `from_date`, с которого
+            продолжить опрос (по умолчанию текущее время).
+    """
+
+    __slots__ = (
+        "current_timestamp",
+        "statuses",
+        "last_error",
+        "failures",
+        "homework_status",
+        "status_changed_at",
+        "validators",
+    )
+
+    def __init__(self, current_timestamp: Optional[int] = None) -> None:
+        """Инициализирует PollState."""
+        self.current_timestamp: int = current_timestamp or int(time.time())
+        self.statuses: Dict[str, str] = {}
+        self.last_error: str = ""
+        self.failures: int = 0
+        self.homework_status: Optional[str] = None
+        self.status_changed_at: float = time.time()
+        self.validators = ResponseValidators()
+
+    def record_status(self, homework_status: str) -> None:
+        """Запоминает статус работы и время его смены.
+
+        Args:
+            homework_status (:obj:`str`): статус из ответа API.
+        """
+        if homework_status != self.homework_status:
+            self.homework_status = homework_status
+            self.status_changed_at = time.time()
+
+    def since_change(self) -> float:
+        """Секунды с последней смены статуса."""
+        return time.time() - self.status_changed_at
+
+    def advance_cursor(self, response: dict) -> None:
+        """Сдвигает курсор на `current_date` из ответа API.
+
+        Сервер отдает все изменения до `current_date`, поэтому следующий
+        запрос с этой меткой вернет только новые изменения, без потерь
+        из-за расхождения часов.
+
+        Args:
+            response (:obj:`dict`): ответ API.
+        """
+        current_date = response.get("current_date")
+
+        if isinstance(current_date, int):
+            self.current_timestamp = current_date
+        else:
+            logger.warning("Ответ не содержит корректного current_date.")
+            self.current_timestamp = int(time.time())
+
+    def advance_unchanged(self) -> None:
+        """Сдвигает курсор по ответу, совпавшему с обработанным.
+
+        Такой ответ не разбирается, но его `current_date` запоминают
+        валидаторы подписки. После 304 тела нет, и курсор не меняется.
+        """
+        current_date = self.validators.current_date
+        self.validators.current_date = None
+        if current_date is not None:
+            self.current_timestamp = current_date
+
+
+class StateStore:
+    """Хранилище состояния подписок в SQLite в режиме WAL.
+
+    Хранит курсор, последнюю ошибку и статус каждой домашней работы.
+    `save` только запоминает снимок состояния в памяти, а на диск снимки
+    уходят одной транзакцией в `flush`, поэтому тысячи подписок не
+    приводят к fsync на каждый опрос.
+
+    Args:
+        path (:obj:`str`): путь к базе SQLite
+        flush_interval (:obj:`float`): минимальная пауза между записями
+        flush_batch (:obj:`int`): количество снимков, после которого
+            запись выполняется без ожидания интервала.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = STATE_FLUSH_INTERVAL,
+        flush_batch: int = STATE_FLUSH_BATCH,
+    ) -> None:
+        """Инициализирует StateStore."""
+        import sqlite3
+
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.pending: Dict[str, tuple] = {}
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def load(self, key: Optional[str] = None) -> Dict[str, PollState]:
+        """Загружает состояние подписок двумя запросами.
+
+        Args:
+            key (:obj:`str`): ключ одной подписки (по умолчанию все)
+
+        Returns:
+            :obj:`dict`: состояния опроса по ключам подписок.
+        """
+        states: Dict[str, PollState] = {}
+        where, parameters = "", ()
+        if key is not None:
+            where, parameters = " WHERE key = ?", (key,)
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT key, cursor, last_error, homework_status, "
+                "status_changed_at FROM poll_state" + where,
+                parameters,
+            ).fetchall()
+            statuses = self.connection.execute(
+                "SELECT key, homework_name, status FROM homework_status"
+                + where,
+                parameters,
+            ).fetchall()
+
+        for key, cursor, last_error, homework_status, changed_at in rows:
+            state = PollState(cursor)
+            state.last_error = last_error
+            state.homework_status = intern_status(homework_status)
+            state.status_changed_at = changed_at
+            states[key] = state
+
+        for key, homework_name, status in statuses:
+            if key in states:
+                states[key].statuses[homework_name] = intern_status(status)
+
+        logger.debug("Загружено состояний подписок: %d", len(states))
+        return states
+
+    def save(self, key: str, state: PollState) -> None:
+        """Запоминает снимок состояния подписки до следующей записи.
+
+        Args:
+            key (:obj:`str`): ключ подписки
+            state (:obj:`PollState`): состояние опроса.
+        """
+        snapshot = (
+            state.current_timestamp,
+            state.last_error,
+            state.homework_status,
+            state.status_changed_at,
+            dict(state.statuses),
+        )
+        with self.lock:
+            self.pending[key] = snapshot
+
+    def discard(self, key: str) -> None:
+        """Забывает незаписанный снимок подписки.
+
+        Нужен, когда подписку успел опросить другой экземпляр: его
+        состояние в базе новее, и старый снимок не должен его затереть.
+
+        Args:
+            key (:obj:`str`): ключ подписки.
+        """
+        with self.lock:
+            self.pending.pop(key, None)
+
+    def flush(self) -> None:
+        """Записывает накопленные снимки одной транзакцией."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+
+            if not pending:
+                return
+
+            rows = []
+            statuses = []
+            for key, snapshot in pending.items():
+                rows.append((key,) + snapshot[:4])
+                statuses.extend(
+                    (key, name, status) for name, status in snapshot[4].items()
+                )
+
+            with self.connection:
+                self.connection.execute("BEGIN")
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO poll_state VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO homework_status VALUES (?, ?, ?)",
+                    statuses,
+                )
+
+        logger.debug("Сохранено состояний подписок: %d", len(rows))
+
+    def flush_if_due(self) -> None:
+        """Записывает снимки, если набралась пачка или прошел интервал."""
+        if (
+            len(self.pending) >= self.flush_batch
+            or time.monotonic() - self.flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def close(self) -> None:
+        """Записывает оставшиеся снимки и закрывает базу."""
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class Subscription(NamedTuple):
+    """Подписка: токен Практикума и чаты, получающие уведомления.
+
+    Как и любой `NamedTuple`, запись не имеет словаря атрибутов
+    (`__slots__ = ()`), а идентификаторы чатов интернируются реестром,
+    поэтому чат из нескольких подписок хранится одной строкой.
+    """
+
+    practicum_token: str
+    chat_ids: Tuple[str, ...]
+
+    @property
+    def headers(self) -> dict:
+        """Заголовки запроса к API Практикума."""
+        return {"Authorization": f"OAuth {self.practicum_token}"}
+
+    @property
+    def key(self) -> str:
+        """Идентификатор подписки, не раскрывающий токен."""
+        return hashlib.sha1(self.practicum_token.encode()).hexdigest()[:12]
+
+
+def check_subscription(subscription: Subscription) -> bool:
+    """Ф-я проверки подписки.
+
+    Args:
+        subscription (:obj:`Subscription`): проверяемая подписка
+
+    Returns:
+        :obj:`bool`: True, если заданы токен и хотя бы один чат.
+    """
+    if not subscription.practicum_token:
+        logger.critical("Не задано значение для PRACTICUM_TOKEN подписки")
+        return False
+
+    if not any(subscription.chat_ids):
+        logger.critical(
+            'Не заданы чаты для подписки "%s"', subscription.key
+        )
+        return False
+
+    return True
+
+
+class SubscriptionRegistry:
+    """Реестр подписок: токен Практикума -> чаты для уведомлений."""
+
+    def __init__(self) -> None:
+        """Инициализирует SubscriptionRegistry."""
+        self._subscriptions: Dict[str, Subscription] = {}
+
+    def add(self, practicum_token: str, chat_id: str) -> Subscription:
+        """Добавляет чат к подписке на токен.
+
+        Args:
+            practicum_token (:obj:`str`): токен Практикума
+            chat_id (:obj:`str`): идентификатор чата
+
+        Returns:
+            :obj:`Subscription`: обновленная подписка.
+        """
+        chat_id = sys.intern(str(chat_id))
+        current = self._subscriptions.get(practicum_token)
+        chat_ids = current.chat_ids if current else ()
+
+        if chat_id not in chat_ids:
+            chat_ids += (chat_id,)
+
+        subscription = Subscription(practicum_token, chat_ids)
+        self._subscriptions[practicum_token] = subscription
+        return subscription
+
+    def get(self, practicum_token: str) -> Optional[Subscription]:
+        """Возвращает подписку по токену."""
+        return self._subscriptions.get(practicum_token)
+
+    def valid(self) -> List[Subscription]:
+        """Возвращает подписки, прошедшие проверку `check_subscription`."""
+        return [s for s in self if check_subscription(s)]
+
+    def __iter__(self) -> Iterator[Subscription]:
+        """Перебирает подписки в порядке добавления."""
+        return iter(list(self._subscriptions.values()))
+
+    def __len__(self) -> int:
+        """Количество подписок."""
+        return len(self._subscriptions)
+
+
+def load_json_subscriptions(path: str) -> SubscriptionRegistry:
+    """Ф-я загрузки подписок из JSON-файла вида {"токен": ["чат", ...]}.
+
+    Args:
+        path (:obj:`str`): путь к файлу
+
+    Returns:
+        :obj:`SubscriptionRegistry`: реестр подписок.
+    """
+    registry = SubscriptionRegistry()
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    if not isinstance(data, dict):
+        raise TypeError(f"Файл подписок {path} должен содержать объект.")
+
+    for practicum_token, chat_ids in data.items():
+        if not isinstance(chat_ids, list):
+            chat_ids = [chat_ids]
+        for chat_id in chat_ids:
+            registry.add(practicum_token, chat_id)
+
+    return registry
+
+
+def load_sqlite_subscriptions(path: str) -> SubscriptionRegistry:
+    """Ф-я загрузки подписок из таблицы `subscriptions` базы SQLite.
+
+    Таблица содержит столбцы `practicum_token` и `chat_id`, по строке
+    на каждую пару токен-чат.
+
+    Args:
+        path (:obj:`str`): путь к базе
+
+    Returns:
+        :obj:`SubscriptionRegistry`: реестр подписок.
+    """
+    import sqlite3
+
+    registry = SubscriptionRegistry()
+    connection = sqlite3.connect(path)
+
+    try:
+        rows = connection.execute(
+            "SELECT practicum_token, chat_id FROM subscriptions"
+        ).fetchall()
+    finally:
+        connection.close()
+
+    for practicum_token, chat_id in rows:
+        registry.add(practicum_token, chat_id)
+
+    return registry
+
+
+def load_subscriptions(path: str) -> SubscriptionRegistry:
+    """Ф-я загрузки подписок из JSON-файла или базы SQLite.
+
+    Args:
+        path (:obj:`str`): путь к файлу подписок
+
+    Returns:
+        :obj:`SubscriptionRegistry`: реестр подписок.
+    """
+    if os.path.splitext(path)[1] in SQLITE_SUFFIXES:
+        registry = load_sqlite_subscriptions(path)
+    else:
+        registry = load_json_subscriptions(path)
+
+    logger.debug("Загружено подписок: %d", len(registry))
+    return registry
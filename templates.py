@@ -0,0 +1,148 @@
+from functools import lru_cache
+from typing import Dict, Mapping, NamedTuple, Optional
+
+DEFAULT_LOCALE = "ru"
+MESSAGE_CACHE_SIZE = 10_000
+
+MESSAGE_FORMATS = {
+    "ru": 'Изменился статус проверки работы "{homework_name}". {verdict}',
+    "en": 'Review status of "{homework_name}" has changed. {verdict}',
+}
+
+DIGEST_HEADERS = {
+    "ru": "Изменения статусов проверки ({count}):",
+    "en": "Review status updates ({count}):",
+}
+
+VERDICTS_EN = {
+    "approved": "The reviewer approved the work. Hooray!",
+    "reviewing": "The work is being reviewed.",
+    "rejected": "The reviewer left some comments.",
+}
+
+
+class Notification(NamedTuple):
+    """Уведомление о смене статуса домашней работы."""
+
+    homework_name: str
+    status: str
+    verdict: str
+    text: str
+
+
+class StatusTemplate(NamedTuple):
+    """Шаблон сообщения для одного статуса, разделенный по имени работы.
+
+    Вердикт подставляется при компиляции, поэтому при отрисовке остается
+    только склеить префикс, имя работы и суффикс.
+    """
+
+    status: str
+    verdict: str
+    prefix: str
+    suffix: str
+
+    def render(self, homework_name: str) -> Notification:
+        """Создает уведомление для работы.
+
+        Args:
+            homework_name (:obj:`str`): имя работы
+
+        Returns:
+            :obj:`Notification`: уведомление с готовым текстом.
+        """
+        return Notification(
+            homework_name,
+            self.status,
+            self.verdict,
+            self.prefix + homework_name + self.suffix,
+        )
+
+
+def compile_template(
+    message_format: str, status: str, verdict: str
+) -> StatusTemplate:
+    """Ф-я компиляции шаблона сообщения для статуса.
+
+    Args:
+        message_format (:obj:`str`): строка формата с полями
+            `{homework_name}` и `{verdict}`
+        status (:obj:`str`): статус работы
+        verdict (:obj:`str`): вердикт для статуса
+
+    Returns:
+        :obj:`StatusTemplate`: скомпилированный шаблон.
+    """
+    prefix, field, suffix = message_format.partition("{homework_name}")
+    if not field:
+        raise ValueError(
+            f'Шаблон "{message_format}" не содержит поля {{homework_name}}.'
+        )
+
+    return StatusTemplate(
+        status,
+        verdict,
+        prefix.format(verdict=verdict),
+        suffix.format(verdict=verdict),
+    )
+
+
+class MessageTemplates:
+    """Скомпилированные шаблоны сообщений по статусам и локалям.
+
+    Шаблоны строятся один раз при создании, а готовые уведомления
+    запоминаются по (имя работы, статус, локаль) в ограниченном
+    LRU-кэше, поэтому повторные опросы не собирают строки заново.
+
+    Args:
+        verdicts (:obj:`Mapping`): вердикты по статусам для каждой локали
+        formats (:obj:`Mapping`): строки формата сообщений по локалям
+        default_locale (:obj:`str`): локаль для неизвестных локалей и
+            статусов без перевода
+        cache_size (:obj:`int`): максимальный размер кэша уведомлений.
+    """
+
+    def __init__(
+        self,
+        verdicts: Mapping[str, Mapping[str, str]],
+        formats: Mapping[str, str] = MESSAGE_FORMATS,
+        default_locale: str = DEFAULT_LOCALE,
+        cache_size: int = MESSAGE_CACHE_SIZE,
+    ) -> None:
+        """Инициализирует MessageTemplates."""
+        self.default_locale = default_locale
+        self.templates: Dict[tuple, StatusTemplate] = {
+            (locale, status): compile_template(
+                formats[locale], status, verdict
+            )
+            for locale, statuses in verdicts.items()
+            for status, verdict in statuses.items()
+        }
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def get(
+        self, status: str, locale: Optional[str] = None
+    ) -> Optional[StatusTemplate]:
+        """Возвращает шаблон для статуса.
+
+        Args:
+            status (:obj:`str`): статус работы
+            locale (:obj:`str`): локаль (по умолчанию `default_locale`)
+
+        Returns:
+            :obj:`StatusTemplate`: шаблон или None для неизвестного
+            статуса.
+        """
+        template = self.templates.get((locale or self.default_locale, status))
+        if template is None and locale:
+            template = self.templates.get((self.default_locale, status))
+        return template
+
+    def _render(
+        self, homework_name: str, status: str, locale: Optional[str] = None
+    ) -> Notification:
+        """Создает уведомление, вызывая KeyError для неизвестного статуса."""
+        template = self.get(status, locale)
+        if template is None:
+            raise KeyError(status)
+        return template.render(homework_name)
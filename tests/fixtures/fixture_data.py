@@ -2,6 +2,7 @@ import random
 from datetime import datetime
 
 import pytest
+import requests
 
 
 @pytest.fixture
@@ -19,3 +20,17 @@ def current_timestamp():
 @pytest.fixture
 def api_url():
     return "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+
+
+@pytest.fixture
+def session_get_through_requests_get(monkeypatch):
+    """Направляет запросы сессии клиента через `requests.get`.
+
+    Тесты подменяют `requests.get`, а бот ходит в API через
+    `requests.Session`, поэтому пропускаем вызовы сессии через него.
+    """
+    monkeypatch.setattr(
+        requests.Session,
+        "get",
+        lambda self, url, **kwargs: requests.get(url, **kwargs),
+    )
@@ -0,0 +1,34 @@
+from api_client import PracticumClient
+from benchmarks.stubs import PracticumStubServer
+
+
+class TestPracticumClient:
+    def test_reuses_connection(self):
+        payload = {"homeworks": [], "current_date": 123}
+        with PracticumStubServer(payload) as server:
+            with PracticumClient(server.url) as client:
+                for timestamp in range(5):
+                    response = client.get({"from_date": timestamp})
+                    assert response.json() == payload
+            assert server.connections == 1, (
+                "Клиент должен переиспользовать keep-alive соединение"
+            )
+
+    def test_passes_headers_and_timeout(self, monkeypatch):
+        calls = []
+
+        def mock_get(self, url, **kwargs):
+            calls.append((url, kwargs))
+
+        monkeypatch.setattr("requests.Session.get", mock_get)
+        client = PracticumClient(
+            "http://example.test/", headers={"Authorization": "OAuth t"},
+            timeout=(1, 2),
+        )
+        client.get({"from_date": 1})
+        client.get({"from_date": 2}, headers={"Authorization": "OAuth x"})
+
+        assert calls[0][1]["headers"] == {"Authorization": "OAuth t"}
+        assert calls[0][1]["timeout"] == (1, 2)
+        assert calls[1][1]["headers"] == {"Authorization": "OAuth x"}
+        assert client.session.headers["Authorization"] == "OAuth t"
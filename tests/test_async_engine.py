@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+import telegram
+
+from async_engine import AsyncPoller, AsyncPracticumClient, AsyncTelegramBot
+from benchmarks.stubs import PracticumStubServer
+from exceptions import IncorrectStatusResponseCode, JSONDecodeException
+from send_queue import send_result
+from subscriptions import Subscription
+from utils import MockSender
+
+
+async def poll(url, times):
+    sender = MockSender()
+    async with aiohttp.ClientSession() as session:
+        client = AsyncPracticumClient(session, url)
+        poller = AsyncPoller(client, sender, Subscription("token", ("42",)))
+        for _ in range(times):
+            await poller.poll_once()
+    return sender.sent
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, body=b""):
+        self.status = status
+        self.payload = payload
+        self.body = body
+        self.headers = {}
+
+    async def read(self):
+        return self.body
+
+    async def json(self, content_type=None):
+        if self.payload is None:
+            raise json.JSONDecodeError("Expecting value", "<html>", 0)
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, headers=None, params=None):
+        return self.response
+
+    def post(self, url, json=None):
+        return self.response
+
+
+def send_with_reply(status, payload=None):
+    bot = AsyncTelegramBot(FakeSession(FakeResponse(status, payload)), "t")
+    return asyncio.run(bot.send_message("1", "text"))
+
+
+class TestAsyncEngine:
+    def test_status_sent_once(self):
+        payload = {
+            "homeworks": [{"homework_name": "hw.zip", "status": "approved"}],
+            "current_date": 1,
+        }
+        with PracticumStubServer(payload) as server:
+            sent = asyncio.run(poll(server.url, 3))
+
+        assert len(sent) == 1
+        assert sent[0][0] == "42"
+        assert sent[0][1].startswith('Изменился статус проверки работы "hw.zip"')
+
+    def test_invalid_response_reported_once(self):
+        with PracticumStubServer({"current_date": 1}) as server:
+            sent = asyncio.run(poll(server.url, 3))
+
+        assert len(sent) == 1
+
+    def test_incorrect_status_code(self):
+        async def request(url):
+            async with aiohttp.ClientSession() as session:
+                client = AsyncPracticumClient(session, url)
+                await client.get_api_answer(1, {"Authorization": "OAuth t"})
+
+        with PracticumStubServer(status_code=500) as server:
+            with pytest.raises(IncorrectStatusResponseCode):
+                asyncio.run(request(server.url))
+
+    def test_unparsable_bot_api_reply_is_network_error(self):
+        with pytest.raises(telegram.error.NetworkError):
+            send_with_reply(502)
+
+    def test_undecodable_body_is_not_copied_into_error(self):
+        body = b"<html>" + b"x" * 20000 + b"</html>"
+        session = FakeSession(FakeResponse(200, body=body))
+        client = AsyncPracticumClient(session)
+
+        with pytest.raises(JSONDecodeException) as error:
+            asyncio.run(client.get_api_answer(1, {}))
+
+        assert str(error.value) == (
+            "Ошибка при преобразовании JSON из: <Response [200]>."
+        )
+
+    @pytest.mark.parametrize(
+        "status, reply, error, result",
+        [
+            (400, "Bad Request: chat not found", telegram.error.BadRequest, False),
+            (
+                403,
+                "Forbidden: bot was blocked by the user",
+                telegram.error.Unauthorized,
+                False,
+            ),
+            (500, "Internal Server Error", telegram.error.NetworkError, None),
+        ],
+    )
+    def test_bot_api_errors_are_classified(self, status, reply, error, result):
+        payload = {"ok": False, "error_code": status, "description": reply}
+
+        with pytest.raises(error) as raised:
+            send_with_reply(status, payload)
+
+        assert send_result(raised.value) is result
+
+    def test_bot_api_retry_after(self):
+        payload = {
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 5",
+            "parameters": {"retry_after": 5},
+        }
+
+        with pytest.raises(telegram.error.RetryAfter) as raised:
+            send_with_reply(429, payload)
+
+        assert raised.value.retry_after == 5
@@ -1,10 +1,13 @@
 import os
 from http import HTTPStatus
 
+import pytest
 import requests
 import telegram
 import utils
 
+pytestmark = pytest.mark.usefixtures("session_get_through_requests_get")
+
 
 class MockResponseGET:
     def __init__(
@@ -0,0 +1,87 @@
+import homework
+from api_client import PracticumClient
+from benchmarks.stubs import PracticumStubServer
+from conditional import ResponseValidators
+from dedup import ErrorDedupCache
+from resilience import CircuitBreaker
+from state import PollState
+from subscriptions import Subscription
+from utils import MockSender
+
+
+def poll_times(monkeypatch, server, times, state):
+    sender = MockSender()
+    monkeypatch.setattr(
+        homework, "_practicum_client", PracticumClient(server.url)
+    )
+    monkeypatch.setattr(homework, "circuit_breaker", CircuitBreaker())
+    monkeypatch.setattr(homework, "error_dedup", ErrorDedupCache())
+    subscription = Subscription("token", ("1",))
+    for _ in range(times):
+        homework.poll_subscription(sender, subscription, state)
+    return sender.sent
+
+
+class TestConditionalRequests:
+    def test_validators_committed_after_success(self):
+        validators = ResponseValidators()
+
+        assert not validators.is_unchanged({"ETag": '"a"'}, b"body")
+        assert validators.request_headers({"A": "1"}) == {"A": "1"}
+        assert not validators.is_unchanged({"ETag": '"a"'}, b"body")
+
+        validators.commit()
+        assert validators.is_unchanged({}, b"body")
+        assert validators.request_headers({"A": "1"}) == {
+            "A": "1",
+            "If-None-Match": '"a"',
+        }
+
+    def test_current_date_ignored_but_cursor_advances(self):
+        state = PollState(1)
+        homeworks = b'{"homeworks":[{"homework_name":"hw"}],'
+
+        assert not state.validators.is_unchanged(
+            {}, homeworks + b'"current_date":10}'
+        )
+        state.validators.commit()
+        assert state.validators.is_unchanged(
+            {}, homeworks + b'"current_date": 20}'
+        )
+        state.advance_unchanged()
+
+        assert state.current_timestamp == 20
+        assert not state.validators.is_unchanged(
+            {}, b'{"homeworks":[],"current_date":30}'
+        )
+
+    def test_etag_not_modified(self, monkeypatch):
+        with PracticumStubServer(script=["reviewing"], etag=True) as server:
+            sent = poll_times(monkeypatch, server, 3, PollState())
+
+        assert server.not_modified == 2
+        assert len(sent) == 1
+
+    def test_same_body_skips_parsing(self, monkeypatch):
+        checked = []
+        check_response = homework.check_response
+        monkeypatch.setattr(
+            homework,
+            "check_response",
+            lambda response: checked.append(response)
+            or check_response(response),
+        )
+        with PracticumStubServer(script=["reviewing"]) as server:
+            sent = poll_times(monkeypatch, server, 3, PollState())
+
+        assert len(checked) == 1
+        assert len(sent) == 1
+
+    def test_failed_response_not_skipped(self, monkeypatch):
+        payload = {"homeworks": "hw"}
+        state = PollState()
+        with PracticumStubServer(payload) as server:
+            poll_times(monkeypatch, server, 2, state)
+
+        assert state.last_error
+        assert state.validators.digest is None
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import decoding
+import homework
+from conditional import ResponseValidators
+from exceptions import JSONDecodeException
+
+
+class MockResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+
+class TestDecoding:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_decoders_raise_json_decode_error(self, monkeypatch, use_orjson):
+        if use_orjson and decoding.orjson is None:
+            pytest.skip("orjson не установлен")
+        if not use_orjson:
+            monkeypatch.setattr(decoding, "orjson", None)
+        loads = decoding.get_loads()
+
+        assert loads(b'{"homeworks": []}') == {"homeworks": []}
+        with pytest.raises(json.JSONDecodeError):
+            loads(b"<html>")
+
+    def test_invalid_body_raises_json_decode_exception(self):
+        with pytest.raises(JSONDecodeException):
+            homework.decode_homework_statuses(
+                MockResponse(b"<html>"), ResponseValidators()
+            )
+
+    def test_body_decoded_with_fast_decoder(self):
+        response = homework.decode_homework_statuses(
+            MockResponse(b'{"homeworks": [], "current_date": 1}'),
+            ResponseValidators(),
+        )
+
+        assert response == {"homeworks": [], "current_date": 1}
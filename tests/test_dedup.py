@@ -0,0 +1,63 @@
+import homework
+from dedup import ErrorDedupCache, normalize_message
+from exceptions import IncorrectStatusResponseCode
+from state import PollState
+from subscriptions import Subscription
+from utils import FakeClock
+
+
+class TestErrorDedupCache:
+    def test_normalize_message(self):
+        assert normalize_message("code  500\n at 1650000000") == "code 5xx at #"
+
+    def test_status_codes_are_not_merged(self):
+        cache = ErrorDedupCache()
+
+        assert cache.should_notify("key", IncorrectStatusResponseCode(500))
+        assert cache.should_notify("key", IncorrectStatusResponseCode(401))
+        assert not cache.should_notify("key", IncorrectStatusResponseCode(401))
+
+    def test_repeated_error_notified_once_per_window(self):
+        clock = FakeClock()
+        cache = ErrorDedupCache(ttl=60, clock=clock)
+
+        assert cache.should_notify("a", KeyError("homeworks"))
+        assert not cache.should_notify("a", KeyError("homeworks"))
+        assert cache.should_notify("b", KeyError("homeworks"))
+        assert cache.should_notify("a", TypeError("homeworks"))
+        assert cache.should_notify("a", IncorrectStatusResponseCode(502))
+        assert not cache.should_notify("a", IncorrectStatusResponseCode(503))
+
+        clock.now = 61
+        assert cache.should_notify("a", KeyError("homeworks"))
+
+    def test_bounded(self):
+        cache = ErrorDedupCache(maxsize=3)
+
+        for key in "abcde":
+            cache.should_notify(key, KeyError("homeworks"))
+
+        assert len(cache) == 3
+        assert cache.should_notify("a", KeyError("homeworks"))
+        assert not cache.should_notify("e", KeyError("homeworks"))
+
+    def test_poll_subscription_dedups_errors(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(
+            homework, "request_homework_statuses", lambda *args: {}
+        )
+        monkeypatch.setattr(homework, "error_dedup", ErrorDedupCache())
+        monkeypatch.setattr(
+            homework,
+            "notify",
+            lambda sender, subscription, text: sent.append(text),
+        )
+        state = PollState(1)
+
+        for _ in range(5):
+            homework.poll_subscription(
+                None, Subscription("token", ("1",)), state
+            )
+
+        assert len(sent) == 1
+        assert state.last_error
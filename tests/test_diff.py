@@ -0,0 +1,66 @@
+import pytest
+
+import homework
+from diff import diff_homeworks
+from state import PollState
+
+
+class TestDiff:
+    def test_only_real_transitions(self):
+        homeworks = [
+            {"homework_name": "b.zip", "status": "approved"},
+            {"homework_name": "a.zip", "status": "reviewing"},
+        ]
+
+        transitions = diff_homeworks(homeworks, {"a.zip": "reviewing"})
+
+        assert [(t.homework_name, t.previous, t.status) for t in transitions] == [
+            ("b.zip", None, "approved")
+        ]
+
+    def test_newest_entry_wins_and_order_is_chronological(self):
+        homeworks = [
+            {"homework_name": "b.zip", "status": "approved"},
+            {"homework_name": "a.zip", "status": "approved"},
+            {"homework_name": "a.zip", "status": "reviewing"},
+        ]
+
+        transitions = diff_homeworks(homeworks, {})
+
+        assert [(t.homework_name, t.status) for t in transitions] == [
+            ("a.zip", "approved"),
+            ("b.zip", "approved"),
+        ]
+
+    def test_process_homeworks_reports_every_change(self):
+        state = PollState(1)
+        homeworks = [
+            {"homework_name": "b.zip", "status": "approved"},
+            {"homework_name": "a.zip", "status": "rejected"},
+        ]
+
+        messages = homework.process_homeworks(homeworks, state)
+
+        assert len(messages) == 2
+        assert [m.homework_name for m in messages] == ["a.zip", "b.zip"]
+        assert '"a.zip"' in messages[0].text and '"b.zip"' in messages[1].text
+        assert state.statuses == {"a.zip": "rejected", "b.zip": "approved"}
+        assert homework.process_homeworks(homeworks, state) == []
+
+    def test_invalid_homework_does_not_block_others(self):
+        state = PollState(1)
+        errors = []
+        homeworks = [
+            {"homework_name": "b.zip", "status": "unknown"},
+            {"homework_name": "a.zip", "status": "approved"},
+            {"status": "approved"},
+        ]
+
+        messages = homework.process_homeworks(homeworks, state, errors)
+
+        assert [m.homework_name for m in messages] == ["a.zip"]
+        assert state.statuses == {"a.zip": "approved"}
+        assert sorted(type(error).__name__ for error in errors) == [
+            "IncorrectHomeworkStatus",
+            "KeyError",
+        ]
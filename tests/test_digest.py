@@ -0,0 +1,91 @@
+from digest import DigestQueue, format_digest, split_digest
+from utils import FakeClock, MockQueue
+
+
+def make_digest(window=10):
+    queue = MockQueue()
+    clock = FakeClock()
+    return DigestQueue(queue, window, "Обновления ({count}):", clock), queue
+
+
+class TestDigestQueue:
+    def test_first_message_is_sent_immediately(self):
+        digest, queue = make_digest()
+        digest.put("1", "first")
+
+        assert [text for _, text, _ in queue.items] == ["first"]
+        assert digest.qsize() == 0
+
+    def test_burst_is_sent_as_one_message(self):
+        digest, queue = make_digest()
+        digest.put("1", "first")
+        digest.put("1", "second")
+        digest.put("1", "third")
+        digest.put("2", "other")
+
+        assert digest.flush() == 0
+        assert digest.qsize() == 2
+
+        digest.clock.now = 10
+        assert digest.flush() == 1
+        assert queue.items[-1][:2] == (
+            "1",
+            "Обновления (2):\n\nsecond\n\nthird",
+        )
+        assert [item[1] for item in queue.items] == [
+            "first",
+            "other",
+            queue.items[-1][1],
+        ]
+
+    def test_digest_reports_every_notification(self):
+        digest, queue = make_digest()
+        results = []
+        digest.put("1", "first")
+        digest.put("1", "second", lambda ok: results.append(("second", ok)))
+        digest.put("1", "third", lambda ok: results.append(("third", ok)))
+        digest.clock.now = 10
+        digest.flush()
+
+        queue.items[-1][2](True)
+
+        assert results == [("second", True), ("third", True)]
+
+    def test_single_pending_message_is_sent_as_is(self):
+        digest, queue = make_digest()
+        digest.put("1", "first")
+        digest.put("1", "second")
+        digest.clock.now = 10
+        digest.flush()
+
+        assert queue.items[-1][1] == "second"
+
+    def test_idle_chat_returns_to_immediate_sending(self):
+        digest, queue = make_digest()
+        digest.put("1", "first")
+        digest.clock.now = 10
+        digest.flush()
+        digest.clock.now = 11
+        digest.put("1", "second")
+
+        assert [text for _, text, _ in queue.items] == ["first", "second"]
+
+    def test_close_sends_pending_messages(self):
+        digest, queue = make_digest()
+        digest.put("1", "first")
+        digest.put("1", "second")
+        digest.put("1", "third")
+        digest.close()
+
+        assert len(queue.items) == 2
+        assert digest.qsize() == 0
+
+
+def test_split_digest_respects_message_limit():
+    items = [("x" * 40, None) for _ in range(5)]
+
+    groups = split_digest(items, "h", limit=100)
+
+    assert [len(group) for group in groups] == [2, 2, 1]
+    for group in groups:
+        assert len(format_digest([text for text, _ in group], "h")) <= 100
@@ -0,0 +1,149 @@
+import homework
+from leases import ShardLeases
+from state import PollState, StateStore
+from utils import FakeClock
+
+KEYS = [f"key-{index}" for index in range(200)]
+
+
+def make_leases(tmp_path, owner, clock, **kwargs):
+    return ShardLeases(
+        str(tmp_path / "leases.db"), owner, shards=8, clock=clock, **kwargs
+    )
+
+
+def owned_keys(leases):
+    return {key for key in KEYS if leases.owns(key)}
+
+
+class TestLeases:
+    def test_single_instance_takes_every_shard(self, tmp_path):
+        leases = make_leases(tmp_path, "a", FakeClock(1000.0))
+
+        assert leases.heartbeat() == set(range(8))
+        assert owned_keys(leases) == set(KEYS)
+
+    def test_new_instance_gets_half_without_overlap(self, tmp_path):
+        clock = FakeClock(1000.0)
+        released = []
+        first = make_leases(
+            tmp_path, "a", clock, on_release=lambda: released.append(1)
+        )
+        second = make_leases(tmp_path, "b", clock)
+        first.heartbeat()
+
+        for _ in range(3):
+            clock.now += first.interval
+            second.heartbeat()
+            first.heartbeat()
+            assert not owned_keys(first) & owned_keys(second)
+
+        second.heartbeat()
+        assert len(first.held) == len(second.held) == 4
+        assert owned_keys(first) | owned_keys(second) == set(KEYS)
+        assert released
+
+    def test_expired_instance_is_taken_over(self, tmp_path):
+        clock = FakeClock(1000.0)
+        first = make_leases(tmp_path, "a", clock)
+        second = make_leases(tmp_path, "b", clock)
+        first.heartbeat()
+
+        assert second.heartbeat() == set()
+        clock.now += first.ttl + 1
+
+        assert second.heartbeat() == set(range(8))
+
+    def test_close_releases_immediately(self, tmp_path):
+        clock = FakeClock(1000.0)
+        first = make_leases(tmp_path, "a", clock)
+        second = make_leases(tmp_path, "b", clock)
+        first.heartbeat()
+
+        first.close()
+
+        assert second.heartbeat() == set(range(8))
+        assert not first.owns(KEYS[0])
+
+    def test_duplicate_instance_id_waits(self, tmp_path):
+        clock = FakeClock(1000.0)
+        first = make_leases(tmp_path, "a", clock)
+        duplicate = make_leases(tmp_path, "a", clock)
+        first.heartbeat()
+
+        assert duplicate.heartbeat() == set()
+        assert owned_keys(duplicate) == set()
+
+    def test_state_follows_shard_to_new_owner(self, tmp_path):
+        clock = FakeClock(1000.0)
+        store = StateStore(str(tmp_path / "state.db"))
+        first = make_leases(tmp_path, "a", clock, on_release=store.flush)
+        first.heartbeat()
+        states = {}
+        state = homework.leased_state(states, store, KEYS[0], first)
+        state.current_timestamp = 42
+        store.save(KEYS[0], state)
+
+        first.close()
+        second = make_leases(tmp_path, "b", clock)
+        second.heartbeat()
+
+        assert homework.leased_state(states, store, KEYS[0], first) is None
+        assert KEYS[0] not in states
+        restored = homework.leased_state({}, store, KEYS[0], second)
+        assert restored.current_timestamp == 42
+        assert isinstance(
+            homework.leased_state({}, store, "new", second), PollState
+        )
+
+    def test_release_waits_for_running_poll(self, tmp_path):
+        clock = FakeClock(1000.0)
+        first = make_leases(tmp_path, "a", clock, release_delay=20)
+        second = make_leases(tmp_path, "b", clock)
+        first.heartbeat()
+        second.heartbeat()
+        first.heartbeat()
+
+        assert len(first.held) == 4
+        clock.now += 10
+        first.heartbeat()
+        assert second.heartbeat() == set()
+
+        clock.now += 10
+        first.heartbeat()
+        assert len(second.heartbeat()) == 4
+
+    def test_regained_shard_reloads_state(self, tmp_path):
+        clock = FakeClock(1000.0)
+        path = str(tmp_path / "state.db")
+        store = StateStore(path)
+        first = make_leases(tmp_path, "a", clock)
+        first.heartbeat()
+        states, epochs = store.load(), {}
+        state = homework.leased_state(states, store, KEYS[0], first, epochs)
+        state.current_timestamp = 100
+        state.statuses["hw.zip"] = "reviewing"
+        store.save(KEYS[0], state)
+        store.flush()
+        state.current_timestamp = 150
+        store.save(KEYS[0], state)
+
+        clock.now += first.ttl + 1
+        second = make_leases(tmp_path, "b", clock)
+        second.heartbeat()
+        other_store = StateStore(path)
+        other = homework.leased_state({}, other_store, KEYS[0], second, {})
+        assert other.current_timestamp == 100
+        other.current_timestamp = 200
+        other.statuses["hw.zip"] = "approved"
+        other_store.save(KEYS[0], other)
+        second.close()
+        other_store.close()
+        first.heartbeat()
+
+        regained = homework.leased_state(states, store, KEYS[0], first, epochs)
+        store.flush()
+
+        assert regained.current_timestamp == 200
+        assert regained.statuses == {"hw.zip": "approved"}
+        assert store.load(KEYS[0])[KEYS[0]].current_timestamp == 200
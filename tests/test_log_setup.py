@@ -0,0 +1,85 @@
+import io
+import logging
+
+import pytest
+
+import homework
+import log_setup
+from log_setup import log_call, parse_levels, setup_logging
+
+
+class Expensive:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "expensive"
+
+
+@pytest.fixture
+def test_logger():
+    logger = logging.getLogger("homework.test_log_setup")
+    logger.propagate = False
+    yield logger
+    logger.handlers.clear()
+    log_setup.call_log_levels.clear()
+
+
+class TestLogSetup:
+    def test_parse_levels(self):
+        assert parse_levels("check_response=debug, send_message=WARNING") == {
+            "check_response": logging.DEBUG,
+            "send_message": logging.WARNING,
+        }
+        assert parse_levels(None) == {}
+        with pytest.raises(ValueError):
+            parse_levels("check_response=LOUD")
+
+    def test_queue_listener_writes_stream(self, test_logger):
+        stream = io.StringIO()
+        listener = setup_logging(test_logger, level="INFO", stream=stream)
+        try:
+            test_logger.info("Ответ %s", {"homeworks": []})
+            test_logger.debug("Скрыто %s", "debug")
+        finally:
+            listener.stop()
+
+        assert "[INFO] Ответ {'homeworks': []}" in stream.getvalue()
+        assert "Скрыто" not in stream.getvalue()
+
+    def test_filtered_arguments_not_formatted(self, test_logger):
+        argument = Expensive()
+        listener = setup_logging(
+            test_logger, level="INFO", stream=io.StringIO()
+        )
+        try:
+            test_logger.debug("Ответ %s", argument)
+        finally:
+            listener.stop()
+
+        assert argument.calls == 0
+
+    def test_call_levels(self, test_logger):
+        stream = io.StringIO()
+        listener = setup_logging(
+            test_logger,
+            level="INFO",
+            call_levels={"check_response": logging.DEBUG},
+            stream=stream,
+        )
+        try:
+            log_call(test_logger, "check_response")
+            log_call(test_logger, "parse_status")
+        finally:
+            listener.stop()
+
+        assert '"check_response"' not in stream.getvalue()
+        assert 'Запущена функция "parse_status"' in stream.getvalue()
+
+    def test_check_response_logs_to_bot_logger(self, caplog):
+        with caplog.at_level(logging.ERROR, logger="homework"):
+            with pytest.raises(TypeError):
+                homework.check_response([])
+
+        assert [record.name for record in caplog.records] == ["homework"]
@@ -0,0 +1,99 @@
+import urllib.request
+
+import homework
+import metrics
+from metrics import Counter, Gauge, Histogram, Registry
+from metrics_server import start_metrics_server
+from state import PollState
+
+
+class TestMetrics:
+    def test_counter_exposition(self):
+        counter = Counter("errors", "Ошибки.", ("exception",))
+        counter.inc(exception="KeyError")
+        counter.inc(2, exception="KeyError")
+
+        assert counter.get(exception="KeyError") == 3
+        assert counter.expose() == (
+            "# HELP errors Ошибки.\n"
+            "# TYPE errors counter\n"
+            'errors_total{exception="KeyError"} 3\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram(
+            "latency", "Задержка.", ("status_code",), buckets=(0.1, 1)
+        )
+        histogram.observe(0.05, status_code=200)
+        histogram.observe(0.5, status_code=200)
+        histogram.observe(5, status_code=200)
+
+        text = histogram.expose()
+        assert 'latency_bucket{status_code="200",le="0.1"} 1' in text
+        assert 'latency_bucket{status_code="200",le="1"} 2' in text
+        assert 'latency_bucket{status_code="200",le="+Inf"} 3' in text
+        assert 'latency_count{status_code="200"} 3' in text
+        assert histogram.count(status_code=200) == 3
+
+    def test_gauge_function_evaluated_on_read(self):
+        items = [1, 2]
+        gauge = Gauge("depth", "Глубина.", ("queue",))
+        gauge.set_function(items.__len__, queue="send")
+        items.append(3)
+
+        assert 'depth{queue="send"} 3' in gauge.expose()
+
+    def test_server_exposes_registry(self):
+        registry = Registry()
+        registry.register(Counter("polls", "Опросы.")).inc()
+        server = start_metrics_server(0, registry=registry)
+
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert "polls_total 1" in body
+        assert content_type.startswith("text/plain; version=0.0.4")
+
+    def test_poll_instrumented(self, monkeypatch):
+        status_metric = Counter("transitions", "", ("status",))
+        errors_metric = Counter("errors", "", ("exception",))
+        monkeypatch.setattr(homework, "STATUS_TRANSITIONS", status_metric)
+        monkeypatch.setattr(homework, "POLL_EXCEPTIONS", errors_metric)
+        monkeypatch.setattr(homework, "notify", lambda *args: None)
+        monkeypatch.setattr(
+            homework,
+            "request_homework_statuses",
+            lambda *args: {
+                "homeworks": [{"homework_name": "hw", "status": "approved"}],
+                "current_date": 1,
+            },
+        )
+        subscription = homework.Subscription("token", ("1",))
+
+        homework.poll_subscription(None, subscription, PollState())
+        monkeypatch.setattr(
+            homework, "request_homework_statuses", lambda *args: []
+        )
+        homework.poll_subscription(None, subscription, PollState())
+
+        assert status_metric.get(status="approved") == 1
+        assert errors_metric.get(exception="TypeError") == 1
+
+    def test_default_registry_has_all_metrics(self):
+        names = {metric.name for metric in metrics.REGISTRY.metrics}
+
+        assert {
+            "practicum_request_duration_seconds",
+            "poll_exceptions",
+            "telegram_send_duration_seconds",
+            "telegram_send_failures",
+            "queue_depth",
+            "poll_lag_seconds",
+            "status_transitions",
+        } <= names
@@ -0,0 +1,150 @@
+import telegram
+
+from outbox import Outbox, OutboxSender
+from send_queue import RateLimiter, SendQueue
+from utils import FakeClock, MockQueue
+
+
+class FailingBot:
+    def __init__(self, error):
+        self.error = error
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        raise self.error
+
+
+class FlakyBot:
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise telegram.error.NetworkError("timeout")
+        self.sent.append((chat_id, text))
+
+
+class TestOutbox:
+    def test_pending_survives_restart(self, tmp_path):
+        path = str(tmp_path / "outbox.jsonl")
+        outbox = Outbox(path)
+        delivered = outbox.add("1", "first")
+        outbox.add("2", "second")
+        outbox.done(delivered, True)
+        outbox.close()
+
+        restored = Outbox(path)
+
+        assert restored.take_pending() == [(2, "2", "second")]
+        assert restored.add("1", "third") == 3
+
+    def test_absorb_moves_pending_and_removes_journal(self, tmp_path):
+        orphan_path = str(tmp_path / "outbox.2.jsonl")
+        orphan = Outbox(orphan_path)
+        orphan.done(orphan.add("1", "delivered"), True)
+        orphan.add("2", "pending")
+        orphan.close()
+        outbox = Outbox(str(tmp_path / "outbox.0.jsonl"))
+        outbox.add("3", "own")
+
+        assert outbox.absorb(orphan_path) == 1
+        assert not (tmp_path / "outbox.2.jsonl").exists()
+        assert outbox.take_pending() == [(2, "2", "pending")]
+        assert outbox.absorb(orphan_path) == 0
+
+    def test_failed_message_is_drained_again(self, tmp_path):
+        queue = MockQueue()
+        sender = OutboxSender(Outbox(str(tmp_path / "outbox.jsonl")), queue)
+        sender.put("1", "text")
+
+        assert sender.drain() == 0
+
+        queue.items[0][2](False)
+        assert sender.drain() == 1
+
+        queue.items[1][2](True)
+        assert sender.drain() == 0
+        assert len(sender.outbox) == 0
+
+    def test_gives_up_after_max_attempts(self, tmp_path):
+        outbox = Outbox(str(tmp_path / "outbox.jsonl"), max_attempts=2)
+        message_id = outbox.add("1", "text")
+
+        outbox.done(message_id, False)
+        assert len(outbox) == 1
+
+        outbox.take_pending()
+        outbox.done(message_id, False)
+        assert len(outbox) == 0
+
+    def test_compaction_keeps_pending(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        outbox = Outbox(str(path), compact_threshold=5)
+        pending = outbox.add("1", "pending")
+        for index in range(5):
+            outbox.done(outbox.add("1", str(index)), True)
+
+        assert len(path.read_text().splitlines()) == 1
+
+        outbox.done(pending, True)
+        outbox.close()
+        assert len(Outbox(str(path))) == 0
+
+    def test_delivered_after_failure(self, tmp_path):
+        bot = FlakyBot(failures=1)
+        queue = SendQueue(bot, limiter=RateLimiter(1000, 1000)).start()
+        sender = OutboxSender(Outbox(str(tmp_path / "outbox.jsonl")), queue)
+
+        sender.put("1", "text")
+        queue.close(timeout=5)
+        queue = SendQueue(bot, limiter=RateLimiter(1000, 1000)).start()
+        sender.queue = queue
+        sender.drain()
+        queue.close(timeout=5)
+
+        assert bot.sent == [("1", "text")]
+        assert len(sender.outbox) == 0
+
+    def test_transient_failures_are_retried_with_backoff(self, tmp_path):
+        clock = FakeClock()
+        outbox = Outbox(
+            str(tmp_path / "outbox.jsonl"),
+            max_attempts=2,
+            retry_interval=30,
+            retry_cap=600,
+            clock=clock,
+        )
+        message_id = outbox.add("1", "text")
+
+        outbox.done(message_id, None)
+        assert outbox.take_pending() == [(message_id, "1", "text")]
+        outbox.done(message_id, None)
+        assert outbox.take_pending() == []
+        clock.now += 30
+        assert len(outbox.take_pending()) == 1
+
+        for _ in range(50):
+            outbox.done(message_id, None)
+            clock.now += 600
+            assert len(outbox.take_pending()) == 1
+        assert len(outbox) == 1
+
+        outbox.done(message_id, True)
+        assert len(outbox) == 0
+
+    def test_send_errors_are_classified(self):
+        queue = SendQueue(
+            FailingBot(telegram.error.NetworkError("timeout")),
+            limiter=RateLimiter(1000, 1000),
+        )
+        assert queue.deliver("1", "text") is None
+
+        queue.bot = FailingBot(telegram.error.TimedOut())
+        assert queue.deliver("1", "text") is None
+
+        queue.bot = FailingBot(telegram.error.BadRequest("Chat not found"))
+        assert queue.deliver("1", "text") is False
+
+        queue.bot = FailingBot(telegram.error.Unauthorized("blocked"))
+        assert queue.deliver("1", "text") is False
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import homework
+from records import Homework, intern_status
+from state import PollState
+
+
+class TestRecords:
+    def test_homework_has_no_dict(self):
+        record = Homework("hw.zip", "approved")
+
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.comment = "slots"
+
+    def test_known_statuses_are_interned(self):
+        decoded = json.loads('["approved", "approved"]')
+
+        assert decoded[0] is not decoded[1]
+        assert intern_status(decoded[0]) is intern_status(decoded[1])
+        assert Homework("hw.zip", decoded[0]).status is intern_status(
+            "approved"
+        )
+
+    def test_unknown_status_is_not_interned(self):
+        status = "".join(["un", "known"])
+
+        assert intern_status(status) is status
+
+    def test_parse_status_accepts_record(self):
+        record = Homework.from_dict(
+            {"homework_name": "hw.zip", "status": "approved", "id": 1}
+        )
+
+        assert homework.parse_status(record) == homework.parse_status(
+            {"homework_name": "hw.zip", "status": "approved"}
+        )
+        with pytest.raises(homework.IncorrectHomeworkStatus):
+            homework.parse_status(Homework("hw.zip", "unknown"))
+
+    def test_tracked_statuses_share_instances(self):
+        state = PollState(1)
+        homeworks = json.loads(
+            '{"homeworks": [{"homework_name": "a.zip", "status": "approved"},'
+            ' {"homework_name": "b.zip", "status": "approved"}]}'
+        )["homeworks"]
+
+        homework.process_homeworks(homeworks, state)
+
+        assert state.statuses["a.zip"] is state.statuses["b.zip"]
+        assert state.homework_status is intern_status("approved")
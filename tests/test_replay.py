@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+import homework
+from exceptions import APIRequestException
+from replay import Record, ResponseRecorder, read_recording, replay
+from state import PollState
+from subscriptions import Subscription
+from utils import MockSender
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "recording.jsonl")
+
+
+class MockBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append(text)
+
+
+class TestRecorder:
+    def test_records_are_read_back(self, tmp_path):
+        path = str(tmp_path / "recording.jsonl")
+        recorder = ResponseRecorder(path, clock=lambda: 100.0)
+        response = {"homeworks": [], "current_date": 1}
+        recorder.record("key", 0.25, response)
+        recorder.record("key", 0.01)
+        recorder.record("key", 10, error="APIRequestException")
+        recorder.close()
+
+        assert list(read_recording(path)) == [
+            Record(100.0, "key", 0.25, response),
+            Record(100.0, "key", 0.01),
+            Record(100.0, "key", 10, error="APIRequestException"),
+        ]
+
+    def test_poll_records_responses_and_request_errors(
+        self, tmp_path, monkeypatch
+    ):
+        path = str(tmp_path / "recording.jsonl")
+        response = {
+            "homeworks": [{"homework_name": "hw.zip", "status": "approved"}],
+            "current_date": 1,
+        }
+        answers = [response, APIRequestException("timeout")]
+
+        def request(*args):
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        monkeypatch.setattr(homework, "request_homework_statuses", request)
+        subscription = Subscription("token", ("1",))
+        homework.start_recording(path)
+        try:
+            for _ in range(2):
+                homework.poll_subscription(
+                    MockSender(), subscription, PollState(1)
+                )
+        finally:
+            homework.stop_recording()
+
+        records = list(read_recording(path))
+        assert [record.key for record in records] == [subscription.key] * 2
+        assert records[0].response == response
+        assert records[1].error == "APIRequestException"
+
+
+class TestReplay:
+    def test_fixture_replays_through_pipeline(self):
+        bot = MockBot()
+
+        stats = replay(read_recording(RECORDING), bot, speed=0)
+
+        assert stats[:4] == (15, 3, 2, 14)
+        assert len(bot.sent) == 14
+        assert bot.sent[0].startswith(
+            'Изменился статус проверки работы "5e7b__hw1.zip"'
+        )
+
+    def test_every_response_is_parsed_without_tracking(self):
+        bot = MockBot()
+
+        stats = replay(
+            read_recording(RECORDING), bot, speed=0, track_changes=False
+        )
+
+        assert stats.messages == len(bot.sent) == 19
+
+    def test_pauses_are_accelerated(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        records = list(read_recording(RECORDING))
+        replay(records, MockBot(), speed=10, sleep=sleep, clock=lambda: now[0])
+
+        span = records[-1].at - records[0].at
+        assert sum(slept) == pytest.approx(span / 10)
@@ -0,0 +1,92 @@
+import pytest
+
+import homework
+from dedup import ErrorDedupCache
+from exceptions import (
+    APIRequestException,
+    CircuitOpenException,
+    IncorrectStatusResponseCode,
+    JSONDecodeException,
+)
+from resilience import CircuitBreaker, backoff_delay, is_retryable
+from scheduler import AdaptiveInterval
+from state import PollState
+from subscriptions import Subscription
+from utils import FakeClock, MockSender
+
+
+class TestRetries:
+    def test_classification(self):
+        assert is_retryable(APIRequestException())
+        assert is_retryable(JSONDecodeException())
+        assert is_retryable(IncorrectStatusResponseCode(503))
+        assert not is_retryable(IncorrectStatusResponseCode(401))
+        assert not is_retryable(KeyError("homeworks"))
+
+    def test_backoff(self):
+        assert backoff_delay(1, base=10, rng=lambda: 0) == 5
+        assert backoff_delay(1, base=10, rng=lambda: 0.999) < 10
+        assert backoff_delay(3, base=10, rng=lambda: 0) == 20
+        assert backoff_delay(30, base=10, cap=100, rng=lambda: 0) == 50
+
+
+class TestCircuitBreaker:
+    def test_opens_and_recovers(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            failure_threshold=2, recovery_timeout=60, clock=clock
+        )
+
+        for _ in range(2):
+            with pytest.raises(APIRequestException):
+                with breaker.guard():
+                    raise APIRequestException()
+
+        with pytest.raises(CircuitOpenException):
+            with breaker.guard():
+                pass
+        assert breaker.retry_in() == 60
+
+        clock.now = 60
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_client_errors_do_not_open(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+
+        with pytest.raises(IncorrectStatusResponseCode):
+            with breaker.guard():
+                raise IncorrectStatusResponseCode(401)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_subscriptions_back_off_together(self, monkeypatch):
+        requests_made = []
+
+        def mock_request(current_timestamp, headers, validators=None):
+            requests_made.append(headers)
+            raise IncorrectStatusResponseCode(503)
+
+        monkeypatch.setattr(homework, "request_homework_statuses", mock_request)
+        monkeypatch.setattr(
+            homework, "circuit_breaker", CircuitBreaker(failure_threshold=2)
+        )
+        monkeypatch.setattr(homework, "error_dedup", ErrorDedupCache())
+        sender = MockSender()
+        states = [PollState(1) for _ in range(4)]
+
+        for index, state in enumerate(states):
+            homework.poll_subscription(
+                sender, Subscription(str(index), ("1",)), state
+            )
+
+        assert len(requests_made) == 2
+        assert all(state.failures == 1 for state in states)
+        assert len(sender.sent) == 2
+        assert all(
+            homework.next_poll_interval(state, AdaptiveInterval()) >= 60
+            for state in states
+        )
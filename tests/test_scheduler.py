@@ -0,0 +1,131 @@
+from collections import Counter
+
+import pytest
+
+from scheduler import (
+    AdaptiveInterval,
+    TimingWheel,
+    run_timing_wheel,
+    slot_offset,
+)
+from subscriptions import Subscription
+
+
+class Finished(Exception):
+    pass
+
+
+class TestScheduler:
+    def test_slot_offset_is_stable(self):
+        offsets = [slot_offset(f"key-{index}", 600) for index in range(1000)]
+
+        assert offsets == [
+            slot_offset(f"key-{index}", 600) for index in range(1000)
+        ]
+        assert all(0 <= offset < 600 for offset in offsets)
+        assert len({int(offset // 60) for offset in offsets}) == 10
+
+    def test_wheel_fires_after_delay(self):
+        wheel = TimingWheel(tick=1, size=10)
+        wheel.schedule("near", 3)
+        wheel.schedule("far", 25)
+
+        fired = {}
+        for tick in range(1, 30):
+            for item in wheel.advance():
+                fired[item] = tick
+
+        assert fired == {"near": 3, "far": 25}
+        assert len(wheel) == 0
+
+    def test_each_subscription_polled_once_per_period(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+            if now[0] >= 300:
+                raise Finished
+
+        polls = Counter()
+        subscriptions = [Subscription(str(index), ("1",)) for index in range(50)]
+
+        with pytest.raises(Finished):
+            run_timing_wheel(
+                subscriptions,
+                lambda s: polls.update([s.practicum_token]),
+                100,
+                sleep=sleep,
+                clock=lambda: now[0],
+            )
+
+        assert set(polls.values()) == {3}
+
+
+class TestAdaptiveInterval:
+    def test_reviewing_polled_faster_than_approved(self):
+        policy = AdaptiveInterval()
+
+        assert policy.next_interval("reviewing", 0) < policy.next_interval(
+            "approved", 0
+        )
+
+    def test_interval_grows_without_changes(self):
+        policy = AdaptiveInterval()
+
+        assert policy.next_interval(None, 0) < policy.next_interval(None, 7200)
+
+    def test_bounds(self):
+        policy = AdaptiveInterval(min_interval=300, max_interval=900)
+
+        assert policy.next_interval("reviewing", 0) == 300
+        assert policy.next_interval("approved", 10**6) == 900
+
+        with pytest.raises(ValueError):
+            AdaptiveInterval(min_interval=10, max_interval=1)
+
+    def test_wheel_uses_returned_interval(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+            if now[0] >= 100:
+                raise Finished
+
+        polls = Counter()
+
+        def poll(subscription):
+            polls[subscription.practicum_token] += 1
+            return 10 if subscription.practicum_token == "fast" else None
+
+        with pytest.raises(Finished):
+            run_timing_wheel(
+                [Subscription("fast", ("1",)), Subscription("slow", ("1",))],
+                poll,
+                100,
+                sleep=sleep,
+                clock=lambda: now[0],
+            )
+
+        assert polls["slow"] == 1
+        assert polls["fast"] > 1
+
+    def test_wheel_stops_when_requested(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        polls = Counter()
+        subscriptions = [Subscription(str(index), ("1",)) for index in range(50)]
+
+        run_timing_wheel(
+            subscriptions,
+            lambda s: polls.update([s.practicum_token]),
+            100,
+            sleep=sleep,
+            clock=lambda: now[0],
+            stopped=lambda: sum(polls.values()) >= 10,
+            first_delay=lambda s: int(s.practicum_token),
+        )
+
+        assert sorted(polls) == [str(index) for index in range(10)]
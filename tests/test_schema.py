@@ -0,0 +1,40 @@
+import pytest
+
+import homework
+from schema import compile_response_validator, validate_response
+
+
+class TestResponseValidator:
+    def test_valid_response(self):
+        homeworks = [{"homework_name": "hw", "status": "approved"}]
+
+        assert (
+            validate_response({"homeworks": homeworks, "current_date": 1})
+            is homeworks
+        )
+        assert validate_response({"homeworks": [{"homework_name": "hw"}]})
+
+    @pytest.mark.parametrize(
+        "response, error",
+        [
+            ([], TypeError),
+            ({}, KeyError),
+            ({"homeworks": {}}, TypeError),
+            ({"homeworks": [], "current_date": "1"}, TypeError),
+            ({"homeworks": ["hw"]}, TypeError),
+            ({"homeworks": [{"homework_name": 1}]}, TypeError),
+            ({"homeworks": [{"status": ["approved"]}]}, TypeError),
+        ],
+    )
+    def test_invalid_response(self, response, error):
+        with pytest.raises(error):
+            validate_response(response)
+        with pytest.raises(error):
+            homework.check_response(response)
+
+    def test_custom_keys(self):
+        validate = compile_response_validator(string_keys=("lesson_name",))
+
+        with pytest.raises(TypeError):
+            validate({"homeworks": [{"lesson_name": 1}]})
+        assert validate({"homeworks": [{"status": 1}]})
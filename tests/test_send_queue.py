@@ -0,0 +1,223 @@
+import asyncio
+
+import telegram
+
+import homework
+from metrics import TELEGRAM_SEND_DURATION
+from send_queue import (
+    SEND_QUEUE_WORKERS,
+    AsyncSendQueue,
+    RateLimiter,
+    SendQueue,
+    TokenBucket,
+)
+from utils import FakeClock
+
+
+class MockBot:
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+        self.sent.append((chat_id, text))
+
+
+class TestTokenBucket:
+    def test_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, clock=clock)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5
+        assert bucket.reserve() == 1.0
+
+    def test_pause(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, clock=clock)
+        bucket.pause(10)
+
+        assert bucket.reserve() == 11
+
+
+class TestSendQueue:
+    def test_per_chat_limit(self):
+        clock = FakeClock()
+        limiter = RateLimiter(global_rate=30, chat_rate=1, clock=clock)
+
+        assert limiter.reserve("a") == 0
+        assert limiter.reserve("b") == 0
+        assert limiter.reserve("a") == 1
+
+    def test_retry_after_is_honoured(self):
+        clock = FakeClock()
+        bot = MockBot([telegram.error.RetryAfter(5)])
+        sender = SendQueue(
+            bot, limiter=RateLimiter(clock=clock), sleep=clock.sleep
+        )
+
+        assert sender.deliver("1", "text")
+        assert bot.sent == [("1", "text")]
+        assert clock.now >= 5
+
+    def test_failed_message_reported(self):
+        bot = MockBot([telegram.error.BadRequest("chat not found")])
+        sender = SendQueue(bot, sleep=lambda seconds: None)
+
+        assert not sender.deliver("1", "text")
+
+    def test_failed_sends_are_timed(self):
+        bot = MockBot(
+            [telegram.error.TimedOut(), telegram.error.BadRequest("chat")]
+        )
+        sender = SendQueue(bot, sleep=lambda seconds: None)
+        before = {
+            outcome: TELEGRAM_SEND_DURATION.count(outcome=outcome)
+            for outcome in ("TimedOut", "BadRequest", "ok")
+        }
+
+        assert sender.deliver("1", "text") is None
+        homework.send_message_to_chat(bot, "1", "text")
+        homework.send_message_to_chat(bot, "1", "text")
+
+        assert {
+            outcome: TELEGRAM_SEND_DURATION.count(outcome=outcome) - count
+            for outcome, count in before.items()
+        } == {"TimedOut": 1, "BadRequest": 1, "ok": 1}
+
+    def test_worker_survives_unexpected_error(self):
+        bot = MockBot([ValueError("unexpected")])
+        results = []
+        sender = SendQueue(bot, workers=1, limiter=RateLimiter(1000, 1000))
+        sender.start()
+
+        sender.put("1", "first", results.append)
+        sender.put("1", "second", results.append)
+        sender.close(timeout=5)
+
+        assert results == [None, True]
+        assert bot.sent == [("1", "second")]
+
+    def test_bot_pool_fits_workers(self, monkeypatch):
+        monkeypatch.setattr(homework, "TELEGRAM_TOKEN", "123:abc")
+
+        assert homework.get_bot().request.con_pool_size > SEND_QUEUE_WORKERS
+
+    def test_chat_burst_does_not_block_other_chats(self):
+        bot = MockBot()
+        sender = SendQueue(
+            bot, workers=1, limiter=RateLimiter(global_rate=1000, chat_rate=20)
+        ).start()
+
+        for index in range(4):
+            sender.put("a", str(index))
+        sender.put("b", "b")
+        sender.close(timeout=5)
+
+        assert bot.sent == [
+            ("a", "0"),
+            ("b", "b"),
+            ("a", "1"),
+            ("a", "2"),
+            ("a", "3"),
+        ]
+
+    def test_retry_after_keeps_chat_order(self):
+        bot = MockBot([None, telegram.error.RetryAfter(0.05)])
+        sender = SendQueue(
+            bot, workers=1, limiter=RateLimiter(global_rate=1000, chat_rate=20)
+        ).start()
+
+        for index in range(3):
+            sender.put("a", str(index))
+        sender.close(timeout=5)
+
+        assert [text for _, text in bot.sent] == ["0", "1", "2"]
+
+    def test_workers_keep_chat_order(self):
+        bot = MockBot()
+        sender = SendQueue(
+            bot, workers=3, limiter=RateLimiter(1000, 1000)
+        ).start()
+
+        for index in range(20):
+            sender.put(str(index % 4), str(index))
+        sender.close(timeout=5)
+
+        assert len(bot.sent) == 20
+        for chat_id in "0123":
+            texts = [int(text) for chat, text in bot.sent if chat == chat_id]
+            assert texts == sorted(texts)
+
+    def test_async_queue(self):
+        class MockAsyncBot(MockBot):
+            async def send_message(self, chat_id=None, text=None, **kwargs):
+                self.sent.append((chat_id, text))
+
+        bot = MockAsyncBot()
+
+        async def run():
+            sender = AsyncSendQueue(bot, limiter=RateLimiter(1000, 1000))
+            sender.start()
+            for index in range(5):
+                sender.put("1", str(index))
+            await sender.close(timeout=5)
+
+        asyncio.run(run())
+
+        assert [text for _, text in bot.sent] == ["0", "1", "2", "3", "4"]
+
+    def test_async_worker_survives_unexpected_error(self):
+        class MockAsyncBot(MockBot):
+            async def send_message(self, chat_id=None, text=None, **kwargs):
+                MockBot.send_message(self, chat_id, text)
+
+        bot = MockAsyncBot([ValueError("unexpected")])
+        results = []
+
+        async def run():
+            sender = AsyncSendQueue(
+                bot, workers=1, limiter=RateLimiter(1000, 1000)
+            )
+            sender.start()
+            sender.put("1", "first", results.append)
+            sender.put("1", "second", results.append)
+            await sender.close(timeout=5)
+
+        asyncio.run(run())
+
+        assert results == [None, True]
+        assert bot.sent == [("1", "second")]
+
+    def test_async_chat_burst_does_not_block_other_chats(self):
+        class MockAsyncBot(MockBot):
+            async def send_message(self, chat_id=None, text=None, **kwargs):
+                self.sent.append((chat_id, text))
+
+        bot = MockAsyncBot()
+
+        async def run():
+            sender = AsyncSendQueue(
+                bot,
+                workers=1,
+                limiter=RateLimiter(global_rate=1000, chat_rate=20),
+            )
+            sender.start()
+            for index in range(4):
+                sender.put("a", str(index))
+            sender.put("b", "b")
+            await sender.close(timeout=5)
+
+        asyncio.run(run())
+
+        assert bot.sent == [
+            ("a", "0"),
+            ("b", "b"),
+            ("a", "1"),
+            ("a", "2"),
+            ("a", "3"),
+        ]
@@ -0,0 +1,42 @@
+import pytest
+
+from sharding import HashRing, shard_subscriptions
+from subscriptions import Subscription
+
+KEYS = [f"key-{index}" for index in range(4000)]
+
+
+class TestSharding:
+    def test_keys_are_balanced(self):
+        ring = HashRing(4)
+        counts = [0] * 4
+        for key in KEYS:
+            counts[ring.shard_for(key)] += 1
+
+        assert all(len(KEYS) * 0.15 < count < len(KEYS) * 0.35 for count in counts)
+
+    def test_adding_shard_moves_keys_only_to_it(self):
+        before, after = HashRing(4), HashRing(5)
+
+        moved = [
+            key for key in KEYS if before.shard_for(key) != after.shard_for(key)
+        ]
+
+        assert {after.shard_for(key) for key in moved} == {4}
+        assert len(moved) < len(KEYS) * 0.35
+
+    def test_shard_subscriptions_covers_every_subscription_once(self):
+        subscriptions = [
+            Subscription(f"token-{index}", ("1",)) for index in range(100)
+        ]
+
+        shards = shard_subscriptions(subscriptions, 3)
+
+        assert sorted(s for shard in shards for s in shard) == sorted(
+            subscriptions
+        )
+        assert shards == shard_subscriptions(subscriptions, 3)
+
+    def test_ring_requires_shards(self):
+        with pytest.raises(ValueError):
+            HashRing(0)
@@ -0,0 +1,104 @@
+import asyncio
+import signal
+import time
+
+import pytest
+
+import homework
+from async_engine import AsyncPoller
+from scheduler import AdaptiveInterval, slot_offset
+from shutdown import GracefulShutdown
+from state import PollState
+from subscriptions import Subscription
+from utils import FakeClock
+
+
+class TestGracefulShutdown:
+    def test_request_starts_deadline(self):
+        clock = FakeClock()
+        shutdown = GracefulShutdown(timeout=20, clock=clock)
+
+        assert not shutdown.is_set()
+        assert shutdown.remaining() is None
+
+        shutdown.request()
+        clock.now = 15
+
+        assert shutdown.is_set()
+        assert shutdown.wait(10)
+        assert shutdown.remaining() == 5
+        clock.now = 30
+        assert shutdown.remaining() == 0
+
+    def test_repeated_sigterm_keeps_draining(self):
+        shutdown = GracefulShutdown(timeout=20)
+        shutdown.request(signal.SIGTERM)
+        deadline = shutdown.deadline
+
+        shutdown.request(signal.SIGTERM)
+
+        assert shutdown.deadline == deadline
+
+    def test_second_sigint_exits_immediately(self):
+        shutdown = GracefulShutdown()
+        shutdown.request(signal.SIGINT)
+
+        with pytest.raises(SystemExit):
+            shutdown.request(signal.SIGINT)
+
+    def test_sigterm_requests_shutdown(self):
+        previous = signal.getsignal(signal.SIGTERM)
+        shutdown = GracefulShutdown().install()
+        try:
+            signal.raise_signal(signal.SIGTERM)
+        finally:
+            shutdown.restore()
+
+        assert shutdown.is_set()
+        assert signal.getsignal(signal.SIGTERM) is previous
+
+
+class TestFirstPollDelay:
+    policy = AdaptiveInterval(min_interval=60)
+
+    def test_new_subscription_uses_slot(self):
+        assert homework.first_poll_delay(
+            "key", None, self.policy, 600
+        ) == slot_offset("key", 600)
+
+    def test_restored_subscription_keeps_schedule(self):
+        state = PollState(int(time.time()) - 100)
+        state.homework_status = "reviewing"
+
+        delay = homework.first_poll_delay("key", state, self.policy, 600)
+
+        assert delay == pytest.approx(20, abs=2)
+
+    def test_overdue_subscriptions_spread_over_min_interval(self):
+        delays = [
+            homework.first_poll_delay(
+                f"key-{index}", PollState(1), self.policy, 600
+            )
+            for index in range(100)
+        ]
+
+        assert all(0 <= delay < 60 for delay in delays)
+        assert len({int(delay // 10) for delay in delays}) == 6
+
+
+class TestAsyncPollerStop:
+    def test_sleeping_poller_stops(self):
+        async def run():
+            stopping = asyncio.Event()
+            poller = AsyncPoller(
+                None,
+                None,
+                Subscription("token", ("1",)),
+                stopping=stopping,
+            )
+            task = asyncio.ensure_future(poller.run())
+            await asyncio.sleep(0)
+            stopping.set()
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
@@ -0,0 +1,56 @@
+import logging
+import os
+import subprocess
+import sys
+
+import homework
+from benchmarks.bench_import import loaded_heavy_modules
+
+
+class TestStartup:
+    def test_import_does_not_load_heavy_modules(self):
+        assert loaded_heavy_modules("homework") == []
+
+    def test_import_has_no_side_effects(self):
+        code = (
+            "import logging, homework; "
+            "print(len(logging.getLogger('homework').handlers))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+
+        assert result.stdout.strip() == "0"
+
+    def test_load_config_reads_environment(self, monkeypatch):
+        monkeypatch.setenv("PRACTICUM_TOKEN", "practicum")
+        monkeypatch.setenv("TELEGRAM_TOKEN", "1234:abc")
+        monkeypatch.setenv("TELEGRAM_CHAT_ID", "42")
+        for name in ("PRACTICUM_TOKEN", "TELEGRAM_TOKEN", "TELEGRAM_CHAT_ID"):
+            monkeypatch.setattr(homework, name, None)
+        monkeypatch.setattr(homework, "PRACTICUM_HEADERS", {})
+
+        homework.load_config()
+
+        assert homework.PRACTICUM_TOKEN == "practicum"
+        assert homework.TELEGRAM_TOKEN == "1234:abc"
+        assert homework.TELEGRAM_CHAT_ID == "42"
+        assert homework.PRACTICUM_HEADERS == {
+            "Authorization": "OAuth practicum"
+        }
+
+    def test_create_app(self, monkeypatch):
+        monkeypatch.setattr(homework, "load_config", lambda: None)
+
+        app = homework.create_app(["--log-level", "WARNING"])
+        try:
+            assert app.args.log_level == "WARNING"
+            assert homework.logger.level == logging.WARNING
+        finally:
+            app.log_listener.stop()
+            homework.logger.handlers.clear()
+            homework.logger.setLevel(logging.NOTSET)
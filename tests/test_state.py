@@ -0,0 +1,105 @@
+import homework
+from state import PollState, StateStore
+from subscriptions import Subscription
+from utils import MockSender
+
+
+class TestStateStore:
+    def test_roundtrip(self, tmp_path):
+        path = str(tmp_path / "state.db")
+        store = StateStore(path)
+        state = PollState(100)
+        state.statuses["hw.zip"] = "reviewing"
+        state.last_error = "error"
+        state.record_status("reviewing")
+        store.save("a", state)
+        store.close()
+
+        states = StateStore(path).load()
+
+        assert set(states) == {"a"}
+        assert states["a"].current_timestamp == 100
+        assert states["a"].statuses == {"hw.zip": "reviewing"}
+        assert states["a"].last_error == "error"
+        assert states["a"].homework_status == "reviewing"
+
+    def test_writes_are_batched(self, tmp_path):
+        path = str(tmp_path / "state.db")
+        store = StateStore(path, flush_interval=3600, flush_batch=3)
+
+        for key in ("a", "b"):
+            store.save(key, PollState(1))
+            store.flush_if_due()
+        assert StateStore(path).load() == {}
+
+        store.save("c", PollState(1))
+        store.flush_if_due()
+        assert set(StateStore(path).load()) == {"a", "b", "c"}
+
+    def test_wal_mode(self, tmp_path):
+        store = StateStore(str(tmp_path / "state.db"))
+
+        mode = store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+
+class TestCursor:
+    def test_cursor_follows_current_date(self, monkeypatch):
+        requested = []
+        responses = [
+            {"homeworks": [], "current_date": 200},
+            {"homeworks": [], "current_date": 300},
+        ]
+
+        def mock_request(current_timestamp, headers, validators=None):
+            requested.append(current_timestamp)
+            return responses[len(requested) - 1]
+
+        monkeypatch.setattr(homework, "request_homework_statuses", mock_request)
+        state = homework.PollState(100)
+        subscription = Subscription("token", ("1",))
+
+        homework.poll_subscription(MockSender(), subscription, state)
+        homework.poll_subscription(MockSender(), subscription, state)
+
+        assert requested == [100, 200]
+        assert state.current_timestamp == 300
+
+    def test_cursor_kept_on_error(self, monkeypatch):
+        def mock_request(current_timestamp, headers, validators=None):
+            return {"current_date": 500}
+
+        monkeypatch.setattr(homework, "request_homework_statuses", mock_request)
+        state = homework.PollState(100)
+
+        homework.poll_subscription(
+            MockSender(), Subscription("token", ("1",)), state
+        )
+
+        assert state.current_timestamp == 100
+
+    def test_restored_status_not_resent(self, monkeypatch, tmp_path):
+        response = {
+            "homeworks": [{"homework_name": "hw.zip", "status": "approved"}],
+            "current_date": 200,
+        }
+        monkeypatch.setattr(
+            homework, "request_homework_statuses", lambda *args: response
+        )
+        sent = []
+        monkeypatch.setattr(
+            homework, "notify", lambda sender, subscription, text: sent.append(text)
+        )
+        path = str(tmp_path / "state.db")
+        subscription = Subscription("token", ("1",))
+
+        store = StateStore(path)
+        state = PollState(100)
+        homework.poll_subscription(MockSender(), subscription, state)
+        store.save(subscription.key, state)
+        store.close()
+
+        restored = StateStore(path).load()[subscription.key]
+        homework.poll_subscription(MockSender(), subscription, restored)
+
+        assert len(sent) == 1
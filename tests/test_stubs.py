@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+import telegram
+
+import homework
+from api_client import PracticumClient
+from async_engine import run_engine
+from benchmarks.bench_end_to_end import latencies
+from benchmarks.stubs import PracticumStubServer, TelegramStubServer
+from resilience import CircuitBreaker
+from scheduler import AdaptiveInterval
+from send_queue import RateLimiter
+from subscriptions import Subscription
+
+
+class TestStubs:
+    def test_practicum_script(self):
+        script = ("reviewing", "reviewing", "approved")
+        with PracticumStubServer(script=script) as server:
+            with PracticumClient(
+                server.url, headers={"Authorization": "OAuth a"}
+            ) as client:
+                statuses = [
+                    client.get({"from_date": 0}).json()["homeworks"][0][
+                        "status"
+                    ]
+                    for _ in range(4)
+                ]
+
+        assert statuses == ["reviewing", "reviewing", "approved", "approved"]
+        assert [status for status, _ in server.changes["a"]] == [
+            "reviewing",
+            "approved",
+        ]
+
+    def test_practicum_errors_and_latency(self):
+        with PracticumStubServer(latency=0.05, error_rate=1) as server:
+            with PracticumClient(server.url) as client:
+                started = time.monotonic()
+                response = client.get({"from_date": 0})
+
+        assert response.status_code == 500
+        assert time.monotonic() - started >= 0.05
+
+    def test_telegram_stub_accepts_bot(self):
+        with TelegramStubServer() as server:
+            bot = telegram.Bot("123:abc", base_url=server.base_url)
+            message = bot.send_message(chat_id="42", text="Привет")
+
+        assert message.text == "Привет"
+        assert [(chat, text) for chat, text, _ in server.messages] == [
+            ("42", "Привет")
+        ]
+
+    def test_telegram_stub_errors(self):
+        with TelegramStubServer(error_rate=1) as server:
+            bot = telegram.Bot("123:abc", base_url=server.base_url)
+            with pytest.raises(telegram.error.TelegramError):
+                bot.send_message(chat_id="42", text="Привет")
+
+        assert server.messages == []
+
+    def test_end_to_end(self, monkeypatch):
+        monkeypatch.setattr(homework, "circuit_breaker", CircuitBreaker())
+        subscriptions = [
+            Subscription(f"token-{index}", (str(index),)) for index in range(3)
+        ]
+        policy = AdaptiveInterval(
+            intervals={}, default=0.05, min_interval=0.05, max_interval=0.05
+        )
+
+        async def drive(practicum, telegram_stub):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    run_engine(
+                        subscriptions,
+                        "bench",
+                        endpoint=practicum.url,
+                        policy=policy,
+                        retry_time=0.05,
+                        telegram_api_url=telegram_stub.api_url,
+                        limiter=RateLimiter(global_rate=1e6, chat_rate=1e6),
+                    ),
+                    0.5,
+                )
+
+        script = ("reviewing", "approved")
+        with PracticumStubServer(script=script, cycle=True) as practicum:
+            with TelegramStubServer() as telegram_stub:
+                asyncio.run(drive(practicum, telegram_stub))
+
+        assert {chat for chat, _, _ in telegram_stub.messages} == {
+            "0",
+            "1",
+            "2",
+        }
+        delays = latencies(practicum, telegram_stub)
+        assert len(delays) == len(telegram_stub.messages)
+        assert all(delay >= 0 for delay in delays)
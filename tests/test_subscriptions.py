@@ -0,0 +1,108 @@
+import json
+import sqlite3
+
+import homework
+from dedup import ErrorDedupCache
+from subscriptions import (
+    Subscription,
+    SubscriptionRegistry,
+    check_subscription,
+    load_subscriptions,
+)
+from utils import MockSender
+
+
+class TestSubscriptions:
+    def test_registry_merges_chats(self):
+        registry = SubscriptionRegistry()
+        registry.add("token", 1)
+        registry.add("token", "2")
+        registry.add("token", "1")
+        registry.add("other", "3")
+
+        assert len(registry) == 2
+        assert registry.get("token").chat_ids == ("1", "2")
+
+    def test_load_json(self, tmp_path):
+        path = tmp_path / "subscriptions.json"
+        path.write_text(json.dumps({"a": ["1", "2"], "b": "3"}))
+
+        registry = load_subscriptions(str(path))
+
+        assert registry.get("a").chat_ids == ("1", "2")
+        assert registry.get("b").chat_ids == ("3",)
+
+    def test_load_sqlite(self, tmp_path):
+        path = tmp_path / "subscriptions.db"
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE subscriptions (practicum_token TEXT, chat_id TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO subscriptions VALUES (?, ?)",
+            [("a", "1"), ("a", "2"), ("b", "3")],
+        )
+        connection.commit()
+        connection.close()
+
+        registry = load_subscriptions(str(path))
+
+        assert registry.get("a").chat_ids == ("1", "2")
+        assert len(registry) == 2
+
+    def test_check_subscription(self):
+        assert check_subscription(Subscription("token", ("1",)))
+        assert not check_subscription(Subscription("", ("1",)))
+        assert not check_subscription(Subscription("token", ("",)))
+
+    def test_poll_subscription_notifies_all_chats(self, monkeypatch):
+        response = {
+            "homeworks": [{"homework_name": "hw.zip", "status": "reviewing"}],
+            "current_date": 1,
+        }
+        requested_headers = []
+
+        def mock_request(current_timestamp, headers, validators=None):
+            requested_headers.append(headers)
+            return response
+
+        monkeypatch.setattr(homework, "request_homework_statuses", mock_request)
+        sender = MockSender()
+        subscription = Subscription("token", ("1", "2"))
+        state = homework.PollState()
+
+        homework.poll_subscription(sender, subscription, state)
+        homework.poll_subscription(sender, subscription, state)
+
+        assert requested_headers[0] == {"Authorization": "OAuth token"}
+        assert [chat_id for chat_id, _ in sender.sent] == ["1", "2"]
+
+    def test_invalid_homework_does_not_block_response(self, monkeypatch):
+        response = {
+            "homeworks": [
+                {"homework_name": "bad.zip", "status": "unknown"},
+                {"homework_name": "hw.zip", "status": "approved"},
+            ],
+            "current_date": 5,
+        }
+        monkeypatch.setattr(
+            homework,
+            "request_homework_statuses",
+            lambda current_timestamp, headers, validators=None: response,
+        )
+        monkeypatch.setattr(homework, "error_dedup", ErrorDedupCache())
+        sender = MockSender()
+        subscription = Subscription("token", ("1",))
+        state = homework.PollState()
+
+        homework.poll_subscription(sender, subscription, state)
+        homework.poll_subscription(sender, subscription, state)
+
+        texts = [text for _, text in sender.sent]
+        assert len(texts) == 2
+        assert "hw.zip" in texts[0]
+        assert "unknown" in texts[1]
+        assert state.statuses == {"hw.zip": "approved"}
+        assert state.current_timestamp == 5
+        assert state.failures == 0
+        assert state.last_error
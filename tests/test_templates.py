@@ -0,0 +1,60 @@
+import pytest
+
+import homework
+from templates import (
+    VERDICTS_EN,
+    MessageTemplates,
+    Notification,
+    compile_template,
+)
+
+
+class TestTemplates:
+    templates = MessageTemplates(
+        {"ru": homework.HOMEWORK_STATUSES, "en": VERDICTS_EN}, cache_size=2
+    )
+
+    def test_render_returns_notification(self):
+        notification = self.templates.render("hw.zip", "approved")
+
+        assert notification == Notification(
+            "hw.zip",
+            "approved",
+            homework.HOMEWORK_STATUSES["approved"],
+            'Изменился статус проверки работы "hw.zip". '
+            + homework.HOMEWORK_STATUSES["approved"],
+        )
+
+    def test_locales(self):
+        english = self.templates.render("hw.zip", "rejected", "en")
+
+        assert english.text.endswith(VERDICTS_EN["rejected"])
+        assert self.templates.render("hw.zip", "rejected", "de").verdict == (
+            homework.HOMEWORK_STATUSES["rejected"]
+        )
+        with pytest.raises(KeyError):
+            self.templates.render("hw.zip", "unknown")
+
+    def test_cache_is_bounded(self):
+        first = self.templates.render("a.zip", "reviewing")
+
+        assert self.templates.render("a.zip", "reviewing") is first
+        self.templates.render("b.zip", "reviewing")
+        self.templates.render("c.zip", "reviewing")
+        assert self.templates.render.cache_info().currsize == 2
+        assert self.templates.render("a.zip", "reviewing") is not first
+
+    def test_template_requires_homework_name(self):
+        with pytest.raises(ValueError):
+            compile_template("{verdict}", "approved", "ok")
+
+    def test_parse_status_uses_locale(self, monkeypatch):
+        monkeypatch.setattr(homework, "MESSAGE_LOCALE", "en")
+
+        message = homework.parse_status(
+            {"homework_name": "hw.zip", "status": "approved"}
+        )
+
+        assert message == (
+            f'Review status of "hw.zip" has changed. {VERDICTS_EN["approved"]}'
+        )
@@ -0,0 +1,120 @@
+import os
+import signal
+import time
+from argparse import Namespace
+
+from workers import Supervisor, orphan_outboxes, worker_path
+
+
+def record_and_exit(args, index, workers):
+    with open(args.path, "a") as file:
+        file.write(f"{index}/{workers}\n")
+    raise SystemExit(1)
+
+
+def record_and_sleep(args, index, workers):
+    with open(args.path, "a") as file:
+        file.write(f"{index}/{workers}\n")
+    time.sleep(60)
+
+
+def drain_after_sigterm(args, index, workers):
+    from shutdown import GracefulShutdown
+
+    shutdown = GracefulShutdown().install()
+    with open(args.path, "a") as file:
+        file.write("ready\n")
+    shutdown.wait(30)
+    time.sleep(0.5)
+    with open(args.path, "a") as file:
+        file.write("drained\n")
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return file.read().split()
+
+
+class TestWorkers:
+    def test_worker_path(self):
+        assert worker_path("data/outbox.jsonl", 2) == "data/outbox.2.jsonl"
+        assert worker_path("outbox", 0) == "outbox.0"
+
+    def test_orphan_outboxes(self, tmp_path):
+        path = str(tmp_path / "outbox.jsonl")
+        for name in ("outbox.jsonl", "outbox.1.jsonl", "outbox.2.jsonl",
+                     "outbox.3.jsonl", "outbox.x.jsonl", "other.2.jsonl"):
+            (tmp_path / name).write_text("")
+
+        assert orphan_outboxes(path, 0, 2) == [
+            path,
+            str(tmp_path / "outbox.2.jsonl"),
+        ]
+        assert orphan_outboxes(path, 1, 2) == [str(tmp_path / "outbox.3.jsonl")]
+        assert orphan_outboxes(path, 1, 4) == []
+
+    def test_crashed_worker_is_restarted(self, tmp_path):
+        path = str(tmp_path / "starts")
+        supervisor = Supervisor(
+            Namespace(path=path), 2, target=record_and_exit, restart_delay=0
+        )
+        supervisor.start()
+        try:
+            wait_for(
+                lambda: not any(
+                    p.is_alive() for p in supervisor.processes.values()
+                )
+            )
+            assert supervisor.check() == 2
+            wait_for(lambda: len(read_lines(path)) == 4)
+        finally:
+            supervisor.stop()
+
+        assert sorted(read_lines(path)) == ["0/2", "0/2", "1/2", "1/2"]
+        assert supervisor.failures == {0: 1, 1: 1}
+
+    def test_resize_restarts_workers_with_new_shards(self, tmp_path):
+        path = str(tmp_path / "starts")
+        supervisor = Supervisor(
+            Namespace(path=path), 2, target=record_and_sleep, stop_timeout=5
+        )
+        supervisor.start()
+        try:
+            wait_for(lambda: len(read_lines(path)) == 2)
+            supervisor.resize(3)
+            supervisor.rebalance()
+            wait_for(lambda: len(read_lines(path)) == 5)
+            assert len(supervisor.processes) == 3
+        finally:
+            supervisor.stop()
+
+        assert sorted(read_lines(path)[2:]) == ["0/3", "1/3", "2/3"]
+        assert supervisor.processes == {}
+
+    def test_stop_timeout_follows_shutdown_timeout(self):
+        supervisor = Supervisor(Namespace(shutdown_timeout=60), 1)
+
+        assert supervisor.stop_timeout > 60
+
+    def test_stop_does_not_interrupt_draining_worker(self, tmp_path):
+        path = str(tmp_path / "events")
+        supervisor = Supervisor(
+            Namespace(path=path), 1, target=drain_after_sigterm
+        )
+        supervisor.start()
+        try:
+            wait_for(lambda: read_lines(path) == ["ready"])
+            os.kill(supervisor.processes[0].pid, signal.SIGTERM)
+        finally:
+            supervisor.stop()
+
+        assert read_lines(path) == ["ready", "drained"]
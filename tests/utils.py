@@ -31,3 +31,36 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
     ), f"Не найдена переменная `{var_name}`. Не удаляйте и не переименовывайте ее."
     var = getattr(scope, var_name)
     assert not callable(var), f"{var_name} должна быть переменной, а не функцией."
+
+
+class FakeClock:
+    """Clock that stands still until a test moves `now` or calls `sleep`"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class MockSender:
+    """Sender that records every queued `(chat_id, text)` pair"""
+
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class MockQueue:
+    """Send queue that keeps every `(chat_id, text, on_done)` unsent"""
+
+    def __init__(self):
+        self.items = []
+
+    def put(self, chat_id, text, on_done=None):
+        self.items.append((chat_id, text, on_done))
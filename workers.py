@@ -0,0 +1,309 @@
+import copy
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from resilience import backoff_delay
+from shutdown import SHUTDOWN_TIMEOUT
+
+if TYPE_CHECKING:
+    import argparse
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger(f"homework.{__name__}")
+
+WORKER_CHECK_INTERVAL = 1.0
+WORKER_RESTART_DELAY = 1.0
+WORKER_RESTART_DELAY_MAX = 60.0
+WORKER_HEALTHY_AFTER = 60.0
+WORKER_STOP_MARGIN = 5.0
+
+
+def worker_path(path: str, index: int) -> str:
+    """Ф-я получения пути к файлу процесса, например `outbox.1.jsonl`.
+
+    Args:
+        path (:obj:`str`): общий путь к файлу
+        index (:obj:`int`): номер процесса
+
+    Returns:
+        :obj:`str`: путь к файлу процесса.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index}{ext}"
+
+
+def orphan_outboxes(path: str, index: int, workers: int) -> List[str]:
+    """Ф-я поиска журналов уведомлений без процесса-владельца.
+
+    После уменьшения количества процессов журналы шардов с номерами
+    `workers` и выше переходят к процессу `k % workers`, а общий журнал
+    однопроцессного режима — к процессу 0.
+
+    Args:
+        path (:obj:`str`): общий путь к журналу
+        index (:obj:`int`): номер процесса
+        workers (:obj:`int`): количество процессов
+
+    Returns:
+        :obj:`list`: пути к журналам, которые забирает процесс.
+    """
+    directory = os.path.dirname(path) or "."
+    root, ext = os.path.splitext(os.path.basename(path))
+    result = [path] if index == 0 and os.path.exists(path) else []
+
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith(f"{root}.") and name.endswith(ext)):
+            continue
+        number = name[len(root) + 1:len(name) - len(ext)]
+        if not number.isdigit():
+            continue
+        shard = int(number)
+        if shard >= workers and shard % workers == index:
+            result.append(os.path.join(os.path.dirname(path), name))
+
+    return result
+
+
+def exit_on_signal(signum: int, frame) -> None:
+    """Завершает процесс так, чтобы выполнились блоки `finally`."""
+    raise SystemExit(0)
+
+
+def run_worker(args: "argparse.Namespace", index: int, workers: int) -> None:
+    """Ф-я процесса опроса одного шарда подписок.
+
+    Процесс опрашивает подписки своего шарда кольца хешей, пишет
+    уведомления в собственный журнал и сохраняет курсоры в общую базу
+    состояния. По SIGTERM состояние записывается на диск до выхода,
+    поэтому следующий владелец шарда продолжает с тех же курсоров. С
+    базой аренды процесс вместо шарда по номеру арендует шарды как
+    отдельный экземпляр `<instance-id>.<index>`.
+
+    Args:
+        args (:obj:`argparse.Namespace`): аргументы командной строки
+        index (:obj:`int`): номер шарда
+        workers (:obj:`int`): количество шардов.
+    """
+    import homework
+    from log_setup import setup_logging
+    from outbox import Outbox
+    from sharding import shard_subscriptions
+
+    signal.signal(signal.SIGTERM, exit_on_signal)
+    homework.load_config()
+    listener = setup_logging(
+        homework.logger, level=args.log_level, call_levels=args.log_call_levels
+    )
+
+    try:
+        outbox_file = args.outbox_file
+        args = copy.copy(args)
+        args.outbox_file = worker_path(outbox_file, index)
+        if args.metrics_port is not None:
+            args.metrics_port += index
+        if args.record_file:
+            args.record_file = worker_path(args.record_file, index)
+
+        outbox = Outbox(args.outbox_file)
+        for path in orphan_outboxes(outbox_file, index, workers):
+            outbox.absorb(path)
+        outbox.close()
+
+        subscriptions = homework.get_subscriptions(args.subscriptions)
+        if args.lease_file:
+            args.instance_id = f"{args.instance_id}.{index}"
+        else:
+            subscriptions = shard_subscriptions(subscriptions, workers)[index]
+        logger.info(
+            "Процесс %d из %d, подписок: %d",
+            index + 1,
+            workers,
+            len(subscriptions),
+        )
+        homework.run(args, subscriptions)
+
+    finally:
+        listener.stop()
+
+
+class Supervisor:
+    """Запуск процессов опроса, перезапуск упавших и смена их количества.
+
+    Подписки делятся между процессами кольцом согласованного хеширования
+    (`sharding.HashRing`). Упавший процесс перезапускается с
+    экспоненциальной паузой. По SIGTTIN количество процессов
+    увеличивается на один, по SIGTTOU — уменьшается: все процессы
+    останавливаются, записывая состояние в общую базу, и запускаются
+    заново с новыми шардами.
+
+    Args:
+        args (:obj:`argparse.Namespace`): аргументы командной строки
+        workers (:obj:`int`): количество процессов
+        target (:obj:`Callable`): функция процесса `(args, index, workers)`
+        check_interval (:obj:`float`): пауза между проверками процессов
+        restart_delay (:obj:`float`): пауза перед первым перезапуском
+        stop_timeout (:obj:`float`): ожидание завершения по SIGTERM (по
+            умолчанию `args.shutdown_timeout` плюс запас, чтобы процессы
+            успели дослать очередь сообщений).
+    """
+
+    def __init__(
+        self,
+        args: "argparse.Namespace",
+        workers: int,
+        target: Callable = run_worker,
+        check_interval: float = WORKER_CHECK_INTERVAL,
+        restart_delay: float = WORKER_RESTART_DELAY,
+        stop_timeout: Optional[float] = None,
+    ) -> None:
+        """Инициализирует Supervisor."""
+        if workers < 1:
+            raise ValueError("Количество процессов должно быть положительным.")
+
+        self.args = args
+        self.workers = workers
+        self.target = target
+        self.check_interval = check_interval
+        self.restart_delay = restart_delay
+        if stop_timeout is None:
+            stop_timeout = (
+                getattr(args, "shutdown_timeout", SHUTDOWN_TIMEOUT)
+                + WORKER_STOP_MARGIN
+            )
+        self.stop_timeout = stop_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, "BaseProcess"] = {}
+        self.started_at: Dict[int, float] = {}
+        self.failures: Dict[int, int] = {}
+        self.restart_at: Dict[int, float] = {}
+        self.requested: Optional[int] = None
+        self.stopping = False
+
+    def start_worker(self, index: int) -> None:
+        """Запускает процесс шарда."""
+        process = self.context.Process(
+            target=self.target,
+            args=(self.args, index, self.workers),
+            name=f"homework-worker-{index}",
+        )
+        process.start()
+        self.processes[index] = process
+        self.started_at[index] = time.monotonic()
+        logger.info("Запущен процесс %d (pid %s)", index, process.pid)
+
+    def start(self) -> None:
+        """Запускает процессы всех шардов."""
+        for index in range(self.workers):
+            self.start_worker(index)
+
+    def stop(self) -> None:
+        """Останавливает процессы, дожидаясь записи их состояния.
+
+        Процессы получают SIGTERM, даже если сигнал платформы уже дошел
+        до них (Heroku шлет его всем процессам dyno): повторный SIGTERM
+        не прерывает начатую плавную остановку.
+        """
+        processes = list(self.processes.values())
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.stop_timeout
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error(
+                    "Процесс %s не завершился, остановка", process.pid
+                )
+                process.kill()
+                process.join()
+
+        self.processes.clear()
+        self.restart_at.clear()
+
+    def resize(self, workers: int) -> None:
+        """Запрашивает смену количества процессов.
+
+        Args:
+            workers (:obj:`int`): новое количество процессов.
+        """
+        self.requested = max(1, workers)
+
+    def rebalance(self) -> None:
+        """Перезапускает процессы с запрошенным количеством шардов."""
+        workers, self.requested = self.requested, None
+        if workers is None or workers == self.workers:
+            return
+
+        logger.info(
+            "Смена количества процессов: %d -> %d", self.workers, workers
+        )
+        self.stop()
+        self.workers = workers
+        self.failures.clear()
+        self.start()
+
+    def check(self) -> int:
+        """Перезапускает завершившиеся процессы, когда истекла пауза.
+
+        Returns:
+            :obj:`int`: количество перезапущенных процессов.
+        """
+        now = time.monotonic()
+        restarted = 0
+
+        for index, process in list(self.processes.items()):
+            if process.is_alive():
+                if now - self.started_at[index] >= WORKER_HEALTHY_AFTER:
+                    self.failures.pop(index, None)
+                continue
+
+            if index not in self.restart_at:
+                failures = self.failures.get(index, 0) + 1
+                self.failures[index] = failures
+                delay = backoff_delay(
+                    failures, self.restart_delay, WORKER_RESTART_DELAY_MAX
+                )
+                self.restart_at[index] = now + delay
+                logger.error(
+                    "Процесс %d завершился с кодом %s, перезапуск через "
+                    "%.1f с",
+                    index,
+                    process.exitcode,
+                    delay,
+                )
+
+            if now >= self.restart_at[index]:
+                del self.restart_at[index]
+                self.start_worker(index)
+                restarted += 1
+
+        return restarted
+
+    def handle_signal(self, signum: int, frame) -> None:
+        """Обрабатывает сигналы остановки и смены количества процессов."""
+        if signum == signal.SIGTTIN:
+            self.resize((self.requested or self.workers) + 1)
+        elif signum == signal.SIGTTOU:
+            self.resize((self.requested or self.workers) - 1)
+        else:
+            self.stopping = True
+
+    def run(self) -> None:
+        """Запускает процессы и следит за ними до SIGTERM или SIGINT."""
+        for signum in (signal.SIGTERM, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self.handle_signal)
+
+        self.start()
+        try:
+            while not self.stopping:
+                if self.requested is not None:
+                    self.rebalance()
+                self.check()
+                time.sleep(self.check_interval)
+        finally:
+            self.stop()